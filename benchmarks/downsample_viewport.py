@@ -0,0 +1,64 @@
+# -*- coding:utf-8 -*-
+"""
+    Downsampling benchmark: pyramid build and per viewport reduction times over a long series.
+
+        python benchmarks/downsample_viewport.py [--rows 10000000] [--pixels 1500]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pantulipy.downsample import Downsampler
+
+
+def _best(fn, repeat=7):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(rows=10000000, pixels=1500, seed=0):
+    """
+    Time the pyramid build and full and partial viewports reductions.
+
+    :param int rows: series length.
+    :param int pixels: buckets (points for LTTB) per viewport.
+    :param int seed: random generator seed.
+    :return dict: operation names as keys and best seconds as values.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100. + rng.standard_normal(rows).cumsum()
+    spread = rng.random(rows)
+    data = pd.DataFrame({'open': np.roll(close, 1), 'high': close + spread, 'low': close - spread, 'close': close,
+                         'volume': rng.random(rows) * 1000.,
+                         'upper': close + 2., 'middle': close, 'lower': close - 2.},
+                        index=pd.date_range('2000-01-01', periods=rows, freq='min'))
+    start = time.perf_counter()
+    ds = Downsampler(data)
+    timings = {'build': time.perf_counter() - start}
+    bands = ['lower', 'middle', 'upper']
+    for viewport, (first, last) in {'full': (None, None), 'half': (rows // 4, rows * 3 // 4)}.items():
+        timings[f'ohlc {viewport}'] = _best(lambda: ds.ohlc(pixels, first, last))
+        timings[f'envelope 3 columns {viewport}'] = _best(lambda: ds.envelope(bands, pixels, first, last))
+        timings[f'lttb 1 column {viewport}'] = _best(lambda: ds.lttb(['close'], pixels, first, last))
+        timings[f'lttb 3 columns {viewport}'] = _best(lambda: ds.lttb(bands, pixels, first, last))
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Downsampler build and viewport reduction benchmark.')
+    parser.add_argument('--rows', type=int, default=10000000, help='series length')
+    parser.add_argument('--pixels', type=int, default=1500, help='buckets per viewport')
+    args = parser.parse_args(argv)
+    print(f'{args.rows} rows, {args.pixels} pixels')
+    for name, seconds in run(args.rows, args.pixels).items():
+        print(f'{name:<26} {seconds * 1000.:9.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
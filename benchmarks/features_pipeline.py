@@ -0,0 +1,95 @@
+# -*- coding:utf-8 -*-
+"""
+    Features benchmark: "features.compute_panel" against the equivalent pandas shift / rolling / rank chain, time and
+    peak traced memory (8 indicator outputs with 2 lags each, so 24 features, by default).
+
+        python benchmarks/features_pipeline.py [--symbols 50] [--rows 20000]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from pantulipy import batch, features
+
+SPECS = ['rsi', ('sma', 50), ('ema', 20), ('bbands', 20, 2), 'atr', 'obv']
+LAGS = (1, 5)
+ZSCORE = 100
+
+
+def _panel(symbols, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2000-01-01', periods=rows, freq='min')
+    panel = {}
+    for n in range(symbols):
+        close = 100. + rng.standard_normal(rows).cumsum()
+        panel[f'S{n}'] = pd.DataFrame({'open': np.roll(close, 1), 'high': close + 1., 'low': close - 1.,
+                                       'close': close, 'volume': rng.random(rows) * 1000.}, index=index)
+    return panel
+
+
+def _pandas(panel):
+    frames = {}
+    for symbol, data in panel.items():
+        outputs = batch.compute(data, SPECS)
+        zscored = (outputs - outputs.rolling(ZSCORE).mean()) / outputs.rolling(ZSCORE).std()
+        lagged = [zscored] + [zscored.shift(lag).add_suffix(f'_lag{lag}') for lag in LAGS]
+        frames[symbol] = pd.concat(lagged, axis=1)
+    stacked = pd.concat(frames, names=['symbol', 'time']).swaplevel().sort_index()
+    ranks = stacked.groupby(level='time').rank()
+    counts = stacked.groupby(level='time').transform('count')
+    return ((ranks - 1.) / (counts - 1.)).astype(np.float32)
+
+
+def _fused(panel):
+    return features.compute_panel(panel, SPECS, lags=LAGS, zscore=ZSCORE, rank=True, causal=False)
+
+
+def _measure(fn, panel):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(panel)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run(symbols=50, rows=20000):
+    """
+    Time both pipelines over a random walk panel.
+
+    :param int symbols: panel symbols.
+    :param int rows: rows per symbol.
+    :return dict: pipeline names as keys and (seconds, peak bytes) as values, plus the features count and the number
+        of values that differ (near ties ranked apart by float rounding).
+    """
+    panel = _panel(symbols, rows)
+    fm, fused_seconds, fused_peak = _measure(_fused, panel)
+    frame, pandas_seconds, pandas_peak = _measure(_pandas, panel)
+    # same features, the pandas chain only differs by float rounding (which may break or make near ties in ranks)
+    expected = frame.reindex(pd.MultiIndex.from_product([fm.index, fm.symbols]), columns=fm.names).to_numpy()
+    differences = int((~np.isclose(fm.matrix, expected, rtol=1e-3, atol=1e-3, equal_nan=True)).sum())
+    if differences > expected.size * 1e-4:
+        raise AssertionError(f'{differences} features differ from the pandas pipeline')
+    return {'features': len(fm.columns), 'differences': differences, 'fused': (fused_seconds, fused_peak),
+            'pandas': (pandas_seconds, pandas_peak)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fused features against a pandas pipeline benchmark.')
+    parser.add_argument('--symbols', type=int, default=50, help='panel symbols')
+    parser.add_argument('--rows', type=int, default=20000, help='rows per symbol')
+    args = parser.parse_args(argv)
+    result = run(args.symbols, args.rows)
+    print(f'{args.symbols} symbols x {args.rows} rows x {result["features"]} features '
+          f'({result["differences"]} values differ by float rounding)')
+    for name in ['fused', 'pandas']:
+        seconds, peak = result[name]
+        print(f'{name:<7} {seconds:8.2f} s {peak / 2 ** 20:9.1f} MB peak')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# -*- coding:utf-8 -*-
+"""
+    Workspace allocations benchmark: memory allocated and retained by "push" + "evaluate" steps once the ring went
+    round (expected: no retained memory, only the transient "Tulipy" outputs, reported per step).
+
+        python benchmarks/workspace_allocations.py [--window 500] [--steps 10000]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from pantulipy.workspace import Workspace
+
+SPECS = ['rsi', ('sma', 50), ('ema', 20), ('bbands', 20, 2), 'macd', 'atr', 'obv']
+
+
+def _bars(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100. + rng.standard_normal(rows).cumsum()
+    return [{'open': c, 'high': c + 1., 'low': c - 1., 'close': c, 'volume': v}
+            for c, v in zip(close.tolist(), (rng.random(rows) * 1000.).tolist())]
+
+
+def _count_outputs(ws, counts):
+    """
+    Wrap the workspace kernels so each call adds the number and size of the arrays it returns to "counts".
+    """
+    def counted(fn):
+        def call(*args):
+            data = fn(*args)
+            arrays = data if type(data) == tuple else (data,)
+            counts[0] += len(arrays)
+            counts[1] += sum(array.nbytes for array in arrays)
+            return data
+        return call
+    ws._kernels = [(counted(kernel[0]),) + kernel[1:] for kernel in ws._kernels]
+
+
+def _per_step(values):
+    return {'mean': sum(values) / len(values), 'max': max(values)}
+
+
+def run(window=500, steps=10000):
+    """
+    Measure steady state workspace steps.
+
+    :param int window: workspace window.
+    :param int steps: measured steps.
+    :return dict: steps, retained bytes and blocks, per step "push" and "evaluate" peaks (mean and max bytes), per
+        step kernel output arrays count and bytes and microseconds per step.
+    """
+    bars = _bars(2 * window + steps)
+    ws = Workspace(window, SPECS)
+    # one full round of evaluations builds every ring position views
+    for bar in bars[:2 * window]:
+        ws.push(bar)
+        if ws.ready:
+            ws.evaluate()
+    measured = bars[2 * window:]
+    push_peaks, evaluate_peaks = [], []
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for bar in measured:
+        # peaks are reset before each call, so they are the memory allocated on top of what was live at its start
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        ws.push(bar)
+        push_peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        ws.evaluate()
+        evaluate_peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    after, before = after.filter_traces(ignored), before.filter_traces(ignored)
+    retained = [stat for stat in after.compare_to(before, 'lineno') if stat.size_diff > 0]
+    start = time.perf_counter()
+    for bar in measured:
+        ws.push(bar)
+        ws.evaluate()
+    elapsed = time.perf_counter() - start
+    # kernel outputs are counted on a separate pass, the wrapper would otherwise show up in the peaks
+    counts = [0, 0]
+    _count_outputs(ws, counts)
+    for bar in measured[:100]:
+        ws.push(bar)
+        ws.evaluate()
+    checked = min(steps, 100)
+    return {'steps': steps, 'retained_bytes': sum(stat.size_diff for stat in retained),
+            'retained_blocks': sum(stat.count_diff for stat in retained), 'push_peak_bytes': _per_step(push_peaks),
+            'evaluate_peak_bytes': _per_step(evaluate_peaks), 'kernel_arrays': counts[0] / checked,
+            'kernel_bytes': counts[1] / checked, 'us_per_step': elapsed / steps * 1e6,
+            'retained_by': [str(stat) for stat in retained[:5]]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Workspace push + evaluate allocations benchmark.')
+    parser.add_argument('--window', type=int, default=500, help='workspace window')
+    parser.add_argument('--steps', type=int, default=10000, help='measured steps')
+    args = parser.parse_args(argv)
+    result = run(args.window, args.steps)
+    print(f'{result["steps"]} steps, window {args.window}, {len(SPECS)} specs')
+    print(f'retained: {result["retained_bytes"]} bytes in {result["retained_blocks"]} blocks')
+    for step in ['push', 'evaluate']:
+        peak = result[f'{step}_peak_bytes']
+        print(f'{step} peak per step: {peak["mean"]:.0f} bytes mean, {peak["max"]} bytes max')
+    print(f'kernel outputs per step: {result["kernel_arrays"]:.0f} arrays, {result["kernel_bytes"]:.0f} bytes')
+    print(f'{result["us_per_step"]:.1f} us per push + evaluate')
+    for line in result['retained_by']:
+        print(f'  {line}')
+
+
+if __name__ == '__main__':
+    main()
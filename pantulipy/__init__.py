@@ -7,6 +7,8 @@ from .core import (ad, adosc, adx, adxr, ao, apo, aroon, aroonosc, atr, avgprice
                    linreg, linregintercept, linregslope, macd, marketfi, mass, md, mfi, mom, msw, natr, nvi, obv, ppo,
                    psar, pvi, qstick, roc, rocr, rsi, sma, stderr, stoch, tema, tr, trima, trix, tsf, typprice, ultosc,
                    vhf, vidya, volatility, vosc, vwma, wad, wcprice, wilders, willr, wma, zlema, InvalidOptionError)
+from .plugins import register, unregister
+from . import accessor
 from pathlib import Path
 import sys
 
@@ -45,4 +47,4 @@ __all__ = ['__version__', '__author__', '__license__', '__package__', '__descrip
            'linregintercept', 'linregslope', 'macd', 'marketfi', 'mass', 'md', 'mfi', 'mom', 'msw', 'natr', 'nvi',
            'obv', 'ppo', 'psar', 'pvi', 'qstick', 'roc', 'rocr', 'rsi', 'sma', 'stderr', 'stoch', 'tema', 'tr', 'trima',
            'trix', 'tsf', 'typprice', 'ultosc', 'vhf', 'vidya', 'volatility', 'vosc', 'vwma', 'wad', 'wcprice',
-           'wilders', 'willr', 'wma', 'zlema', 'InvalidOptionError']
+           'wilders', 'willr', 'wma', 'zlema', 'InvalidOptionError', 'register', 'unregister']
@@ -0,0 +1,6 @@
+# -*- coding:utf-8 -*-
+import sys
+
+from pantulipy.cli import main
+
+sys.exit(main())
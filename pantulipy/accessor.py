@@ -0,0 +1,165 @@
+# -*- coding:utf-8 -*-
+"""
+    Pandas DataFrame "tulip" accessor.
+
+    The accessor is bound to one DataFrame, so OHLCV columns are staged (float64 arrays) only once, computed
+    indicators are cached and the frame index is reused for every result:
+
+    >>> import pantulipy
+    >>> ohlc.tulip.rsi(14)
+    >>> ohlc.tulip.compute(['rsi', ('sma', 50), ('macd', 12, 26, 9)])
+"""
+import datetime
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from . import core, duration
+
+__all__ = ['TulipAccessor']
+
+
+# per frame state, pandas may build a new accessor instance on every attribute access
+_STATES = {}
+
+
+class _FrameState:
+    def __init__(self):
+        self.token = None
+        self.snapshot = None
+        self.staged = {}
+        self.results = OrderedDict()
+
+
+def _frame_state(ohlc):
+    key = id(ohlc)
+    state = _STATES.get(key)
+    if state is None:
+        state = _STATES[key] = _FrameState()
+        weakref.finalize(ohlc, _STATES.pop, key, None)
+    return state
+
+
+@pd.api.extensions.register_dataframe_accessor('tulip')
+class TulipAccessor:
+    """
+    Indicators over a single OHLCV DataFrame with per frame staging and results caching.
+
+    Caches are dropped whenever the frame index, columns or OHLCV column buffers change. With pandas copy on write
+    (default since pandas 3) in place value edits are detected too, on older pandas call "invalidate" after editing
+    values in place.
+    """
+    #: maximum number of cached indicators results per frame.
+    cache_size = 128
+
+    def __init__(self, ohlc):
+        self._ohlc = ohlc
+        self._state = _frame_state(ohlc)
+
+    def _buffers_token(self):
+        pointers = []
+        for column in (c for c in core._OHLCV if c in self._ohlc.columns):
+            values = self._ohlc[column].array
+            if isinstance(values, pd.arrays.NumpyExtensionArray):
+                pointers.append(values.to_numpy().__array_interface__['data'][0])
+            else:
+                # extension arrays (like nullable floats) are immutable wrappers kept by the frame per column
+                pointers.append(id(values))
+        return id(self._ohlc.index), id(self._ohlc.columns), len(self._ohlc), tuple(pointers)
+
+    def _validate(self):
+        token = self._buffers_token()
+        if token != self._state.token:
+            self.invalidate()
+            self._state.token = token
+            # holding a reference to current blocks makes copy on write pandas copy them on any in place edit,
+            # which changes the buffers token
+            self._state.snapshot = self._ohlc[[c for c in core._OHLCV if c in self._ohlc.columns]]
+
+    def invalidate(self):
+        """
+        Drop staged columns and cached results.
+        """
+        self._state.staged.clear()
+        self._state.results.clear()
+
+    def _stage(self, names):
+        staged = self._state.staged
+        missing = [n for n in dict.fromkeys(names) if n not in staged]
+        if missing:
+            staged.update(core._stage_columns(self._ohlc, missing))
+        return staged
+
+    def _columns(self, name, params, compact=False):
+        compact = compact and name in core._COMPACT_DTYPES
+        key = (name, params, compact)
+        results = self._state.results
+        if key in results:
+            results.move_to_end(key)
+            return results[key]
+        if params and isinstance(params[0], (str, datetime.timedelta, np.timedelta64)):
+            # duration windows (like "30min") over a DatetimeIndex, as pantulipy functions do
+            result = duration.compute(name, self._ohlc, *params)
+            columns = {result.name: result}
+        else:
+            staged = self._stage(core._input_names(core._kernel(name)))
+            outputs = core._run_kernel(name, params, staged)
+            align = core._align_compact if compact else core._align
+            columns = align(name, outputs if len(outputs) > 1 else outputs[0], len(self._ohlc))
+            columns = {n: pd.Series(core._nullable(values, 'pandas') if compact else values, index=self._ohlc.index,
+                                    name=n, copy=False) for n, values in columns.items()}
+        results[key] = columns
+        while len(results) > self.cache_size:
+            results.popitem(last=False)
+        return columns
+
+    def indicator(self, name, *args, compact=False, **kwargs):
+        """
+        Compute (or get from cache) an indicator, same params and result as the pantulipy function "name".
+
+        :param str name: indicator name.
+        :param args: indicator positional params, the period may be a duration (like "30min") for indicators listed in
+            "duration.INDICATORS" over a DatetimeIndex.
+        :param bool compact: discrete or bounded outputs (like "crossover") with compact nullable dtypes.
+        :param kwargs: indicator key pair params.
+        :return pd.Series or pd.DataFrame: indicator results.
+        :raise ValueError: for duration periods the indicator or the frame index does not support.
+        """
+        self._validate()
+        columns = self._columns(*core._parse_spec((name, *args, kwargs)), compact)
+        if len(columns) > 1:
+            return pd.DataFrame(columns, index=self._ohlc.index)
+        # shallow copies keep cached results safe from in place edits under copy on write
+        return next(iter(columns.values())).copy(deep=False)
+
+    def compute(self, specs, compact=False):
+        """
+        Compute many indicators in a single DataFrame.
+
+        :param list specs: indicators specs like "rsi", ("sma", 50) or ("macd", 12, 26, {"signal_period": 9}).
+        :param bool compact: discrete or bounded outputs (like "crossover") with compact nullable dtypes.
+        :return pd.DataFrame: one column per indicator output, named after indicator and params ("sma_50").
+        """
+        self._validate()
+        result = {}
+        for spec in specs:
+            name, params = core._parse_spec(spec)
+            columns = self._columns(name, params, compact)
+            result.update(zip(core._spec_columns(name, params), (c.array for c in columns.values())))
+        return pd.DataFrame(result, index=self._ohlc.index)
+
+    def __getattr__(self, name):
+        if name not in core.__all__:
+            raise AttributeError(f'"tulip" accessor has no attribute "{name}"')
+
+        def indicator(*args, **kwargs):
+            return self.indicator(name, *args, **kwargs)
+
+        indicator.__name__ = name
+        indicator.__doc__ = getattr(core, name).__doc__
+        return indicator
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(core.__all__))
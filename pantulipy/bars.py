@@ -0,0 +1,248 @@
+# -*- coding:utf-8 -*-
+"""
+    Vectorized trades to OHLCV bars aggregation (time, tick, volume and dollar bars).
+
+    Bars are returned as a dict of contiguous float64 numpy arrays (plus a "timestamp" datetime64 array), the same
+    layout indicators stage their inputs, so they can be passed straight to any pantulipy function:
+
+    >>> from pantulipy import bars, rsi
+    >>> ohlcv = bars.time_bars(timestamps, prices, sizes, '1min')
+    >>> rsi(ohlcv, 14)
+"""
+import numpy as np
+import pandas as pd
+
+__all__ = ['BarBuilder', 'time_bars', 'tick_bars', 'volume_bars', 'dollar_bars', 'to_frame']
+
+_KINDS = ['time', 'tick', 'volume', 'dollar']
+_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+def _as_trades(timestamps, prices, sizes):
+    timestamps = np.asarray(timestamps)
+    if np.issubdtype(timestamps.dtype, np.datetime64):
+        timestamps = timestamps.astype('datetime64[ns]').view(np.int64)
+    else:
+        timestamps = np.asarray(pd.to_datetime(timestamps)).astype('datetime64[ns]').view(np.int64) \
+            if timestamps.dtype == object else timestamps.astype(np.int64)
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    sizes = np.ascontiguousarray(sizes, dtype=np.float64)
+    if not len(timestamps) == len(prices) == len(sizes):
+        raise ValueError('timestamps, prices and sizes must have the same length')
+    # bars are consecutive runs of trades, unsorted trades would be split into (or merged with) wrong bars
+    if np.any(timestamps[1:] < timestamps[:-1]):
+        raise ValueError('trades timestamps must be sorted ascending')
+    return timestamps, prices, sizes
+
+
+def _bar_size(kind, size):
+    if kind not in _KINDS:
+        raise ValueError(f'Unknown bars kind "{kind}", use one of {_KINDS}')
+    if kind == 'time':
+        size = pd.Timedelta(size).value
+    if not size > 0:
+        raise ValueError('bars size must be positive')
+    return size
+
+
+def _bar_ids(kind, size, timestamps, prices, sizes, carry=0):
+    """
+    Bar number of each trade.
+
+    Time bars ids are time buckets, any other kind ids are the number of whole "size" amounts (trades, volume or
+    value) traded before each trade, starting from a "carry" amount traded before these trades.
+
+    :return tuple: bar ids array and the amount traded after the last trade.
+    """
+    if kind == 'time':
+        return timestamps // size, carry
+    if kind == 'tick':
+        return (carry + np.arange(len(prices))) // size, carry + len(prices)
+    amount = sizes if kind == 'volume' else prices * sizes
+    cumulative = np.cumsum(np.r_[carry, amount])
+    return np.floor(cumulative[:-1] / size).astype(np.int64), cumulative[-1]
+
+
+def _aggregate(kind, size, ids, timestamps, prices, sizes):
+    """
+    Aggregate trades grouped by consecutive equal ids.
+
+    :return tuple: a dict of bar arrays and the id of each bar.
+    """
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(ids)]
+    bars = {
+        'timestamp': (ids[starts] * size if kind == 'time' else timestamps[starts]).view('datetime64[ns]'),
+        'open': prices[starts],
+        'high': np.maximum.reduceat(prices, starts),
+        'low': np.minimum.reduceat(prices, starts),
+        'close': prices[ends - 1],
+        'volume': np.add.reduceat(sizes, starts)
+    }
+    return bars, ids[starts]
+
+
+def _empty():
+    bars = {name: np.empty(0) for name in _COLUMNS}
+    bars['timestamp'] = np.empty(0, dtype='datetime64[ns]')
+    return bars
+
+
+def _build(kind, size, timestamps, prices, sizes):
+    size = _bar_size(kind, size)
+    timestamps, prices, sizes = _as_trades(timestamps, prices, sizes)
+    if not len(prices):
+        return _empty()
+    return _aggregate(kind, size, _bar_ids(kind, size, timestamps, prices, sizes)[0], timestamps, prices, sizes)[0]
+
+
+def time_bars(timestamps, prices, sizes, freq):
+    """
+    Time bars (empty intervals produce no bar).
+
+    :param timestamps: trades timestamps (datetime64 or int nanoseconds since epoch), sorted ascending.
+    :param prices: trades prices.
+    :param sizes: trades sizes.
+    :param freq: bars duration as a pandas Timedelta, a string like "1min" or nanoseconds.
+    :return dict: bars "timestamp" (bar open time), open, high, low, close and volume arrays.
+    :raise ValueError: when trades are not sorted by timestamp.
+    """
+    return _build('time', freq, timestamps, prices, sizes)
+
+
+def tick_bars(timestamps, prices, sizes, ticks):
+    """
+    Tick bars (a bar every "ticks" trades).
+
+    :param timestamps: trades timestamps (datetime64 or int nanoseconds since epoch), sorted ascending.
+    :param prices: trades prices.
+    :param sizes: trades sizes.
+    :param int ticks: trades per bar.
+    :return dict: bars "timestamp" (first trade time), open, high, low, close and volume arrays.
+    :raise ValueError: when trades are not sorted by timestamp.
+    """
+    return _build('tick', ticks, timestamps, prices, sizes)
+
+
+def volume_bars(timestamps, prices, sizes, volume):
+    """
+    Volume bars (a bar is closed by the trade that makes the cumulative volume reach the next "volume" multiple).
+
+    :param timestamps: trades timestamps (datetime64 or int nanoseconds since epoch), sorted ascending.
+    :param prices: trades prices.
+    :param sizes: trades sizes.
+    :param float volume: volume per bar.
+    :return dict: bars "timestamp" (first trade time), open, high, low, close and volume arrays.
+    :raise ValueError: when trades are not sorted by timestamp.
+    """
+    return _build('volume', volume, timestamps, prices, sizes)
+
+
+def dollar_bars(timestamps, prices, sizes, value):
+    """
+    Dollar bars (a bar is closed by the trade that makes the cumulative traded value (price x size) reach the next
+    "value" multiple).
+
+    :param timestamps: trades timestamps (datetime64 or int nanoseconds since epoch), sorted ascending.
+    :param prices: trades prices.
+    :param sizes: trades sizes.
+    :param float value: traded value per bar.
+    :return dict: bars "timestamp" (first trade time), open, high, low, close and volume arrays.
+    :raise ValueError: when trades are not sorted by timestamp.
+    """
+    return _build('dollar', value, timestamps, prices, sizes)
+
+
+def to_frame(bars):
+    """
+    Bars as an OHLCV pandas DataFrame indexed by bar timestamp.
+
+    :param dict bars: bars as returned by any bars function.
+    :return pd.DataFrame: a DataFrame with open, high, low, close and volume columns.
+    """
+    return pd.DataFrame({name: bars[name] for name in _COLUMNS[1:]},
+                        index=pd.DatetimeIndex(bars['timestamp'], name='timestamp'))
+
+
+class BarBuilder:
+    """
+    Incremental bars builder for live trades streams.
+
+    Each "update" call aggregates a chunk of trades (vectorized) and returns the bars completed so far, the last
+    incomplete bar is kept until more trades (or a "flush" call) complete it.
+
+    >>> builder = BarBuilder('volume', 1000)
+    >>> for chunk in trades_stream:
+    ...     completed = builder.update(chunk.timestamps, chunk.prices, chunk.sizes)
+    """
+
+    def __init__(self, kind, size):
+        """
+        Constructor.
+
+        :param str kind: one of "time", "tick", "volume" or "dollar".
+        :param size: bar duration for time bars, or trades, volume or value per bar.
+        """
+        self.kind = kind
+        self.size = _bar_size(kind, size)
+        self._partial = None
+        self._traded = 0
+        self._last = None
+
+    @property
+    def partial(self):
+        """
+        The current incomplete bar.
+
+        :return dict: bar values (scalars) or None.
+        """
+        return None if self._partial is None else dict(self._partial[0])
+
+    def update(self, timestamps, prices, sizes):
+        """
+        Aggregate new trades.
+
+        :param timestamps: trades timestamps (datetime64 or int nanoseconds since epoch), sorted ascending.
+        :param prices: trades prices.
+        :param sizes: trades sizes.
+        :return dict: completed bars arrays (possibly empty).
+        :raise ValueError: when trades are not sorted by timestamp (within the chunk or after previous chunks).
+        """
+        timestamps, prices, sizes = _as_trades(timestamps, prices, sizes)
+        if not len(prices):
+            return _empty()
+        if self._last is not None and timestamps[0] < self._last:
+            raise ValueError('trades timestamps must be sorted ascending, got a chunk older than previous trades')
+        self._last = timestamps[-1]
+        ids, self._traded = _bar_ids(self.kind, self.size, timestamps, prices, sizes, self._traded)
+        bars, bar_ids = _aggregate(self.kind, self.size, ids, timestamps, prices, sizes)
+        if self._partial is not None:
+            partial, partial_id = self._partial
+            if bar_ids[0] == partial_id:
+                bars['timestamp'][0] = partial['timestamp']
+                bars['open'][0] = partial['open']
+                bars['high'][0] = max(bars['high'][0], partial['high'])
+                bars['low'][0] = min(bars['low'][0], partial['low'])
+                bars['volume'][0] += partial['volume']
+            else:
+                bars = {name: np.r_[partial[name], bars[name]].astype(bars[name].dtype) for name in _COLUMNS}
+                bar_ids = np.r_[partial_id, bar_ids]
+        if self.kind != 'time' and self._traded >= (bar_ids[-1] + 1) * self.size:
+            self._partial = None
+            return bars
+        self._partial = ({name: bars[name][-1] for name in _COLUMNS}, bar_ids[-1])
+        return {name: np.ascontiguousarray(bars[name][:-1]) for name in _COLUMNS}
+
+    def flush(self):
+        """
+        Close the current incomplete bar.
+
+        :return dict: the incomplete bar as 1 length arrays (empty arrays if there is none).
+        """
+        if self._partial is None:
+            return _empty()
+        partial = self._partial[0]
+        self._partial = None
+        bars = {name: np.asarray([partial[name]], dtype=np.float64) for name in _COLUMNS[1:]}
+        bars['timestamp'] = np.asarray([partial['timestamp']], dtype='datetime64[ns]')
+        return bars
@@ -0,0 +1,182 @@
+# -*- coding:utf-8 -*-
+"""
+    Batch computation of many indicators specs over one or many OHLCV datasets.
+
+    Input columns are staged once per dataset, every spec runs directly over the staged arrays and results are
+    aligned in a single output pass:
+
+    >>> from pantulipy import batch
+    >>> batch.compute(ohlc, ['rsi', ('sma', 50), ('macd', 12, 26, 9)])
+    >>> batch.compute_panel({'BTC': btc, 'ETH': eth}, ['rsi', ('bbands', 20, 2)], tail=1)
+
+    Large jobs can be streamed, results are yielded per (symbol, specs group) as soon as they are ready and only a
+    bounded number of them are computed ahead of the consumer:
+
+    >>> results = batch.iter_panel(load_symbols(), specs, group_size=10, executor=pool)
+    >>> for n, (symbol, result) in enumerate(results):  # a result per (symbol, specs group)
+    ...     result.to_parquet(f'features/{symbol}/part-{n}.parquet')
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import numpy as np
+
+from . import core
+
+__all__ = ['compute', 'compute_arrays', 'compute_panel', 'iter_compute', 'iter_panel']
+
+
+def compute_arrays(staged, specs, tail=None, compact=False, fill=True):
+    """
+    Compute indicators specs over staged input columns.
+
+    :param dict staged: input column names as keys and float64 arrays as values (see "core._stage_columns").
+    :param list specs: indicators specs like "rsi", ("sma", 50) or ("macd", 12, 26, {"signal_period": 9}).
+    :param int tail: compute only the last "tail" rows (windowed indicators only read the input they need).
+    :param bool compact: discrete or bounded outputs (like "crossover") as compact dtype masked arrays.
+    :param bool fill: back fill warm-up rows, otherwise they are NaN (causal results).
+    :return dict: spec column names (like "sma_50") as keys and aligned float64 arrays (or masked arrays) as values.
+    """
+    if compact:
+        align = core._align_compact
+    else:
+        def align(name, data, num_rows):
+            return core._align(name, data, num_rows, fill)
+    num_rows = len(next(iter(staged.values())))
+    rows = num_rows if tail is None else min(int(tail), num_rows)
+    result = {}
+    for spec in specs:
+        name, params = core._parse_spec(spec)
+        inputs = staged
+        if rows < num_rows and name in core._WINDOWED_INDICATORS:
+            first = max(num_rows - rows - core._warmup(name, params), 0)
+            inputs = {column: values[first:] for column, values in staged.items()}
+        outputs = core._run_kernel(name, params, inputs)
+        columns = align(name, outputs if len(outputs) > 1 else outputs[0], len(next(iter(inputs.values()))))
+        for column, values in zip(core._spec_columns(name, params), columns.values()):
+            values = values[len(values) - rows:]
+            result[column] = values if np.ma.isMaskedArray(values) else np.ascontiguousarray(values)
+    return result
+
+
+def _needed_columns(specs):
+    names = []
+    for spec in specs:
+        names.extend(core._input_names(core._kernel(core._parse_spec(spec)[0])))
+    return list(dict.fromkeys(names))
+
+
+def compute(data, specs, tail=None, compact=False):
+    """
+    Compute many indicators specs over a single dataset.
+
+    :param data: a DataFrame instance with data columns (open, high, low, close, volume) (pandas, polars, pyarrow
+        or a dict of numpy arrays) or a single Series.
+    :param list specs: indicators specs like "rsi", ("sma", 50) or ("macd", 12, 26, {"signal_period": 9}).
+    :param int tail: compute and return only the last "tail" rows.
+    :param bool compact: discrete or bounded outputs (like "crossover") with compact nullable dtypes, so results
+        are mixed dtype frames.
+    :return: a DataFrame (same library as data) with a column per spec output, named like "sma_50".
+    """
+    staged = core._stage_columns(data, _needed_columns(specs))
+    return _result(data, compute_arrays(staged, specs, tail, compact))
+
+
+def _result(data, columns):
+    kind = core._frame_kind(data)
+    index = None
+    if kind == 'pandas':
+        rows = len(next(iter(columns.values())))
+        index = data.index[len(data.index) - rows:]
+    return core._from_columns(columns, kind, index, frame=True)
+
+
+def _groups(specs, group_size=None):
+    specs = [core._parse_spec(spec) for spec in specs]
+    size = int(group_size or len(specs) or 1)
+    return [specs[n:n + size] for n in range(0, len(specs), size)]
+
+
+def iter_compute(data, specs, tail=None, compact=False, group_size=1):
+    """
+    Compute many indicators specs over a single dataset yielding results per specs group.
+
+    Input columns are staged once, each group is computed only when the previous result has been consumed.
+
+    :param data: a DataFrame instance with data columns (see "compute").
+    :param list specs: indicators specs like "rsi", ("sma", 50) or ("macd", 12, 26, {"signal_period": 9}).
+    :param int tail: compute and return only the last "tail" rows.
+    :param bool compact: discrete or bounded outputs with compact nullable dtypes.
+    :param int group_size: number of specs per result (all of them when None).
+    :return: a generator of DataFrames (same library as data), one per specs group.
+    """
+    groups = _groups(specs, group_size)
+    staged = core._stage_columns(data, _needed_columns([spec for group in groups for spec in group]))
+    for group in groups:
+        yield _result(data, compute_arrays(staged, group, tail, compact))
+
+
+def compute_panel(panel, specs, tail=None, compact=False):
+    """
+    Compute many indicators specs over many datasets (one per symbol).
+
+    :param dict panel: symbols as keys and datasets (see "compute") as values.
+    :param list specs: indicators specs like "rsi", ("sma", 50) or ("macd", 12, 26, {"signal_period": 9}).
+    :param int tail: compute and return only the last "tail" rows of each dataset.
+    :param bool compact: discrete or bounded outputs with compact nullable dtypes.
+    :return dict: symbols as keys and results DataFrames as values.
+    """
+    return dict(iter_panel(panel, specs, tail, compact))
+
+
+def iter_panel(panel, specs, tail=None, compact=False, group_size=None, executor=None, max_pending=None,
+               ordered=True):
+    """
+    Compute many indicators specs over many datasets yielding results per (symbol, specs group) when ready.
+
+    Datasets are pulled from "panel" only when there is room for more work, so a generator loading symbols lazily
+    keeps memory bounded by "max_pending" datasets and results, whatever the universe size. Without an executor
+    nothing is computed ahead of the consumer.
+
+    :param panel: a dict with symbols as keys and datasets (see "compute") as values, or an iterable of
+        (symbol, dataset) pairs.
+    :param list specs: indicators specs like "rsi", ("sma", 50) or ("macd", 12, 26, {"signal_period": 9}).
+    :param int tail: compute and return only the last "tail" rows of each dataset.
+    :param bool compact: discrete or bounded outputs with compact nullable dtypes.
+    :param int group_size: number of specs per result (all of them when None, so one result per symbol).
+    :param executor: a "concurrent.futures" executor (threads or processes pool) to compute on, serial when None.
+    :param int max_pending: maximum results submitted to "executor" and not consumed yet (twice the CPU count by
+        default).
+    :param bool ordered: yield results in panel and specs order, otherwise as soon as each one is completed.
+    :return: a generator of (symbol, DataFrame) pairs.
+    """
+    items = panel.items() if isinstance(panel, dict) else panel
+    if executor is None:
+        for symbol, data in items:
+            for result in iter_compute(data, specs, tail, compact, group_size):
+                yield symbol, result
+        return
+    groups = _groups(specs, group_size)
+    tasks = ((symbol, data, group) for symbol, data in items for group in groups)
+    max_pending = max(int(max_pending or 2 * (os.cpu_count() or 1)), 1)
+    # futures in submission order (dicts keep insertion order)
+    pending = {}
+    try:
+        while True:
+            for symbol, data, group in tasks:
+                pending[executor.submit(compute, data, group, tail, compact)] = symbol
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                return
+            if ordered:
+                done = [next(iter(pending))]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                symbol = pending.pop(future)
+                yield symbol, future.result()
+    finally:
+        # consumer stopped early or a result failed
+        for future in pending:
+            future.cancel()
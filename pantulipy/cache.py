@@ -0,0 +1,297 @@
+# -*- coding:utf-8 -*-
+"""
+    Content addressed on disk cache for pantulipy indicators results.
+
+    Results are stored as ".npy" files (one row per indicator output) next to a JSON metadata file and are
+    opened memory mapped, so any process in the same host reads them without recomputing or copying.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import types
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import core
+
+__all__ = ['IndicatorCache']
+
+try:
+    _TULIPY_VERSION = metadata.version('newtulipy')
+except metadata.PackageNotFoundError:
+    _TULIPY_VERSION = None
+
+
+def _fingerprint(arrays, rows):
+    """
+    Input data fingerprint for the first "rows" rows of each input array.
+
+    :param np.ndarray arrays: indicator input arrays (one row per "Tulipy" input).
+    :param int rows: number of rows to include.
+    :return str: hexadecimal digest.
+    """
+    digest = hashlib.blake2b(str(rows).encode(), digest_size=20)
+    for arr in arrays:
+        digest.update(np.ascontiguousarray(arr[:rows], dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def _update_identity(digest, value, seen):
+    """
+    Feed a value an indicator kernel depends on (code, constants, defaults, closure cells or referenced globals)
+    into a digest.
+
+    :param digest: a "hashlib" object.
+    :param value: the value.
+    :param set seen: ids of the functions already fed (recursive and mutually recursive functions).
+    :return bool: False when the value has no stable identity (like an arbitrary object).
+    """
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        digest.update(f'{type(value).__name__}:{value!r};'.encode())
+        return True
+    if isinstance(value, (tuple, list, frozenset, set)):
+        items = sorted(value, key=repr) if isinstance(value, (frozenset, set)) else value
+        digest.update(f'{type(value).__name__}:{len(items)};'.encode())
+        return all(_update_identity(digest, item, seen) for item in items)
+    if isinstance(value, dict):
+        digest.update(f'dict:{len(value)};'.encode())
+        return all(_update_identity(digest, k, seen) and _update_identity(digest, v, seen)
+                   for k, v in sorted(value.items(), key=lambda item: repr(item[0])))
+    if isinstance(value, np.ndarray):
+        digest.update(f'ndarray:{value.dtype.str}:{value.shape};'.encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+        return True
+    if isinstance(value, types.CodeType):
+        digest.update(value.co_code)
+        digest.update(repr(value.co_names).encode())
+        return _update_identity(digest, value.co_consts, seen)
+    # Numba dispatchers keep the Python function as "py_func"
+    value = getattr(value, 'py_func', value)
+    if isinstance(value, types.FunctionType):
+        digest.update(f'function:{value.__module__}.{value.__qualname__};'.encode())
+        if id(value) in seen:
+            return True
+        seen.add(id(value))
+        cells = [cell.cell_contents for cell in value.__closure__ or ()]
+        return all(_update_identity(digest, item, seen) for item in
+                   (value.__code__, value.__defaults__, value.__kwdefaults__, cells, _globals(value)))
+    if isinstance(value, (types.ModuleType, types.BuiltinFunctionType, type, np.ufunc)):
+        # library code, identified by name (changes come with library versions)
+        name = value.__name__ if isinstance(value, (types.ModuleType, np.ufunc)) else value.__qualname__
+        digest.update(f'{type(value).__name__}:{getattr(value, "__module__", None)}.{name};'.encode())
+        return True
+    return False
+
+
+def _globals(fn):
+    """
+    Module globals a function (and the functions its code defines) refers to.
+    """
+    names, codes = set(), [fn.__code__]
+    while codes:
+        code = codes.pop()
+        names.update(code.co_names)
+        codes.extend(const for const in code.co_consts if isinstance(const, types.CodeType))
+    return {name: fn.__globals__[name] for name in names if name in fn.__globals__}
+
+
+def _kernel_identity(name):
+    """
+    Identity of the code computing an indicator, so results of a re-registered (changed) user defined indicator or of
+    another "Tulipy" version are never served from older cache entries.
+
+    User defined kernels are identified by their code, defaults, closure cells and referenced globals.
+
+    :param str name: indicator name.
+    :return list: JSON serializable kernel identity, None when it cannot be established (like for kernels
+        referring to arbitrary objects whose state can change).
+    """
+    plugin = core._PLUGINS.get(name)
+    if plugin is None:
+        return ['tulipy', _TULIPY_VERSION, name]
+    fn = plugin.kernel
+    digest = hashlib.blake2b(digest_size=12)
+    if not _update_identity(digest, fn, set()):
+        return None
+    return ['plugin', getattr(fn, '__module__', None), getattr(fn, '__qualname__', repr(fn)), digest.hexdigest(),
+            plugin.inputs, plugin.options, plugin.outputs]
+
+
+def _atomic_write(path, writer):
+    """
+    Write a file by renaming a fully written temporary file from the same directory.
+
+    :param Path path: destination file path.
+    :param function writer: callable receiving an open binary file object.
+    """
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix='.tmp-', suffix=path.suffix)
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            writer(fp)
+        os.replace(tmp, str(path))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class IndicatorCache:
+    """
+    Persistent indicators results cache keyed by indicator name, params and input data fingerprint.
+
+    >>> cache = IndicatorCache('/var/cache/pantulipy', max_bytes=2 ** 30)
+    >>> rsi = cache.compute('rsi', ohlc, 14)
+    """
+
+    def __init__(self, path, max_bytes=2 ** 30):
+        """
+        Constructor.
+
+        :param str path: cache root directory (created if missing).
+        :param int max_bytes: maximum cache size, least recently used entries are removed above it.
+        """
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _entries(self):
+        return [f for f in self.path.glob('*/*.npy') if not f.name.startswith('.')]
+
+    def _family(self, name, params):
+        identity = _kernel_identity(name)
+        if identity is None:
+            return None
+        key = json.dumps([name, [repr(p) for p in params], identity])
+        return self.path / hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+    def _load(self, entry, index):
+        meta = json.loads(entry.with_suffix('.json').read_text())
+        block = np.load(str(entry), mmap_mode='r')
+        os.utime(str(entry))
+        if len(meta['columns']) == 1:
+            return pd.Series(block[0], index=index, name=meta['columns'][0], copy=False)
+        return pd.DataFrame(block.T, index=index, columns=meta['columns'], copy=False)
+
+    def _store(self, family, key, name, params, block, columns, start):
+        family.mkdir(exist_ok=True)
+        entry = family / f'{key}.npy'
+        _atomic_write(entry, lambda fp: np.save(fp, np.ascontiguousarray(block)))
+        meta = {'name': name, 'params': [repr(p) for p in params], 'rows': block.shape[1], 'key': key,
+                'columns': list(columns), 'start': start}
+        _atomic_write(entry.with_suffix('.json'), lambda fp: fp.write(json.dumps(meta).encode()))
+        self.evict(keep=entry)
+        return entry
+
+    def _extend(self, family, name, params, arrays, data):
+        """
+        Look for a cached result computed over a prefix of data and only compute the new rows.
+
+        Only windowed indicators are extended, any other indicator carries state from the first bar.
+        """
+        if name not in core._WINDOWED_INDICATORS:
+            return None
+        rows = arrays.shape[1]
+        for meta_file in family.glob('*.json'):
+            try:
+                meta = json.loads(meta_file.read_text())
+                if not meta['start'] < meta['rows'] < rows or meta['key'] != _fingerprint(arrays, meta['rows']):
+                    continue
+                old = np.load(str(meta_file.with_suffix('.npy')), mmap_mode='r')
+            except (OSError, ValueError, KeyError):
+                continue
+            if np.isnan(old[:, -1]).any():
+                continue
+            tail = getattr(core, name)(data.iloc[meta['rows'] - meta['start']:], *params)
+            tail = np.atleast_2d(tail.to_numpy().T)[:, -(rows - meta['rows']):]
+            block = np.concatenate([old, tail], axis=1)
+            key = _fingerprint(arrays, rows)
+            entry = self._store(family, key, name, params, block, meta['columns'], meta['start'])
+            for stale in (meta_file, meta_file.with_suffix('.npy')):
+                try:
+                    stale.unlink()
+                except FileNotFoundError:
+                    pass
+            return entry
+        return None
+
+    def compute(self, name, data, *args, **kwargs):
+        """
+        Get an indicator result from cache or compute and store it.
+
+        :param str name: indicator name (any pantulipy indicator function name).
+        :param data: a DataFrame instance with data columns (open, high, low, close, volume) or a Series.
+        :param args: indicator positional params.
+        :param kwargs: indicator key pair params.
+        :return pd.Series or pd.DataFrame: indicator results backed by a read only memory mapped array (computed
+            without caching for user defined indicators whose identity cannot be established, see
+            "_kernel_identity").
+        """
+        params = core._indicator_params(name, *args, **kwargs)
+        arrays = np.asarray(core._get_ohlcv_arrays(core._kernel(name), data), dtype=np.float64)
+        family = self._family(name, params)
+        if family is None:
+            return core._wrap(name, core._kernel(name)(*arrays, *params), data.index)
+        key = _fingerprint(arrays, arrays.shape[1])
+        entry = family / f'{key}.npy'
+        if entry.with_suffix('.json').exists():
+            try:
+                return self._load(entry, data.index)
+            except (OSError, ValueError):
+                pass
+        extended = self._extend(family, name, params, arrays, data)
+        if extended is not None:
+            return self._load(extended, data.index)
+        raw = core._kernel(name)(*arrays, *params)
+        start = arrays.shape[1] - len(raw[0] if type(raw) == tuple else raw)
+        result = core._wrap(name, raw, data.index)
+        columns = [result.name] if isinstance(result, pd.Series) else result.columns
+        entry = self._store(family, key, name, params, np.atleast_2d(result.to_numpy().T), columns, start)
+        return self._load(entry, data.index)
+
+    def size(self):
+        """
+        Current cache size.
+
+        :return int: cached ".npy" files size in bytes.
+        """
+        return sum(f.stat().st_size for f in self._entries())
+
+    def evict(self, keep=None):
+        """
+        Remove least recently used entries until cache size fits "max_bytes".
+
+        :param Path keep: an entry never removed (the one just stored).
+        """
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if entry == keep:
+                continue
+            if total <= self.max_bytes:
+                break
+            for f in (entry.with_suffix('.json'), entry):
+                try:
+                    f.unlink()
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def clear(self):
+        """
+        Remove every cache entry.
+        """
+        for f in self._entries() + [e.with_suffix('.json') for e in self._entries()]:
+            try:
+                f.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,258 @@
+# -*- coding:utf-8 -*-
+"""
+    Command line batch precomputation of indicators over many OHLCV files.
+
+        python -m pantulipy 'data/*.parquet' --specs indicators.yaml --output features/ --workers 8
+
+    Each input file (Parquet or CSV, one symbol per file) is computed in a processes pool through the batch path and
+    written as "<output>/symbol=<file stem>/part-0.parquet" (a Hive partitioned dataset), so files stems must be
+    unique. Outputs are written atomically with a digest of the specs and options used, so an interrupted run is
+    resumed by running it again: files with an output newer than the input and computed with the same specs and
+    options are skipped.
+
+    Spec files (JSON or YAML) are a list of indicators specs or a mapping with an "indicators" list:
+
+        indicators:
+          - rsi
+          - [sma, 50]
+          - {name: macd, short_period: 12, long_period: 26, signal_period: 9}
+"""
+import argparse
+import glob
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import pandas as pd
+
+from . import batch, core
+
+__all__ = ['load_specs', 'process_file', 'run', 'main']
+
+_TIME_COLUMNS = ['timestamp', 'datetime', 'date', 'time']
+
+
+def load_specs(path):
+    """
+    Load indicators specs from a JSON or YAML file.
+
+    :param str path: spec file path (".yaml" / ".yml" files need PyYAML installed).
+    :return list: normalized indicators specs.
+    """
+    path = Path(path)
+    text = path.read_text()
+    if path.suffix.lower() in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError('PyYAML is required for YAML spec files (pip install pyyaml)') from None
+        content = yaml.safe_load(text)
+    else:
+        content = json.loads(text)
+    if isinstance(content, dict):
+        content = content['indicators']
+    return [core._parse_spec(tuple(spec) if isinstance(spec, list) else spec) for spec in content]
+
+
+def _read(path):
+    """
+    Read an OHLCV file (lower cased columns, time column as index when there is one).
+    """
+    if path.suffix.lower() == '.parquet':
+        data = pd.read_parquet(path)
+    else:
+        data = pd.read_csv(path)
+    data.columns = [str(c).lower() for c in data.columns]
+    for column in _TIME_COLUMNS:
+        if column in data.columns:
+            if path.suffix.lower() != '.parquet':
+                data[column] = pd.to_datetime(data[column])
+            data = data.set_index(column)
+            break
+    return data
+
+
+def _output_path(output, path):
+    return Path(output) / f'symbol={path.stem}' / 'part-0.parquet'
+
+
+def _digest_path(target):
+    # a leading "." keeps it out of Parquet datasets readers
+    return target.with_name(f'.{target.name}.digest')
+
+
+def _digest(specs, tail=None, include_input=False):
+    """
+    Digest of the specs and options an output is computed with.
+
+    Specs are normalized first, so equivalent specs (like "rsi", ("rsi", 14) or ("rsi", {"period": 14})) give the
+    same digest.
+    """
+    options = json.dumps([repr([core._parse_spec(tuple(spec) if isinstance(spec, list) else spec) for spec in specs]),
+                          tail, include_input])
+    return hashlib.sha256(options.encode()).hexdigest()
+
+
+def _up_to_date(target, path, digest):
+    digest_path = _digest_path(target)
+    return (target.exists() and target.stat().st_mtime >= path.stat().st_mtime and digest_path.exists()
+            and digest_path.read_text() == digest)
+
+
+def _write_atomic(target, write):
+    tmp = target.with_name(f'.{target.name}.{os.getpid()}.tmp')
+    try:
+        write(tmp)
+        os.replace(tmp, target)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _check_stems(paths):
+    """
+    Raise a ValueError if two input files would be written to the same output partition.
+    """
+    stems = {}
+    for path in paths:
+        stems.setdefault(path.stem, []).append(str(path))
+    duplicates = {stem: files for stem, files in stems.items() if len(files) > 1}
+    if duplicates:
+        listing = '; '.join(f'{stem}: {", ".join(files)}' for stem, files in sorted(duplicates.items()))
+        raise ValueError(f'Input files with the same name would write the same output partition ({listing})')
+
+
+def process_file(path, output, specs, tail=None, include_input=False):
+    """
+    Compute indicators specs over an OHLCV file and write them as a Parquet partition.
+
+    :param str path: input Parquet or CSV file.
+    :param str output: output dataset root directory.
+    :param list specs: indicators specs.
+    :param int tail: compute and write only the last "tail" rows.
+    :param bool include_input: write input columns next to indicators columns.
+    :return int: number of rows written.
+    """
+    path = Path(path)
+    data = _read(path)
+    result = batch.compute(data, specs, tail)
+    if include_input:
+        result = pd.concat([data.iloc[len(data) - len(result):], result], axis=1)
+    target = _output_path(output, path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    _write_atomic(target, result.to_parquet)
+    # written last: an output without a matching digest is never considered up to date
+    _write_atomic(_digest_path(target), lambda tmp: tmp.write_text(_digest(specs, tail, include_input)))
+    return len(result)
+
+
+def _import_modules(modules):
+    # plugins registration modules (see "pantulipy.plugins")
+    for module in modules:
+        importlib.import_module(module)
+
+
+def run(patterns, specs, output, workers=None, tail=None, include_input=False, overwrite=False, modules=(),
+        log=print):
+    """
+    Compute indicators specs over every file matching patterns.
+
+    At most twice "workers" files are in flight (read, computed or written) at any time, so memory is bounded by the
+    largest files and not by the number of files.
+
+    :param list patterns: input files glob patterns ("**" is recursive).
+    :param list specs: indicators specs.
+    :param str output: output dataset root directory.
+    :param int workers: processes pool size (CPU count by default, 1 computes in this process).
+    :param int tail: compute and write only the last "tail" rows of each file.
+    :param bool include_input: write input columns next to indicators columns.
+    :param bool overwrite: recompute files with an up to date output (outputs computed with other specs or options
+        are always recomputed).
+    :param list modules: modules imported in every worker before computing (like plugins registration modules).
+    :param function log: progress and summary messages sink.
+    :return dict: files (done, skipped and failed), rows, elapsed seconds, rows/s and files/s and failures.
+    :raise ValueError: when two input files have the same name (stem), as both would write the same partition.
+    """
+    paths = sorted({Path(p) for pattern in patterns for p in glob.glob(pattern, recursive=True)})
+    _check_stems(paths)
+    # user defined indicators specs are parsed (digest) and computed (single worker) in this process too
+    _import_modules(modules)
+    digest = _digest(specs, tail, include_input)
+    todo = [p for p in paths if overwrite or not _up_to_date(_output_path(output, p), p, digest)]
+    summary = {'files': len(paths), 'done': 0, 'skipped': len(paths) - len(todo), 'failed': 0, 'rows': 0,
+               'failures': {}}
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    def collect(path, rows=None, error=None):
+        if error is None:
+            summary['done'] += 1
+            summary['rows'] += rows
+        else:
+            summary['failed'] += 1
+            summary['failures'][str(path)] = f'{type(error).__name__}: {error}'
+            log(f'failed {path}: {summary["failures"][str(path)]}')
+
+    if workers == 1:
+        for path in todo:
+            try:
+                collect(path, process_file(path, output, specs, tail, include_input))
+            except Exception as error:
+                collect(path, error=error)
+    else:
+        pending = {}
+        with ProcessPoolExecutor(workers, initializer=_import_modules, initargs=(list(modules),)) as executor:
+            queue = iter(todo)
+            while True:
+                for path in queue:
+                    pending[executor.submit(process_file, path, output, specs, tail, include_input)] = path
+                    if len(pending) >= 2 * workers:
+                        break
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        collect(path, future.result())
+                    except Exception as error:
+                        collect(path, error=error)
+    elapsed = time.perf_counter() - start
+    summary.update(elapsed=elapsed, rows_per_second=summary['rows'] / elapsed if elapsed else 0.,
+                   files_per_second=summary['done'] / elapsed if elapsed else 0.)
+    log(f'{summary["done"]} files done, {summary["skipped"]} skipped, {summary["failed"]} failed, '
+        f'{summary["rows"]} rows in {elapsed:.2f}s ({summary["rows_per_second"]:,.0f} rows/s, '
+        f'{summary["files_per_second"]:.2f} files/s)')
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pantulipy',
+                                     description='Precompute indicators over many OHLCV files (Parquet or CSV).')
+    parser.add_argument('inputs', nargs='+', help='input files glob patterns ("**" is recursive)')
+    parser.add_argument('-s', '--specs', required=True, help='indicators spec file (JSON or YAML)')
+    parser.add_argument('-o', '--output', required=True, help='output Parquet dataset directory')
+    parser.add_argument('-w', '--workers', type=int, help='worker processes (default: CPU count)')
+    parser.add_argument('--tail', type=int, help='compute and write only the last TAIL rows of each file')
+    parser.add_argument('--include-input', action='store_true', help='write input columns too')
+    parser.add_argument('--overwrite', action='store_true', help='recompute files with an up to date output')
+    parser.add_argument('--import', dest='modules', action='append', default=[], metavar='MODULE',
+                        help='module to import first, like user defined indicators registration (repeatable)')
+    args = parser.parse_args(argv)
+    _import_modules(args.modules)
+    specs = load_specs(args.specs)
+    try:
+        summary = run(args.inputs, specs, args.output, args.workers, args.tail, args.include_input, args.overwrite,
+                      args.modules)
+    except ValueError as error:
+        parser.error(str(error))
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
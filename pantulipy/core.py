@@ -1,4 +1,6 @@
 # -*- coding:utf-8 -*-
+import datetime
+import functools
 import inspect as insp
 
 import numpy as np
@@ -13,6 +15,25 @@ _FUNCTIONS_REFERENCES = {fn: n for n, fn in enumerate(_FUNCS)}
 # These don't have useful default params we can put in.
 _DEFAULTLESS_INDICATORS = ['decay', 'edecay', 'lag', 'volatility']
 
+# Indicators grouped by how far back a single output value depends on its input.
+# Windowed ones only look at the last (warm-up + 1) bars, recursive ones carry
+# smoothed state from every previous bar and cumulative ones are anchored on the first bar
+# ("tr" has no warm-up but its first value has no previous close, so it is anchored too).
+_WINDOWED_INDICATORS = ['ao', 'aroon', 'aroonosc', 'avgprice', 'bbands', 'bop', 'cci', 'cmo', 'crossany', 'crossover',
+                        'dpo', 'emv', 'fosc', 'hma', 'lag', 'linreg', 'linregintercept', 'linregslope', 'marketfi',
+                        'md', 'mfi', 'mom', 'msw', 'qstick', 'roc', 'rocr', 'sma', 'stderr', 'stoch', 'trima', 'tsf',
+                        'typprice', 'ultosc', 'vhf', 'volatility', 'vosc', 'vwma', 'wcprice', 'willr', 'wma']
+_RECURSIVE_INDICATORS = ['adosc', 'adx', 'adxr', 'apo', 'atr', 'cvi', 'decay', 'dema', 'di', 'dm', 'dx', 'edecay',
+                         'ema', 'fisher', 'kama', 'kvo', 'macd', 'mass', 'natr', 'ppo', 'psar', 'rsi', 'tema', 'trix',
+                         'vidya', 'wilders', 'zlema']
+_CUMULATIVE_INDICATORS = ['ad', 'nvi', 'obv', 'pvi', 'tr', 'wad']
+
+# Compact dtypes for discrete or bounded outputs (used with "compact=True").
+_COMPACT_DTYPES = {'crossany': np.bool_, 'crossover': np.bool_, 'aroon': np.float32, 'aroonosc': np.float32}
+
+# User defined indicators kernels by name (see "pantulipy.plugins.register").
+_PLUGINS = {}
+
 __all__ = ['ad', 'adosc', 'adx', 'adxr', 'ao', 'apo', 'aroon', 'aroonosc', 'atr', 'avgprice', 'bbands', 'bop', 'cci',
            'cmo', 'crossany', 'crossover', 'cvi', 'decay', 'dema', 'di', 'dm', 'dpo', 'dx', 'edecay', 'ema', 'emv',
            'fisher', 'fosc', 'hma', 'kama', 'kvo', 'lag', 'linreg', 'linregintercept', 'linregslope', 'macd',
@@ -34,58 +55,398 @@ _fx_column_names = {
 InvalidOptionError = tulipy.InvalidOptionError
 
 
-def _get_ohlcv_arrays(fn, ohlc):
+def _kernel(name):
+    """
+    Indicator kernel by name, a "Tulipy" function or a registered user defined indicator with the same interface.
+
+    :param str name: indicator name.
+    :return: a callable with "inputs", "options" and "outputs" attributes.
+    """
+    plugin = _PLUGINS.get(name)
+    return plugin if plugin is not None else getattr(tulipy, name)
+
+
+def _frame_kind(ohlc):
+    """
+    Detect the input data library without importing optional dependencies.
+
+    :param ohlc: input data (pandas, polars or pyarrow object, numpy array or a dict of numpy arrays).
+    :return str: one of "pandas", "polars", "polars-lazy", "arrow" or "numpy".
+    """
+    if isinstance(ohlc, (dict, np.ndarray)):
+        return 'numpy'
+    module = type(ohlc).__module__.split('.')[0]
+    if module == 'polars':
+        return 'polars-lazy' if type(ohlc).__name__ == 'LazyFrame' else 'polars'
+    if module == 'pyarrow':
+        return 'arrow'
+    return 'pandas'
+
+
+def _is_series(ohlc):
+    kind = _frame_kind(ohlc)
+    if kind == 'arrow':
+        return type(ohlc).__name__ not in ('Table', 'RecordBatch')
+    if kind == 'numpy':
+        return isinstance(ohlc, np.ndarray)
+    return isinstance(ohlc, pd.Series) or type(ohlc).__name__ == 'Series'
+
+
+def _as_float_array(column):
+    """
+    A float64 numpy array from a pandas, polars or pyarrow column, zero copy when buffers allow it.
+
+    :param column: a pandas Series, polars Series, pyarrow Array, pyarrow ChunkedArray or numpy array.
+    :return np.ndarray: a 1 dimension float64 array.
+    """
+    kind = _frame_kind(column)
+    if kind == 'numpy':
+        return np.ascontiguousarray(column, dtype=np.float64)
+    if kind == 'arrow':
+        if type(column).__name__ == 'ChunkedArray':
+            if column.num_chunks != 1:
+                return np.asarray(column.to_numpy(), dtype=np.float64)
+            column = column.chunk(0)
+        return np.asarray(column.to_numpy(zero_copy_only=column.null_count == 0 and
+                                          str(column.type) == 'double'), dtype=np.float64)
+    # strided views (like reversed or stepped frames) are copied, "Tulipy" needs C contiguous inputs
+    return np.ascontiguousarray(column.to_numpy(), dtype=np.float64)
+
+
+def _input_names(fn):
+    """
+    Input data column names of a "Tulipy" function ("real" inputs are mapped to "close").
+
+    :param function fn: the "Tulipy" function.
+    :return list: column names in "Tulipy" input order.
+    """
     sign = list(insp.signature(fn).parameters.keys())
-    params = ['close' if 'real' in p else p
-              for p in sign if p in _OHLCV or 'real' in p]
-    if isinstance(ohlc, pd.Series):
+    return ['close' if 'real' in p else p
+            for p in sign if p in _OHLCV or 'real' in p]
+
+
+def _stage_columns(ohlc, names):
+    """
+    Extract input columns once as float64 numpy arrays.
+
+    :param ohlc: a pandas, polars or pyarrow DataFrame (Table) or a single Series (Array) used for any name.
+    :param list names: column names to extract.
+    :return dict: column names as keys and 1 dimension float64 arrays as values.
+    """
+    if _is_series(ohlc):
+        arr = _as_float_array(ohlc)
+        return {name: arr for name in names}
+    names = list(dict.fromkeys(names))
+    kind = _frame_kind(ohlc)
+    if kind == 'polars-lazy':
+        ohlc = ohlc.select(names).collect()
+    if kind in ('pandas', 'numpy'):
+        return {name: _as_float_array(ohlc[name]) for name in names}
+    elif kind == 'arrow':
+        return {name: _as_float_array(ohlc.column(name)) for name in names}
+    return {name: _as_float_array(ohlc.get_column(name)) for name in names}
+
+
+def _get_ohlcv_arrays(fn, ohlc):
+    params = _input_names(fn)
+    if _is_series(ohlc):
         assert len(params) == 1, \
-            ('{} requires pd.DataFrame with columns {}, not pd.Series'
+            ('{} requires a DataFrame with columns {}, not a Series'
              .format(fn.__name__, params))
-        return np.asarray([ohlc.values])
+    staged = _stage_columns(ohlc, params)
+    return [staged[p] for p in params]
+
+
+@functools.lru_cache(maxsize=None)
+def _signature(name):
+    return insp.signature(globals()[name])
+
+
+def _indicator_params(name, *args, **kwargs):
+    """
+    Bind positional and key pair params to a pantulipy indicator signature filling defaults.
+
+    :param str name: indicator name (any item of __all__).
+    :param args: indicator positional params.
+    :param kwargs: indicator key pair params.
+    :return tuple: indicator params in signature order.
+    """
+    bound = _signature(name).bind(None, *args, **kwargs)
+    bound.apply_defaults()
+    bound.arguments.pop('compact', None)
+    return tuple(bound.arguments.values())[1:]
+
+
+def _parse_spec(spec):
+    """
+    Normalize an indicator spec to its name and bound params.
+
+    Accepted specs: "rsi", ("rsi", 14), ("macd", 12, 26, {"signal_period": 9}), {"name": "rsi", "period": 14}
+    or an already normalized ("rsi", (14,)) spec.
+
+    :param spec: indicator spec.
+    :return tuple: indicator name and params tuple (signature order, defaults filled).
+    """
+    kwargs = {}
+    if isinstance(spec, str):
+        name, args = spec, []
+    elif isinstance(spec, dict):
+        kwargs = dict(spec)
+        name, args = kwargs.pop('name'), []
+    elif len(spec) == 2 and isinstance(spec[1], tuple):
+        name, args = spec[0], spec[1]
     else:
-        return ohlc[params].T.values
+        name, *args = spec
+        if args and isinstance(args[-1], dict):
+            kwargs = args.pop()
+    if name not in __all__:
+        raise ValueError(f'Unknown indicator "{name}"')
+    return name, _indicator_params(name, *args, **kwargs)
+
+
+def _spec_columns(name, params):
+    """
+    Result column names for an indicator spec, params are appended so different specs never collide.
+
+    :param str name: indicator name.
+    :param tuple params: indicator params.
+    :return list: column names (one per indicator output).
+    """
+    suffix = ''.join(f'_{p}' for p in params)
+    names = _output_names(name, len(_kernel(name).outputs))
+    if len(names) == 1:
+        return [f'{name}{suffix}']
+    return [f'{name}{suffix}_{n[len(name) + 1:]}' for n in names]
+
+
+def _run_kernel(name, params, staged):
+    """
+    Call a "Tulipy" function over already staged input columns.
 
+    :param str name: indicator name.
+    :param tuple params: indicator params.
+    :param dict staged: input column names as keys and float64 arrays as values (see "_stage_columns").
+    :return tuple: unpadded output arrays.
+    """
+    fn = _kernel(name)
+    data = fn(*[staged[c] for c in _input_names(fn)], *params)
+    return data if type(data) == tuple else (data,)
+
+
+@functools.lru_cache(maxsize=4096)
+def _warmup(name, params):
+    """
+    Number of leading input rows without an indicator value ("Tulipy" start offset).
+
+    It only depends on indicator options, so it is measured once over synthetic data long enough for them.
 
-def _tup(fn, ohlc, *args, **kwargs):
+    :param str name: indicator name.
+    :param tuple params: indicator params.
+    :return int: warm-up rows.
+    """
+    if name in _PLUGINS:
+        return _PLUGINS[name].lookback(*params)
+    fn = getattr(tulipy, name)
+    num_rows = 64
+    while True:
+        probe = np.linspace(1., 2., num_rows)
+        try:
+            data = fn(*[probe] * len(_input_names(fn)), *params)
+        except InvalidOptionError:
+            if num_rows >= 2 ** 22:
+                raise
+            num_rows *= 4
+            continue
+        return num_rows - len(data[0] if type(data) == tuple else data)
+
+
+def _tup(fn, ohlc, *args, compact=False, **kwargs):
     """
     Calculate any function from "Tulipy" library from a OHLC Pandas DataFrame.
 
+    Polars (eager or lazy) and PyArrow inputs are also accepted and results are returned as the same library type,
+    numpy arrays and dicts of numpy arrays (like bars from "pantulipy.bars") are returned as numpy arrays.
+
     :param function fn: the "Tulipy" function to call
     :param pd.DataFrame ohlc: a Pandas DataFrame type with open, high, low, close and or volume columns.
     :param args: function positional params.
+    :param bool compact: return discrete or bounded outputs with compact dtypes and warm-up rows as missing values.
     :param kwargs: function key pair params.
     :return pd.Series or List(pd.Series, ...): a Pandas Series with data result or
         a tuple of pd.series.
     """
     fn_params = list(args) + list(kwargs.values())
-    fn_name = fn.__name__.upper()
-    data = fn(*_get_ohlcv_arrays(fn, ohlc), *fn_params)
-
-    if data is not None:
-        if type(data) == tuple:
-            data_tmp = pd.DataFrame()
-            i = 0
-            for arr in data:
-                num_rows = len(ohlc) - len(arr)
-                result = list((np.nan,) * num_rows) + arr.tolist()
-                suffix = _fx_column_names[fn_name][i] if fn_name in _fx_column_names.keys(
-                ) else i
-                data_tmp = pd.concat([
-                    data_tmp,
-                    pd.Series(result,
-                              index=ohlc.index,
-                              name=f'{fn_name.lower()}_{suffix.lower()}').bfill()
-                ], axis=1)
-                i += 1
-            data = data_tmp.copy()
+    if fn_params and isinstance(fn_params[0], (str, datetime.timedelta, np.timedelta64)):
+        # duration windows (like "30min") over a DatetimeIndex
+        from . import duration
+        return duration.compute(fn.__name__, ohlc, *fn_params)
+    arrays = _get_ohlcv_arrays(fn, ohlc)
+    data = fn(*arrays, *fn_params)
+    kind = _frame_kind(ohlc)
+    if kind == 'pandas':
+        return _wrap(fn.__name__, data, ohlc.index, compact)
+    return _wrap_native(fn.__name__, data, len(arrays[0]), kind, compact)
+
+
+def _output_names(fn_name, num_outputs):
+    """
+    Result column names used by pantulipy for a "Tulipy" function.
+
+    :param str fn_name: "Tulipy" function name.
+    :param int num_outputs: number of arrays returned by the "Tulipy" function.
+    :return list: a list of column names.
+    """
+    fn_name = fn_name.upper()
+    if num_outputs == 1:
+        return [fn_name.lower()]
+    suffixes = _fx_column_names.get(fn_name, [str(i) for i in range(num_outputs)])
+    return [f'{fn_name.lower()}_{suffix.lower()}' for suffix in suffixes]
+
+
+def _bfill(arr):
+    """
+    Numpy version of pandas "bfill" (each NaN takes the next valid value).
+
+    :param np.ndarray arr: a 1 dimension float array (filled in place).
+    :return np.ndarray: the same array.
+    """
+    invalid = np.isnan(arr)
+    if invalid.any():
+        positions = np.where(invalid, len(arr), np.arange(len(arr)))
+        positions = np.minimum.accumulate(positions[::-1])[::-1]
+        fill = invalid & (positions < len(arr))
+        arr[fill] = arr[positions[fill]]
+    return arr
+
+
+def _align(fn_name, data, num_rows, fill=True):
+    """
+    Align "Tulipy" output arrays to input length by NaN padding and back filling warm-up rows.
+
+    :param str fn_name: "Tulipy" function name.
+    :param data: a numpy array or a tuple of numpy arrays as returned by "Tulipy".
+    :param int num_rows: input data length.
+    :param bool fill: back fill warm-up rows, otherwise they are left as NaN (causal results).
+    :return dict: output column names as keys and aligned float64 arrays as values.
+    """
+    outputs = data if type(data) == tuple else (data,)
+    columns = {}
+    for name, arr in zip(_output_names(fn_name, len(outputs)), outputs):
+        result = np.full(num_rows, np.nan)
+        result[num_rows - len(arr):] = arr
+        columns[name] = _bfill(result) if fill else result
+    return columns
+
+
+def _align_compact(fn_name, data, num_rows):
+    """
+    Same as "_align" but discrete or bounded outputs (see "_COMPACT_DTYPES") are cast to compact dtypes and
+    returned as masked arrays, warm-up rows masked instead of back filled.
+
+    :param str fn_name: "Tulipy" function name.
+    :param data: a numpy array or a tuple of numpy arrays as returned by "Tulipy".
+    :param int num_rows: input data length.
+    :return dict: output column names as keys and aligned arrays (masked arrays for compact outputs) as values.
+    """
+    dtype = _COMPACT_DTYPES.get(fn_name.lower())
+    if dtype is None:
+        return _align(fn_name, data, num_rows)
+    outputs = data if type(data) == tuple else (data,)
+    columns = {}
+    for name, arr in zip(_output_names(fn_name, len(outputs)), outputs):
+        values = np.zeros(num_rows, dtype=dtype)
+        values[num_rows - len(arr):] = arr
+        mask = np.zeros(num_rows, dtype=np.bool_)
+        mask[:num_rows - len(arr)] = True
+        columns[name] = np.ma.MaskedArray(values, mask)
+    return columns
+
+
+def _nullable(values, kind):
+    """
+    A masked array as a nullable column of the output library.
+    """
+    if kind == 'pandas':
+        if values.dtype == np.bool_:
+            return pd.arrays.BooleanArray(values.data, np.ma.getmaskarray(values))
+        return pd.arrays.FloatingArray(values.data, np.ma.getmaskarray(values))
+    if kind == 'arrow':
+        import pyarrow as pa
+        return pa.array(values.data, mask=np.ma.getmaskarray(values))
+    return values
+
+
+def _from_columns(columns, kind='pandas', index=None, frame=False):
+    """
+    Build a pandas, polars or pyarrow object from aligned result arrays.
+
+    :param dict columns: column names as keys and aligned arrays as values.
+    :param str kind: output kind as returned by "_frame_kind".
+    :param pd.Index index: index used for pandas results.
+    :param bool frame: return a frame (table) even for a single column.
+    :return: a Series (Array) for a single column or a DataFrame (Table) otherwise (a numpy array or a dict
+        of numpy arrays for "numpy" kind).
+    """
+    frame = frame or len(columns) > 1
+    if kind in ('pandas', 'arrow') and any(np.ma.isMaskedArray(v) for v in columns.values()):
+        columns = {name: _nullable(v, kind) if np.ma.isMaskedArray(v) else v for name, v in columns.items()}
+    if kind == 'numpy':
+        return dict(columns) if frame else next(iter(columns.values()))
+    if kind == 'pandas':
+        if frame:
+            return pd.DataFrame(columns, index=index, copy=False)
+        name, values = next(iter(columns.items()))
+        return pd.Series(values, index=index, name=name, copy=False)
+    if kind == 'arrow':
+        import pyarrow as pa
+        if frame:
+            return pa.table({name: pa.array(values) for name, values in columns.items()})
+        return pa.array(next(iter(columns.values())))
+    import polars as pl
+    series = []
+    for name, values in columns.items():
+        if np.ma.isMaskedArray(values):
+            series.append(pl.Series(name, values.data).scatter(np.flatnonzero(np.ma.getmaskarray(values)), None))
         else:
-            num_rows = len(ohlc) - len(data)
-            result = list((np.nan,) * num_rows) + data.tolist()
-            data = pd.Series(result, index=ohlc.index,
-                             name=fn_name.lower()).bfill()
+            series.append(pl.Series(name, values))
+    if kind == 'polars-lazy':
+        return pl.DataFrame(series).lazy()
+    if frame:
+        return pl.DataFrame(series)
+    return series[0]
 
-    return data
+
+def _wrap(fn_name, data, index, compact=False):
+    """
+    Align "Tulipy" output arrays to index by NaN padding and back filling warm-up rows.
+
+    :param str fn_name: "Tulipy" function name.
+    :param data: a numpy array or a tuple of numpy arrays as returned by "Tulipy".
+    :param pd.Index index: the index of the input data.
+    :param bool compact: use compact dtypes for discrete or bounded outputs (see "_align_compact").
+    :return pd.Series or pd.DataFrame: a Pandas Series or a DataFrame for multiple output functions.
+    """
+    if data is None:
+        return data
+    align = _align_compact if compact else _align
+    return _from_columns(align(fn_name, data, len(index)), 'pandas', index, frame=type(data) == tuple)
+
+
+def _wrap_native(fn_name, data, num_rows, kind, compact=False):
+    """
+    Same as "_wrap" but returning polars or pyarrow objects.
+
+    :param str fn_name: "Tulipy" function name.
+    :param data: a numpy array or a tuple of numpy arrays as returned by "Tulipy".
+    :param int num_rows: input data length.
+    :param str kind: input data kind as returned by "_frame_kind".
+    :param bool compact: use compact dtypes for discrete or bounded outputs (see "_align_compact").
+    :return: a polars Series, DataFrame or LazyFrame, a pyarrow Array or Table, or numpy arrays.
+    """
+    if data is None:
+        return data
+    align = _align_compact if compact else _align
+    return _from_columns(align(fn_name, data, num_rows), kind, frame=type(data) == tuple)
 
 
 def _data_handler(data, ohlc, fn_name):
@@ -177,28 +538,30 @@ def apo(data, short_period=20, long_period=26):
     return _tup(getattr(tulipy, 'apo'), data, short_period, long_period)
 
 
-def aroon(data, period=14):
+def aroon(data, period=14, compact=False):
     """
     Aroon.
     https://tulipindicators.org/aroon
 
     :param pd.DataFrame data: a DataFrame instance with data columns (open, high, low, close, volume).
     :param int period: number of period used for indicators calcs.
+    :param bool compact: return a nullable float32 result with warm-up rows as missing values.
     :return pd.Series: indicator results as pandas Series instance.
     """
-    return _tup(getattr(tulipy, 'aroon'), data, period)
+    return _tup(getattr(tulipy, 'aroon'), data, period, compact=compact)
 
 
-def aroonosc(data, period=14):
+def aroonosc(data, period=14, compact=False):
     """
     Aroon Oscillator.
     https://tulipindicators.org/aroonosc
 
     :param pd.DataFrame data: a DataFrame instance with data columns (open, high, low, close, volume).
     :param int period: number of period used for indicators calcs.
+    :param bool compact: return a nullable float32 result with warm-up rows as missing values.
     :return pd.Series: indicator results as pandas Series instance.
     """
-    return _tup(getattr(tulipy, 'aroonosc'), data, period)
+    return _tup(getattr(tulipy, 'aroonosc'), data, period, compact=compact)
 
 
 def atr(data, period=14):
@@ -287,7 +650,7 @@ def cmo(data, period=14):
     return _tup(getattr(tulipy, 'cmo'), data, period)
 
 
-def crossany(data):
+def crossany(data, compact=False):
     """
     Crossany:
         Crossany is a simple function that indicates when two input arrays cross each other.
@@ -295,12 +658,13 @@ def crossany(data):
     https://tulipindicators.org/crossany
 
     :param pd.DataFrame data: a DataFrame instance with data columns (open, high, low, close, volume).
+    :param bool compact: return a nullable boolean result with warm-up rows as missing values.
     :return pd.Series: indicator results as pandas Series instance.
     """
-    return _tup(getattr(tulipy, 'crossany'), data)
+    return _tup(getattr(tulipy, 'crossany'), data, compact=compact)
 
 
-def crossover(data):
+def crossover(data, compact=False):
     """
     Crossover:
         Crossover is a simple function that indicates when two input arrays crossover each other.
@@ -308,9 +672,10 @@ def crossover(data):
     https://tulipindicators.org/crossover
 
     :param pd.DataFrame data: a DataFrame instance with data columns (open, high, low, close, volume).
+    :param bool compact: return a nullable boolean result with warm-up rows as missing values.
     :return pd.Series: indicator results as pandas Series instance.
     """
-    return _tup(getattr(tulipy, 'crossover'), data)
+    return _tup(getattr(tulipy, 'crossover'), data, compact=compact)
 
 
 def cvi(data, period=14):
@@ -588,7 +953,8 @@ def md(data, period=14):
     https://tulipindicators.org/md
 
     :param pd.DataFrame data: a DataFrame instance with data columns (open, high, low, close, volume).
-    :param int period: number of period used for indicators calcs.
+    :param period: number of period used for indicators calcs, or a duration like "30min" for time based
+        windows over a DatetimeIndex (see "pantulipy.duration").
     :return pd.Series: indicator results as pandas Series instance.
     """
     return _tup(getattr(tulipy, 'md'), data, period)
@@ -600,7 +966,8 @@ def mfi(data, period=14):
     https://tulipindicators.org/mfi
 
     :param pd.DataFrame data: a DataFrame instance with data columns (open, high, low, close, volume).
-    :param int period: number of period used for indicators calcs.
+    :param period: number of period used for indicators calcs, or a duration like "30min" for time based
+        windows over a DatetimeIndex (see "pantulipy.duration").
     :return pd.Series: indicator results as pandas Series instance.
     """
     return _tup(getattr(tulipy, 'mfi'), data, period)
@@ -768,7 +1135,8 @@ def sma(data, period=200):
     https://tulipindicators.org/sma
 
     :param pd.DataFrame data: a DataFrame instance with data columns (open, high, low, close, volume).
-    :param int period: number of period used for indicators calcs.
+    :param period: number of period used for indicators calcs, or a duration like "30min" for time based
+        windows over a DatetimeIndex (see "pantulipy.duration").
     :return pd.Series: indicator results as pandas Series instance.
     """
     return _tup(getattr(tulipy, 'sma'), data, period)
@@ -783,7 +1151,8 @@ def stderr(data, period=50):
     https://tulipindicators.org/stderr
 
     :param pd.DataFrame data: a DataFrame instance with data columns (open, high, low, close, volume).
-    :param int period: number of period used for indicators calcs.
+    :param period: number of period used for indicators calcs, or a duration like "30min" for time based
+        windows over a DatetimeIndex (see "pantulipy.duration").
     :return pd.Series: indicator results as pandas Series instance.
     """
     return _tup(getattr(tulipy, 'stderr'), data, period)
@@ -958,7 +1327,8 @@ def vwma(data, period=100):
     https://tulipindicators.org/vwma
 
     :param pd.DataFrame data: a DataFrame instance with data columns (open, high, low, close, volume).
-    :param int period: number of period used for indicators calcs.
+    :param period: number of period used for indicators calcs, or a duration like "30min" for time based
+        windows over a DatetimeIndex (see "pantulipy.duration").
     :return pd.Series: indicator results as pandas Series instance.
     """
     return _tup(getattr(tulipy, 'vwma'), data, period)
@@ -1006,7 +1376,8 @@ def willr(data, period=14):
     https://tulipindicators.org/willr
 
     :param pd.DataFrame data: a DataFrame instance with data columns (open, high, low, close, volume).
-    :param int period: number of period used for indicators calcs.
+    :param period: number of period used for indicators calcs, or a duration like "30min" for time based
+        windows over a DatetimeIndex (see "pantulipy.duration").
     :return pd.Series: indicator results as pandas Series instance.
     """
     return _tup(getattr(tulipy, 'willr'), data, period)
@@ -1029,7 +1400,8 @@ def wma(data, period=50):
     https://tulipindicators.org/wma
 
     :param pd.DataFrame data: a DataFrame instance with data columns (open, high, low, close, volume).
-    :param int period: number of period used for indicators calcs.
+    :param period: number of period used for indicators calcs, or a duration like "30min" for time based
+        windows over a DatetimeIndex (see "pantulipy.duration").
     :return pd.Series: indicator results as pandas Series instance.
     """
     return _tup(getattr(tulipy, 'wma'), data, period)
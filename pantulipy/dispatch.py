@@ -0,0 +1,319 @@
+# -*- coding:utf-8 -*-
+"""
+    Size aware execution dispatcher.
+
+    Panel jobs (many symbols x many indicators specs) are run serially, over a threads pool or over a processes
+    pool, picking the fastest estimated path from input size, symbols count and indicators cost. Estimates come from
+    a calibration table measured on the target machine with:
+
+        python -m pantulipy.dispatch [--output calibration.json]
+
+    >>> from pantulipy import dispatch
+    >>> decision = dispatch.plan(panel, ['rsi', ('sma', 200)])
+    >>> results = dispatch.compute_panel(panel, ['rsi', ('sma', 200)])
+"""
+import argparse
+import json
+import logging
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import batch, core
+
+__all__ = ['Decision', 'calibrate', 'load_calibration', 'save_calibration', 'plan', 'compute_panel']
+
+log = logging.getLogger(__name__)
+
+STRATEGIES = ['serial', 'threads', 'processes']
+
+#: calibration table file used when no path is given (overridden by the PANTULIPY_CALIBRATION env var).
+DEFAULT_PATH = Path('~/.pantulipy/calibration.json').expanduser()
+
+_DEFAULT_CALIBRATION = {
+    'version': 1,
+    'cpu_count': os.cpu_count() or 1,
+    'default_seconds_per_row': 5e-9,
+    'indicator_seconds_per_row': {},
+    'strategies': {
+        'serial': {'overhead': 0., 'task_overhead': 5e-5, 'speedup': 1.},
+        # no GIL release is assumed for "Tulipy" kernels until calibrated
+        'threads': {'overhead': 1e-3, 'task_overhead': 1e-4, 'speedup': 1.},
+        'processes': {'overhead': 0.2, 'task_overhead': 1e-3, 'speedup': max((os.cpu_count() or 1) * .7, 1.),
+                      'seconds_per_byte': 1e-9}
+    }
+}
+
+_calibration = None
+
+
+class Decision:
+    """
+    A dispatcher decision (strategy, workers and the estimates it was picked from).
+    """
+
+    def __init__(self, strategy, workers, estimates, symbols, rows, work):
+        self.strategy = strategy
+        self.workers = workers
+        self.estimates = estimates
+        self.symbols = symbols
+        self.rows = rows
+        self.work = work
+
+    def as_dict(self):
+        """
+        Decision as a plain dict (for structured logging).
+
+        :return dict: strategy, workers, estimated seconds per strategy, symbols, rows and estimated serial work.
+        """
+        return {'strategy': self.strategy, 'workers': self.workers, 'estimates': dict(self.estimates),
+                'symbols': self.symbols, 'rows': self.rows, 'work': self.work}
+
+    def __repr__(self):
+        estimates = ', '.join(f'{s}={t * 1000:.2f}ms' for s, t in self.estimates.items())
+        return (f'Decision({self.strategy}, workers={self.workers}, symbols={self.symbols}, rows={self.rows}, '
+                f'estimates: {estimates})')
+
+
+def load_calibration(path=None):
+    """
+    Load a calibration table (defaults are used when there is none).
+
+    :param str path: calibration JSON file (PANTULIPY_CALIBRATION env var or "~/.pantulipy/calibration.json").
+    :return dict: calibration table.
+    """
+    global _calibration
+    path = Path(path or os.environ.get('PANTULIPY_CALIBRATION', DEFAULT_PATH))
+    table = json.loads(json.dumps(_DEFAULT_CALIBRATION))
+    if path.exists():
+        loaded = json.loads(path.read_text())
+        table.update({k: v for k, v in loaded.items() if k != 'strategies'})
+        for strategy, values in loaded.get('strategies', {}).items():
+            table['strategies'].setdefault(strategy, {}).update(values)
+    _calibration = table
+    return table
+
+
+def save_calibration(table, path=None):
+    """
+    Save a calibration table.
+
+    :param dict table: calibration table as returned by "calibrate".
+    :param str path: destination file (PANTULIPY_CALIBRATION env var or "~/.pantulipy/calibration.json").
+    :return Path: the written file path.
+    """
+    path = Path(path or os.environ.get('PANTULIPY_CALIBRATION', DEFAULT_PATH))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(table, indent=2, sort_keys=True))
+    return path
+
+
+def _table():
+    return _calibration if _calibration is not None else load_calibration()
+
+
+def _num_rows(data):
+    kind = core._frame_kind(data)
+    if kind == 'numpy' and isinstance(data, dict):
+        return len(next(iter(data.values())))
+    if kind == 'polars-lazy':
+        return 0
+    return len(data)
+
+
+def plan(panel, specs, workers=None, table=None):
+    """
+    Pick the execution strategy for a panel job.
+
+    :param dict panel: symbols as keys and datasets as values (see "batch.compute_panel").
+    :param list specs: indicators specs.
+    :param int workers: maximum pool workers (CPU count by default).
+    :param dict table: calibration table (loaded one by default).
+    :return Decision: the decision, log it or pass it to "compute_panel".
+    """
+    table = table or _table()
+    workers = workers or table.get('cpu_count') or os.cpu_count() or 1
+    specs = [core._parse_spec(spec) for spec in specs]
+    costs = table['indicator_seconds_per_row']
+    spec_cost = sum(costs.get(name, table['default_seconds_per_row']) for name, _ in specs)
+    rows = sum(_num_rows(data) for data in panel.values())
+    symbols = len(panel)
+    work = rows * spec_cost
+    data_bytes = _bytes(panel, specs)
+    estimates = {}
+    for strategy in STRATEGIES:
+        values = table['strategies'][strategy]
+        parallel = 1 if strategy == 'serial' else max(min(workers, symbols), 1)
+        speedup = 1. if parallel == 1 else min(values['speedup'], parallel)
+        estimate = values['overhead'] + values['task_overhead'] * symbols / parallel + work / speedup
+        estimate += values.get('seconds_per_byte', 0.) * data_bytes
+        estimates[strategy] = estimate
+    strategy = min(STRATEGIES, key=lambda s: estimates[s])
+    return Decision(strategy, 1 if strategy == 'serial' else max(min(workers, symbols), 1), estimates, symbols,
+                    rows, work)
+
+
+def _compute_chunk(chunk, specs, tail, compact):
+    return batch.compute_panel(dict(chunk), specs, tail, compact)
+
+
+def compute_panel(panel, specs, tail=None, compact=False, decision=None, workers=None):
+    """
+    Compute many indicators specs over many datasets with the execution path picked by "plan".
+
+    :param dict panel: symbols as keys and datasets as values.
+    :param list specs: indicators specs.
+    :param int tail: compute and return only the last "tail" rows of each dataset.
+    :param bool compact: discrete or bounded outputs with compact nullable dtypes.
+    :param Decision decision: force a decision (see "plan"), a strategy name is also accepted.
+    :param int workers: maximum pool workers.
+    :return dict: symbols as keys and results DataFrames as values (same as "batch.compute_panel").
+    """
+    specs = [core._parse_spec(spec) for spec in specs]
+    if decision is None:
+        decision = plan(panel, specs, workers)
+    elif isinstance(decision, str):
+        decision = Decision(decision, workers or os.cpu_count() or 1, {}, len(panel), None, None)
+    log.debug('%r', decision)
+    if decision.strategy == 'serial' or len(panel) < 2:
+        return batch.compute_panel(panel, specs, tail, compact)
+    items = list(panel.items())
+    if decision.strategy == 'threads':
+        with ThreadPoolExecutor(decision.workers) as executor:
+            results = executor.map(lambda item: (item[0], batch.compute(item[1], specs, tail, compact)), items)
+            return dict(results)
+    chunks = [items[n::decision.workers] for n in range(decision.workers)]
+    results = {}
+    with ProcessPoolExecutor(decision.workers) as executor:
+        for chunk in executor.map(_compute_chunk, chunks, *[[x] * len(chunks) for x in (specs, tail, compact)]):
+            results.update(chunk)
+    return {symbol: results[symbol] for symbol in panel}
+
+
+def _synthetic_panel(symbols, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    panel = {}
+    for n in range(symbols):
+        close = 100. + rng.standard_normal(rows).cumsum()
+        panel[f'S{n}'] = pd.DataFrame({'open': close, 'high': close + 1., 'low': close - 1., 'close': close,
+                                       'volume': rng.random(rows) * 1000.})
+    return panel
+
+
+def _bytes(panel, specs):
+    # input columns sent to and results columns sent back from worker processes
+    columns = len(core._OHLCV) + sum(len(core._kernel(name).outputs) for name, _ in specs)
+    return sum(_num_rows(data) for data in panel.values()) * columns * 8
+
+
+def _best_of(fn, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _echo(payload):
+    return payload
+
+
+def _transfer_seconds_per_byte(payload):
+    """
+    Seconds per byte sent to and back from a worker process, measured through a started pool.
+    """
+    size = len(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+    with ProcessPoolExecutor(1) as executor:
+        executor.submit(_echo, None).result()
+        empty = _best_of(lambda: executor.submit(_echo, None).result())
+        elapsed = _best_of(lambda: executor.submit(_echo, payload).result(), repeat=2)
+    return max(elapsed - empty, 0.) / (2 * size)
+
+
+def _fit(small, large):
+    """
+    Line through two (work, seconds) measures.
+
+    :return tuple: intercept (fixed seconds) and slope (seconds per serial work second).
+    """
+    slope = (large[1] - small[1]) / (large[0] - small[0])
+    return small[1] - slope * small[0], slope
+
+
+def calibrate(rows=100000, workers=None, work=1.):
+    """
+    Measure indicators costs and execution strategies overheads and speedups on this machine.
+
+    Every strategy runs the same specs over two panels (same symbols, 4 times more rows in the second one) worth
+    about "work" seconds of serial computation: speedups come from the elapsed time slope between both panels and
+    fixed costs (pools start-up, per task overhead) from its intercept, so pools start-up noise does not end up in
+    speedups.
+
+    :param int rows: synthetic dataset length used for indicators costs measures.
+    :param int workers: pool workers measured (CPU count by default).
+    :param float work: serial seconds of computation of the largest measured panel.
+    :return dict: calibration table (see "save_calibration").
+    """
+    workers = workers or os.cpu_count() or 1
+    table = json.loads(json.dumps(_DEFAULT_CALIBRATION))
+    table['cpu_count'] = workers
+    data = _synthetic_panel(1, rows)['S0']
+    staged = core._stage_columns(data, core._OHLCV)
+    specs = [core._parse_spec((name, 10) if name in core._DEFAULTLESS_INDICATORS else name) for name in core.__all__]
+    for spec in specs:
+        table['indicator_seconds_per_row'][spec[0]] = _best_of(lambda: batch.compute_arrays(staged, [spec])) / rows
+    costs = table['indicator_seconds_per_row']
+    table['default_seconds_per_row'] = float(np.median(list(costs.values())))
+
+    symbols = 2 * workers
+    large_rows = max(int(work / (sum(costs.values()) * symbols)), 4000)
+    panels = [_synthetic_panel(symbols, large_rows // 4), _synthetic_panel(symbols, large_rows, seed=1)]
+    tiny = _synthetic_panel(2, 1000)
+    works = [sum(costs.values()) * _num_rows(p['S0']) * symbols for p in panels]
+
+    def measures(strategy, transfer=0.):
+        forced = Decision(strategy, workers, {}, symbols, None, None)
+        return [(w, _best_of(lambda: compute_panel(p, specs, decision=forced), repeat=2) - transfer * _bytes(p, specs))
+                for w, p in zip(works, panels)]
+
+    serial = table['strategies']['serial']
+    intercept, serial_slope = _fit(*measures('serial'))
+    serial['task_overhead'] = max(intercept, 0.) / symbols
+    for strategy in STRATEGIES[1:]:
+        values = table['strategies'][strategy]
+        forced = Decision(strategy, workers, {}, len(tiny), None, None)
+        values['overhead'] = _best_of(lambda: compute_panel(tiny, specs, decision=forced), repeat=2)
+        if strategy == 'processes':
+            values['seconds_per_byte'] = _transfer_seconds_per_byte((panels[0], batch.compute_panel(panels[0], specs)))
+        intercept, slope = _fit(*measures(strategy, values.get('seconds_per_byte', 0.)))
+        parallel = max(min(workers, symbols), 1)
+        values['task_overhead'] = max(max(intercept - values['overhead'], 0.) * parallel / symbols,
+                                      serial['task_overhead'])
+        # relative to serial measures, at most one per worker (a flat slope is measures noise)
+        values['speedup'] = max(serial_slope / max(slope, serial_slope / parallel), 1e-3)
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pantulipy.dispatch',
+                                     description='Calibrate pantulipy execution dispatcher on this machine.')
+    parser.add_argument('--output', help=f'calibration file (default: PANTULIPY_CALIBRATION or {DEFAULT_PATH})')
+    parser.add_argument('--rows', type=int, default=100000, help='synthetic dataset length')
+    parser.add_argument('--workers', type=int, help='pool workers (default: CPU count)')
+    parser.add_argument('--work', type=float, default=1., help='serial seconds of the largest measured panel')
+    args = parser.parse_args(argv)
+    table = calibrate(args.rows, args.workers, args.work)
+    path = save_calibration(table, args.output)
+    for strategy, values in table['strategies'].items():
+        print(f'{strategy:>10}: ' + ', '.join(f'{k}={v:.3g}' for k, v in sorted(values.items())))
+    print(f'calibration saved to {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,412 @@
+# -*- coding:utf-8 -*-
+"""
+    Render ready downsampling of OHLCV data and indicators outputs.
+
+    A "Downsampler" keeps every column with a pyramid of blocks minimums and maximums (and their rows), 8 times
+    coarser per level, so a viewport of any length is reduced to a few pixels buckets reading only some blocks per
+    bucket instead of every row. New bars are appended incrementally (only the blocks they complete are built):
+
+    >>> from pantulipy.downsample import Downsampler
+    >>> ds = Downsampler(pd.concat([ohlc, batch.compute(ohlc, [('bbands', 20, 2), 'rsi'])], axis=1))
+    >>> ds.ohlc(1200)  # a bar per pixel (open, high, low, close and volume)
+    >>> ds.envelope(['bbands_20_2_lower', 'bbands_20_2_upper'], 1200, start='2024-01-01')  # min / max per pixel
+    >>> ds.lttb(['rsi_14'], 1200)  # largest triangle three buckets points
+    >>> ds.append(new_bars)
+
+    Every column requested together is reduced over the same buckets (envelopes) or at the same rows (LTTB), so
+    multiple outputs indicators stay aligned. Buckets inner edges are snapped to pyramid blocks of at most a quarter
+    of the bucket width, every row still belongs to exactly one bucket. The pyramid takes about 40% of the raw
+    columns memory.
+
+    Timings over 10M rows and 1500 pixels ("python benchmarks/downsample_viewport.py"): about 2 ms for OHLC bars,
+    4 ms for a 3 columns envelope, 6 ms for a single column LTTB line but 15 ms for 3 columns LTTB lines (known
+    limitation, the selection passes gather and compare candidates of every column).
+"""
+import numpy as np
+import pandas as pd
+
+from . import core
+
+__all__ = ['Downsampler', 'ohlc', 'envelope', 'lttb']
+
+# rows per block of the next pyramid level
+_BRANCHING = 8
+# minimum blocks per bucket (a quarter of the bucket width as maximum edge snapping)
+_BLOCKS_PER_BUCKET = 4
+# LTTB vectorized passes after the first one (changes propagate a bucket per pass, the sequential algorithm points
+# are matched for more than 99% of buckets)
+_LTTB_PASSES = 8
+
+
+def _reserve(array, size):
+    """
+    A buffer with room for "size" items (capacity doubled when grown, so appends are amortized).
+    """
+    if len(array) >= size:
+        return array
+    grown = np.empty(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _blocks(values, rows, maximum):
+    """
+    Extremes of consecutive "_BRANCHING" items and their rows (first occurrence, NaN ignored unless all NaN).
+
+    :param np.ndarray values: items values.
+    :param rows: items rows, or the first item row when items are consecutive rows.
+    :param bool maximum: maximums instead of minimums.
+    :return tuple: extremes and their rows.
+    """
+    shaped = values.reshape(-1, _BRANCHING)
+    filled = shaped
+    if np.isnan(values).any():
+        filled = np.where(np.isnan(shaped), -np.inf if maximum else np.inf, shaped)
+    best = filled.argmax(axis=1) if maximum else filled.argmin(axis=1)
+    blocks = np.arange(len(shaped))
+    if np.ndim(rows) == 0:
+        return shaped[blocks, best], rows + blocks * _BRANCHING + best
+    return shaped[blocks, best], rows.reshape(-1, _BRANCHING)[blocks, best]
+
+
+def _reduce(values, rows, offsets, maximum):
+    """
+    Extremes of "values" segments starting at "offsets" and their rows (-1 for all NaN segments).
+    """
+    ufunc = np.fmax if maximum else np.fmin
+    result = ufunc.reduceat(values, offsets)
+    counts = np.diff(np.append(offsets, len(values)))
+    hits = np.flatnonzero(values == np.repeat(result, counts))
+    owners = np.searchsorted(offsets, hits, side='right') - 1
+    first = np.flatnonzero(np.diff(owners, prepend=-1))
+    positions = np.full(len(offsets), -1, dtype=np.int64)
+    positions[owners[first]] = rows[hits[first]]
+    return result, positions
+
+
+class Downsampler:
+    """
+    Columns with their min / max pyramid for fast viewport downsampling.
+    """
+
+    def __init__(self, data):
+        """
+        Constructor.
+
+        :param data: a DataFrame instance (pandas, polars or pyarrow, or a dict of numpy arrays) with any columns,
+            like OHLCV data and indicators results. A pandas DatetimeIndex is kept for results index and viewports.
+        """
+        self.columns = self._names(data)
+        self._count = 0
+        self._timestamps = None
+        self._tz = None
+        self._unit = 'ns'
+        self._raw = {c: np.empty(0) for c in self.columns}
+        # per column and level: (minimums, minimum rows, maximums, maximum rows)
+        self._levels = {c: [] for c in self.columns}
+        self._volume = np.zeros(1) if 'volume' in self.columns else None
+        if core._frame_kind(data) == 'pandas' and isinstance(data.index, pd.DatetimeIndex):
+            self._timestamps = np.empty(0, dtype=np.int64)
+            self._tz = data.index.tz
+            self._unit = data.index.unit
+        self.append(data)
+
+    @staticmethod
+    def _names(data):
+        if isinstance(data, dict):
+            return [str(c) for c in data]
+        return [str(c) for c in (getattr(data, 'column_names', None) or data.columns)]
+
+    def __len__(self):
+        return self._count
+
+    def append(self, data):
+        """
+        Append rows (same columns as the constructor data) and build the pyramid blocks they complete.
+
+        :param data: a DataFrame instance (same kind as the constructor data).
+        """
+        staged = core._stage_columns(data, self.columns)
+        added = len(next(iter(staged.values()))) if staged else 0
+        if not added:
+            return
+        previous, self._count = self._count, self._count + added
+        if self._timestamps is not None:
+            self._timestamps = _reserve(self._timestamps, self._count)
+            self._timestamps[previous:self._count] = data.index.as_unit('ns').asi8
+        if self._volume is not None:
+            self._volume = _reserve(self._volume, self._count + 1)
+            sums = np.cumsum(np.nan_to_num(staged['volume'])) + self._volume[previous]
+            self._volume[previous + 1:self._count + 1] = sums
+        for column in self.columns:
+            raw = self._raw[column] = _reserve(self._raw[column], self._count)
+            raw[previous:self._count] = staged[column]
+            self._build(column, previous)
+
+    def _build(self, column, previous):
+        levels = self._levels[column]
+        raw = self._raw[column]
+        below = None
+        size = _BRANCHING
+        level = 0
+        while self._count // size:
+            done, complete = previous // size, self._count // size
+            if level == len(levels):
+                levels.append(tuple(np.empty(0, dtype=dtype) for dtype in (np.float64, np.int64) * 2))
+            if complete > done:
+                items = slice(done * _BRANCHING, complete * _BRANCHING)
+                if below is None:
+                    blocks = _blocks(raw[items], items.start, False) + _blocks(raw[items], items.start, True)
+                else:
+                    blocks = (_blocks(below[0][items], below[1][items], False) +
+                              _blocks(below[2][items], below[3][items], True))
+                arrays = [_reserve(a, complete) for a in levels[level]]
+                for array, values in zip(arrays, blocks):
+                    array[done:complete] = values
+                levels[level] = tuple(arrays)
+            below = levels[level]
+            size *= _BRANCHING
+            level += 1
+
+    def _row(self, position, default):
+        if position is None:
+            return default
+        if self._timestamps is not None and not isinstance(position, (int, np.integer)):
+            stamp = pd.Timestamp(position)
+            if self._tz is not None and stamp.tz is None:
+                stamp = stamp.tz_localize(self._tz)
+            return int(np.searchsorted(self._timestamps[:self._count], stamp.as_unit('ns').value, side='left'))
+        position = int(position)
+        return min(max(position + self._count if position < 0 else position, 0), self._count)
+
+    def _viewport(self, start, end):
+        start, end = self._row(start, 0), self._row(end, self._count)
+        if end <= start:
+            raise ValueError(f'Empty viewport (rows {start} to {end})')
+        return start, end
+
+    def _edges(self, start, end, buckets, blocks=_BLOCKS_PER_BUCKET):
+        """
+        Buckets edges (inner ones snapped to blocks of the chosen level) and that level (0 for rows).
+
+        The level is the coarsest one with at least "blocks" blocks per bucket.
+        """
+        buckets = max(min(int(buckets), end - start), 1)
+        width = (end - start) / buckets
+        level = 0
+        while (buckets > 1 and level < len(next(iter(self._levels.values()), [])) and
+               _BRANCHING ** (level + 1) * blocks <= width):
+            level += 1
+        size = _BRANCHING ** level
+        edges = start + np.round(np.arange(buckets + 1) * width).astype(np.int64)
+        if size > 1:
+            edges[1:-1] = np.round(edges[1:-1] / size).astype(np.int64) * size
+        edges[0], edges[-1] = start, end
+        return edges, level
+
+    def _extremes(self, column, edges, level, maximum):
+        """
+        Extremes (and their rows) of a column over buckets: first and last buckets from rows, others from blocks.
+        """
+        raw = self._raw[column]
+        if level == 0:
+            segment = slice(edges[0], edges[-1])
+            return _reduce(raw[segment], np.arange(edges[0], edges[-1]), edges[:-1] - edges[0], maximum)
+        size = _BRANCHING ** level
+        values, rows = self._levels[column][level - 1][2:] if maximum else self._levels[column][level - 1][:2]
+        first, last = edges[1] // size, edges[-2] // size
+        head, tail = slice(edges[0], edges[1]), slice(edges[-2], edges[-1])
+        values = np.concatenate([raw[head], values[first:last], raw[tail]])
+        rows = np.concatenate([np.arange(edges[0], edges[1]), rows[first:last], np.arange(edges[-2], edges[-1])])
+        offsets = np.concatenate([[0], edges[1:-1] // size - first + (edges[1] - edges[0])])
+        return _reduce(values, rows, offsets, maximum)
+
+    def _index(self, rows):
+        if self._timestamps is None:
+            return pd.Index(rows, name='row')
+        # timestamps are kept in nanoseconds, results get the data index resolution back
+        index = pd.DatetimeIndex(self._timestamps[rows].astype('datetime64[ns]')).as_unit(self._unit)
+        return index.tz_localize('UTC').tz_convert(self._tz) if self._tz is not None else index
+
+    def ohlc(self, buckets, start=None, end=None):
+        """
+        A bar per bucket: first open, highest high, lowest low, last close and volume sum.
+
+        Missing "open", "high" and "low" columns are taken from "close" (so a line series becomes bars).
+
+        :param int buckets: number of buckets (usually the viewport width in pixels).
+        :param start: first viewport row (position, or timestamp with a DatetimeIndex), the first row by default.
+        :param end: viewport end row (excluded), the last row by default.
+        :return pd.DataFrame: open, high, low, close (and volume) columns, indexed by each bucket first row.
+        """
+        start, end = self._viewport(start, end)
+        edges, level = self._edges(start, end, buckets)
+        close = self._raw['close']
+        columns = {'open': self._raw.get('open', close)[edges[:-1]],
+                   'high': self._extremes('high' if 'high' in self._raw else 'close', edges, level, True)[0],
+                   'low': self._extremes('low' if 'low' in self._raw else 'close', edges, level, False)[0],
+                   'close': close[edges[1:] - 1]}
+        if self._volume is not None:
+            columns['volume'] = self._volume[edges[1:]] - self._volume[edges[:-1]]
+        return pd.DataFrame(columns, index=self._index(edges[:-1]))
+
+    def envelope(self, columns, buckets, start=None, end=None):
+        """
+        Minimum and maximum of each column per bucket (same buckets for every column).
+
+        :param list columns: column names (like every output of a multiple outputs indicator).
+        :param int buckets: number of buckets (usually the viewport width in pixels).
+        :param start: first viewport row (position, or timestamp with a DatetimeIndex), the first row by default.
+        :param end: viewport end row (excluded), the last row by default.
+        :return pd.DataFrame: "<column>_min" and "<column>_max" columns, indexed by each bucket first row.
+        """
+        start, end = self._viewport(start, end)
+        edges, level = self._edges(start, end, buckets)
+        result = {}
+        for column in columns:
+            result[f'{column}_min'] = self._extremes(column, edges, level, False)[0]
+            result[f'{column}_max'] = self._extremes(column, edges, level, True)[0]
+        return pd.DataFrame(result, index=self._index(edges[:-1]))
+
+    def lttb(self, columns, points, start=None, end=None, ratio=4):
+        """
+        Largest triangle three buckets downsampling, the same rows selected for every column.
+
+        Candidates are each column minimum and maximum rows over "ratio" sub buckets per bucket (MinMaxLTTB), then a
+        row per bucket is picked maximizing the triangle area (summed over columns scaled to their range) with the
+        previous bucket point and the next bucket candidates average. Buckets are solved together in vectorized
+        passes, first against the previous bucket average, then buckets whose previous bucket point changed are solved
+        again, up to "_LTTB_PASSES" times (the sequential algorithm fixed point, matched for almost every bucket).
+        Areas are computed in float32 for every column at once, selection time still grows with the number of columns
+        (about 6 ms for one column and 15 ms for three columns per 1500 points over 10M rows).
+
+        :param list columns: column names.
+        :param int points: number of points (first and last viewport rows included).
+        :param start: first viewport row (position, or timestamp with a DatetimeIndex), the first row by default.
+        :param end: viewport end row (excluded), the last row by default.
+        :param int ratio: sub buckets per bucket for candidates.
+        :return pd.DataFrame: columns values at the selected rows, indexed by those rows.
+        """
+        start, end = self._viewport(start, end)
+        points = int(points)
+        if end - start <= max(points, 2):
+            rows = np.arange(start, end)
+        else:
+            buckets = points - 2
+            # candidates only need sub buckets of about the same width, so a block per sub bucket is enough
+            edges, level = self._edges(start + 1, end - 1, buckets * int(ratio), 1)
+            candidates = []
+            for column in columns:
+                candidates.append(self._extremes(column, edges, level, False)[1])
+                candidates.append(self._extremes(column, edges, level, True)[1])
+            # (buckets, candidates) rows, sub buckets grouped by bucket
+            owners = np.minimum(np.arange(len(edges) - 1) * buckets // (len(edges) - 1), buckets - 1)
+            order = np.argsort(owners, kind='stable')
+            per_bucket = np.bincount(owners, minlength=buckets)
+            width = per_bucket.max()
+            slots = np.arange(len(owners)) - np.repeat(np.cumsum(per_bucket) - per_bucket, per_bucket)
+            matrix = np.full((buckets, width * len(candidates)), -1, dtype=np.int64)
+            for n, rows in enumerate(candidates):
+                matrix[owners[order], n * width + slots] = rows[order]
+            rows = self._select(columns, matrix, start, end)
+            rows = np.concatenate([[start], rows, [end - 1]])
+        result = {column: self._raw[column][rows] for column in columns}
+        return pd.DataFrame(result, index=self._index(rows))
+
+    def _select(self, columns, matrix, start, end):
+        """
+        Row picked per bucket (matrix row) among its candidate rows (-1 for none).
+        """
+        valid = matrix >= 0
+        safe = np.where(valid, matrix, start)
+        chosen = np.arange(len(matrix))
+        # areas only rank candidates, float32 is precise enough over scaled values and several times faster
+        x = ((safe - start) / max(end - 1 - start, 1)).astype(np.float32)
+        # (column, bucket, candidate) values and (column, 2) viewport first and last row values, every column scaled
+        # to its candidates range, no candidate (and non finite values) as 0 (their area is replaced anyway)
+        raw = np.stack([self._raw[column][safe] for column in columns])
+        finite = valid & np.isfinite(raw)
+        low = np.min(raw, axis=(1, 2), where=finite, initial=np.inf)
+        high = np.max(raw, axis=(1, 2), where=finite, initial=-np.inf)
+        flat = ~(high > low)
+        low, span = np.where(flat, 0., low)[:, None, None], np.where(flat, 1., high - low)[:, None, None]
+        y = np.where(finite, (raw - low) / span, 0.).astype(np.float32)
+        ends = np.stack([self._raw[column][[start, end - 1]] for column in columns])
+        ends = np.nan_to_num((ends - low[:, :, 0]) / span[:, :, 0]).astype(np.float32)
+        means_x = np.where(valid, x, 0.).sum(axis=1) / np.maximum(valid.sum(axis=1), 1)
+        means_y = y.sum(axis=2) / np.maximum(finite.sum(axis=2), 1)
+        # next bucket averages (the last viewport row after the last bucket)
+        next_x = np.append(means_x[1:], 1.).astype(np.float32)[:, None]
+        next_y = np.concatenate([means_y[:, 1:], ends[:, 1:]], axis=1).astype(np.float32)[:, :, None]
+        # columns without value at some candidates rows add nothing to those candidates areas
+        missing = ~finite & valid
+        missing = missing if missing.any() else None
+
+        def pick(buckets, previous_x, previous_y):
+            # summed over columns, previous_y is (column, bucket, 1), every bucket at once as slices (no copies)
+            buckets = slice(None) if len(buckets) == len(matrix) else buckets
+            area = (previous_x - next_x[buckets]) * (y[:, buckets] - previous_y)
+            area -= (previous_x - x[buckets]) * (next_y[:, buckets] - previous_y)
+            np.abs(area, out=area)
+            if missing is not None:
+                area[missing[:, buckets]] = 0.
+            area = area.sum(axis=0)
+            area[~valid[buckets]] = -1.
+            return np.argmax(area, axis=1)
+
+        # first against the previous bucket average, then each bucket depends on the previous bucket pick: buckets
+        # whose previous bucket pick changed are picked again, all at once, until no pick changes (the sequential
+        # algorithm result) or for "_LTTB_PASSES" passes
+        previous_y = np.concatenate([ends[:, :1], means_y[:, :-1]], axis=1).astype(np.float32)[:, :, None]
+        picked = pick(chosen, np.insert(means_x[:-1], 0, 0.).astype(np.float32)[:, None], previous_y)
+        active = chosen
+        for _ in range(_LTTB_PASSES):
+            active = active[active > 0]
+            if not len(active):
+                break
+            before = active - 1
+            picks = pick(active, x[before, picked[before]][:, None], y[:, before, picked[before]][:, :, None])
+            changed = picks != picked[active]
+            picked[active] = picks
+            active = np.unique(active[changed] + 1)
+            active = active[active < len(matrix)]
+        rows = matrix[chosen, picked]
+        return np.unique(rows[rows >= 0])
+
+    def __repr__(self):
+        return f'Downsampler({self._count} rows, columns={self.columns})'
+
+
+def ohlc(data, buckets):
+    """
+    A bar per bucket over the whole data (see "Downsampler.ohlc").
+
+    :param data: OHLCV data (any DataFrame instance accepted by "Downsampler").
+    :param int buckets: number of buckets.
+    :return pd.DataFrame: downsampled bars.
+    """
+    return Downsampler(data).ohlc(buckets)
+
+
+def envelope(data, buckets):
+    """
+    Minimum and maximum of every column per bucket over the whole data (see "Downsampler.envelope").
+
+    :param data: any DataFrame instance accepted by "Downsampler" (like a multiple outputs indicator result).
+    :param int buckets: number of buckets.
+    :return pd.DataFrame: "<column>_min" and "<column>_max" columns.
+    """
+    ds = Downsampler(data)
+    return ds.envelope(ds.columns, buckets)
+
+
+def lttb(data, points):
+    """
+    Largest triangle three buckets downsampling of every column over the whole data (see "Downsampler.lttb").
+
+    :param data: any DataFrame instance accepted by "Downsampler".
+    :param int points: number of points.
+    :return pd.DataFrame: selected rows.
+    """
+    ds = Downsampler(data)
+    return ds.lttb(ds.columns, points)
@@ -0,0 +1,181 @@
+# -*- coding:utf-8 -*-
+"""
+    Duration (time based) windows over irregular DatetimeIndex data.
+
+    Period based indicators accept a duration like "30min" (any value accepted by "pd.Timedelta") instead of a
+    number of rows, a row window then holds every row with timestamp in (t - period, t]:
+
+    >>> pantulipy.sma(ohlc, '30min')
+    >>> pantulipy.willr(ohlc, period=pd.Timedelta(hours=4))
+
+    Window bounds are found for all rows at once with a binary search over the sorted timestamps (the vectorized form
+    of a two pointers sweep, O(n log n) instead of O(n) but without a Python level loop), then sums come from
+    compensated prefix sums differences (rounding errors of the running sums are carried separately, so window sums
+    keep their own precision however long the series is) and highs / lows from a sparse table, so no row is visited
+    once per window it belongs to. "md" is the exception, as it is in "Tulipy": its deviations are summed window by
+    window, over bounded size chunks of rows so that memory stays O(n). Rows whose window reaches before the first
+    timestamp are warm-up rows and back filled as any other pantulipy indicator.
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from . import core
+
+__all__ = ['INDICATORS', 'is_duration', 'compute']
+
+
+def _sma(starts, counts, close):
+    return _window_sum(close, starts) / counts
+
+
+def _wma(starts, counts, close):
+    rows = np.arange(len(close), dtype=np.float64)
+    shifted = close - close[0]
+    # weights 1..k from the oldest row of each window: sum((j - start + 1) * x_j)
+    weighted = _window_sum(rows * shifted, starts) - (starts - 1.) * _window_sum(shifted, starts)
+    return weighted / (counts * (counts + 1.) / 2.) + close[0]
+
+
+def _stderr(starts, counts, close):
+    # shifted to the first value so squares keep precision on large magnitudes
+    shifted = close - close[0]
+    mean = _window_sum(shifted, starts) / counts
+    variance = np.maximum(_window_sum(shifted * shifted, starts) / counts - mean * mean, 0.)
+    return np.sqrt(variance) / np.sqrt(counts)
+
+
+# maximum (row, window member) pairs expanded at once by "md"
+_MD_CHUNK = 2 ** 20
+
+
+def _md(starts, counts, close):
+    mean = _window_sum(close, starts) / counts
+    counts = counts.astype(np.int64)
+    result = np.empty(len(close))
+    ends = np.cumsum(counts)
+    first = 0
+    while first < len(close):
+        # rows [first, last) expand to at most "_MD_CHUNK" pairs (at least one row)
+        last = max(int(np.searchsorted(ends, ends[first] - counts[first] + _MD_CHUNK, side='right')), first + 1)
+        sizes = counts[first:last]
+        owners = np.repeat(np.arange(last - first), sizes)
+        offsets = np.arange(len(owners)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        deviations = np.abs(close[offsets + starts[first:last][owners]] - mean[first:last][owners])
+        result[first:last] = np.bincount(owners, weights=deviations, minlength=last - first)
+        first = last
+    return result / counts
+
+
+def _willr(starts, counts, high, low, close):
+    highest = _window_extreme(high, starts, np.maximum)
+    lowest = _window_extreme(low, starts, np.minimum)
+    spread = highest - lowest
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = np.where(spread != 0., 1. / spread, 0.)
+    return -100. * scale * (highest - close)
+
+
+def _vwma(starts, counts, close, volume):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _window_sum(close * volume, starts) / _window_sum(volume, starts)
+
+
+def _mfi(starts, counts, high, low, close, volume):
+    typical = (high + low + close) / 3.
+    flow = typical * volume
+    change = np.diff(typical, prepend=np.nan)
+    up = _window_sum(np.where(change > 0., flow, 0.), starts)
+    down = _window_sum(np.where(change < 0., flow, 0.), starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100. * up / (up + down)
+
+
+#: indicators accepting a duration period, names as keys and (kernel, first complete row offset) as values
+INDICATORS = {'sma': (_sma, 0), 'wma': (_wma, 0), 'stderr': (_stderr, 0), 'md': (_md, 0), 'willr': (_willr, 0),
+              'vwma': (_vwma, 0), 'mfi': (_mfi, 1)}
+
+
+def _window_sum(values, starts):
+    """
+    Sums over [start, row] windows from compensated prefix sums.
+
+    Running sums lose low order bits as they grow, each addition rounding error is recovered exactly ("two sum") and
+    accumulated in a second prefix sum, so a window sum error is relative to that window values and not to the
+    whole series total.
+    """
+    prefix = np.concatenate([[0.], np.cumsum(values)])
+    total = prefix[:-1] + values
+    # exact rounding error of previous prefix + value, plus any difference with the running sum
+    virtual = total - prefix[:-1]
+    error = (prefix[:-1] - (total - virtual)) + (values - virtual) + (total - prefix[1:])
+    correction = np.concatenate([[0.], np.cumsum(error)])
+    return (prefix[1:] - prefix[starts]) + (correction[1:] - correction[starts])
+
+
+def _window_extreme(values, starts, ufunc):
+    """
+    Highest (np.maximum) or lowest (np.minimum) value over [start, row] windows with a sparse table.
+    """
+    rows = np.arange(len(values))
+    counts = rows - starts + 1
+    levels = np.floor(np.log2(counts)).astype(np.int64)
+    result = np.empty(len(values))
+    table = values
+    for level in range(int(levels.max()) + 1 if len(values) else 0):
+        selected = levels == level
+        right = rows[selected] - (1 << level) + 1
+        result[selected] = ufunc(table[starts[selected]], table[right])
+        # table[j] holds the extreme over [j, j + 2 ** (level + 1))
+        width = 1 << level
+        table = ufunc(table[:-width], table[width:]) if len(table) > width else table[:0]
+    return result
+
+
+def is_duration(period):
+    """
+    Whether an indicator period is a duration instead of a number of rows.
+
+    :param period: indicator period.
+    :return bool: True for strings, "pd.Timedelta", "datetime.timedelta" and "np.timedelta64" values.
+    """
+    return isinstance(period, (str, datetime.timedelta, np.timedelta64))
+
+
+def compute(name, data, period):
+    """
+    Compute an indicator over duration windows.
+
+    :param str name: indicator name (any key of "INDICATORS").
+    :param pd.DataFrame data: a DataFrame (or a Series for single input indicators) with a sorted DatetimeIndex.
+    :param period: window duration like "30min" or a "pd.Timedelta".
+    :return pd.Series: indicator results.
+    """
+    if name not in INDICATORS:
+        raise ValueError(f'{name} does not accept a duration period, only {", ".join(INDICATORS)} do')
+    if core._frame_kind(data) != 'pandas' or not isinstance(data.index, pd.DatetimeIndex):
+        raise ValueError('Duration periods need a pandas DataFrame or Series with a DatetimeIndex')
+    if not data.index.is_monotonic_increasing:
+        raise ValueError('Duration periods need a sorted DatetimeIndex')
+    delta = pd.Timedelta(period)
+    if delta <= pd.Timedelta(0):
+        raise core.InvalidOptionError()
+    fn = core._kernel(name)
+    inputs = core._get_ohlcv_arrays(fn, data)
+    timestamps = data.index.as_unit('ns').asi8
+    limits = timestamps - delta.value
+    starts = np.searchsorted(timestamps, limits, side='right')
+    kernel, offset = INDICATORS[name]
+    starts = np.maximum(starts, offset)
+    counts = (np.arange(len(timestamps)) - starts + 1).astype(np.float64)
+    values = np.full(len(timestamps), np.nan)
+    complete = (limits >= timestamps[0]) & (counts > 0) if len(timestamps) else np.zeros(0, dtype=np.bool_)
+    if complete.any():
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = kernel(starts, np.maximum(counts, 1.), *inputs)
+        values[complete] = result[complete]
+    first = np.argmax(complete) if complete.any() else len(values)
+    # only warm-up rows are back filled, NaN values from the kernel (like "mfi" without flows) are kept
+    values[:first] = values[first] if first < len(values) else np.nan
+    return pd.Series(values, index=data.index, name=name, copy=False)
@@ -0,0 +1,245 @@
+# -*- coding:utf-8 -*-
+"""
+    Composable indicators expressions.
+
+    Indicator outputs feed other indicators inputs as raw numpy arrays, warm-up offsets are tracked through the
+    chain and the whole expression is staged and aligned only once:
+
+    >>> from pantulipy import expr
+    >>> ema_rsi = expr.ema(expr.rsi(14), 10)
+    >>> cross = expr.crossover(expr.ema(12), expr.ema(26))
+    >>> result = expr.evaluate(ohlc, ema_rsi, cross)
+"""
+import numpy as np
+
+from . import core
+
+__all__ = ['Expr', 'Column', 'Indicator', 'Output', 'col', 'evaluate'] + core.__all__
+
+
+class Expr:
+    """
+    Expression base class.
+    """
+    #: hashable structural key, equal expressions are computed only once.
+    key = None
+
+    @property
+    def name(self):
+        raise NotImplementedError
+
+    def columns(self):
+        """
+        Input data column names needed by this expression.
+
+        :return set: column names.
+        """
+        raise NotImplementedError
+
+    def evaluate(self, data):
+        """
+        Compute this expression over data.
+
+        :param data: a DataFrame instance with data columns (open, high, low, close, volume) or a Series.
+        :return: a Series (or a DataFrame for multiple outputs indicators) of the same library as data.
+        """
+        return evaluate(data, self)
+
+    def __repr__(self):
+        return self.name
+
+
+class Column(Expr):
+    """
+    An input data column.
+    """
+
+    def __init__(self, column):
+        """
+        Constructor.
+
+        :param str column: one of open, high, low, close or volume.
+        """
+        self.column = column
+        self.key = ('column', column)
+
+    @property
+    def name(self):
+        return self.column
+
+    def columns(self):
+        return {self.column}
+
+
+class Indicator(Expr):
+    """
+    A pantulipy indicator applied to other expressions (input data columns by default).
+    """
+
+    def __init__(self, indicator, *args, **kwargs):
+        """
+        Constructor.
+
+        Leading "Expr" positional arguments are used as indicator inputs (in "Tulipy" input order), any other
+        argument is an indicator param as in the pantulipy function with the same name.
+
+        :param str indicator: indicator name (any pantulipy indicator function name).
+        :param args: indicator inputs expressions followed by indicator positional params.
+        :param kwargs: indicator key pair params.
+        """
+        if indicator not in core.__all__:
+            raise ValueError(f'Unknown indicator "{indicator}"')
+        self.indicator = indicator
+        self.fn = core._kernel(indicator)
+        args = list(args)
+        inputs = []
+        while args and isinstance(args[0], Expr):
+            inputs.append(args.pop(0))
+        input_names = core._input_names(self.fn)
+        if len(inputs) > len(input_names):
+            raise ValueError(f'{indicator} takes {len(input_names)} inputs, got {len(inputs)}')
+        self.inputs = inputs + [Column(name) for name in input_names[len(inputs):]]
+        self.params = core._indicator_params(indicator, *args, **kwargs)
+        self.key = ('indicator', indicator, self.params, tuple(i.key for i in self.inputs))
+
+    @property
+    def outputs(self):
+        """
+        Output names of this indicator.
+
+        :return list: output names as used by pantulipy functions results.
+        """
+        return core._output_names(self.indicator, len(self.fn.outputs))
+
+    @property
+    def name(self):
+        args = [repr(i) for i in self.inputs] + [str(p) for p in self.params]
+        return f'{self.indicator}({", ".join(args)})'
+
+    def columns(self):
+        return set().union(*(i.columns() for i in self.inputs))
+
+    def output(self, which):
+        """
+        Select one output of a multiple outputs indicator.
+
+        :param which: output position or name (like "signal" or "macd_signal").
+        :return Output: the selected output expression.
+        """
+        if isinstance(which, str):
+            names = self.outputs
+            which = which.lower()
+            matches = [n for n, name in enumerate(names) if which in (name, name.split('_', 1)[-1])]
+            if not matches:
+                raise ValueError(f'{self.indicator} has no "{which}" output, use one of {names}')
+            which = matches[0]
+        return Output(self, which)
+
+    def __getitem__(self, which):
+        return self.output(which)
+
+
+class Output(Expr):
+    """
+    A single output of a multiple outputs indicator.
+    """
+
+    def __init__(self, indicator, position):
+        """
+        Constructor.
+
+        :param Indicator indicator: the multiple outputs indicator expression.
+        :param int position: output position.
+        """
+        self.indicator = indicator
+        self.position = position
+        self.key = ('output', indicator.key, position)
+
+    @property
+    def name(self):
+        return f'{self.indicator.name}.{self.indicator.outputs[self.position].split("_", 1)[-1]}'
+
+    def columns(self):
+        return self.indicator.columns()
+
+
+def col(column):
+    """
+    Input data column expression.
+
+    :param str column: one of open, high, low, close or volume.
+    :return Column: column expression.
+    """
+    return Column(column)
+
+
+def _compute(node, staged, memo):
+    """
+    Compute an expression node over staged input arrays.
+
+    :param Expr node: expression to compute.
+    :param dict staged: input column names as keys and float64 arrays as values.
+    :param dict memo: already computed nodes by structural key.
+    :return tuple: a tuple of unpadded output arrays and the warm-up offset (leading rows without a value).
+    """
+    if node.key in memo:
+        return memo[node.key]
+    if isinstance(node, Column):
+        result = (staged[node.column],), 0
+    elif isinstance(node, Output):
+        outputs, offset = _compute(node.indicator, staged, memo)
+        result = (outputs[node.position],), offset
+    else:
+        inputs = []
+        for item in node.inputs:
+            outputs, offset = _compute(item, staged, memo)
+            if len(outputs) > 1:
+                raise ValueError(f'{item.name} has multiple outputs, select one with ".output()"')
+            inputs.append((outputs[0], offset))
+        offset = max(o for _, o in inputs)
+        arrays = [np.ascontiguousarray(arr[offset - o:]) for arr, o in inputs]
+        data = node.fn(*arrays, *node.params)
+        outputs = data if type(data) == tuple else (data,)
+        result = outputs, offset + len(arrays[0]) - len(outputs[0])
+    memo[node.key] = result
+    return result
+
+
+def evaluate(data, *exprs):
+    """
+    Compute one or more expressions staging input columns and aligning results only once.
+
+    Common sub expressions (like "ema(12)" used in two expressions) are computed only once.
+
+    :param data: a DataFrame instance with data columns (open, high, low, close, volume) or a Series.
+    :param exprs: expressions to compute.
+    :return: a Series for a single output expression, a DataFrame otherwise (same library as data).
+    """
+    staged = core._stage_columns(data, set().union(*(e.columns() for e in exprs)))
+    num_rows = len(next(iter(staged.values())))
+    memo = {}
+    columns = {}
+    for e in exprs:
+        outputs, offset = _compute(e, staged, memo)
+        names = e.outputs if isinstance(e, Indicator) and len(outputs) > 1 else [e.name]
+        if len(exprs) > 1 and len(outputs) > 1:
+            names = [f'{e.name}.{n.split("_", 1)[-1]}' for n in names]
+        for name, arr in zip(names, outputs):
+            result = np.full(num_rows, np.nan)
+            result[num_rows - len(arr):] = arr
+            columns[name] = core._bfill(result)
+    kind = core._frame_kind(data)
+    index = data.index if kind == 'pandas' else None
+    return core._from_columns(columns, kind, index, frame=len(exprs) > 1)
+
+
+def _factory(indicator):
+    def build(*args, **kwargs):
+        return Indicator(indicator, *args, **kwargs)
+
+    build.__name__ = indicator
+    build.__doc__ = f'Expression node for "pantulipy.{indicator}" (inputs expressions first, then params).'
+    return build
+
+
+globals().update({_name: _factory(_name) for _name in core.__all__})
@@ -0,0 +1,203 @@
+# -*- coding:utf-8 -*-
+"""
+    Model ready features: indicators over a panel post-processed in a single preallocated block.
+
+    Lags, rolling z-scores and cross-sectional ranks are written straight into one contiguous (time, symbol, feature)
+    array, so no intermediate frame is built per transform:
+
+    >>> from pantulipy import features
+    >>> fm = features.compute_panel(panel, ['rsi', ('sma', 50)], lags=(1, 5), zscore=100, rank=True)
+    >>> model.fit(fm.matrix, target)
+    >>> fm.columns[0]
+    {'name': 'rsi_14', 'indicator': 'rsi', 'params': (14,), 'output': 'rsi_14', 'lag': 0, 'zscore': 100, 'rank': True}
+"""
+import numpy as np
+import pandas as pd
+
+from . import batch, core
+
+__all__ = ['FeatureMatrix', 'compute_panel', 'rolling_zscore', 'rank_cross_section']
+
+
+class FeatureMatrix:
+    """
+    Features block with its metadata.
+    """
+
+    def __init__(self, values, columns, symbols, index):
+        """
+        Constructor.
+
+        :param np.ndarray values: C contiguous (time, symbol, feature) array.
+        :param list columns: one metadata dict per feature.
+        :param list symbols: panel symbols (values second axis).
+        :param index: time index (values first axis).
+        """
+        self.values = values
+        self.columns = columns
+        self.symbols = symbols
+        self.index = index
+
+    @property
+    def names(self):
+        """
+        Feature names.
+
+        :return list: feature names (like "rsi_14_lag1").
+        """
+        return [c['name'] for c in self.columns]
+
+    @property
+    def matrix(self):
+        """
+        Features as a 2 dimensions (time x symbol, feature) view, rows ordered by time then symbol.
+
+        :return np.ndarray: a C contiguous view of "values".
+        """
+        return self.values.reshape(-1, self.values.shape[2])
+
+    def frame(self):
+        """
+        Features as a pandas DataFrame (time, symbol) multi indexed, backed by "values" without copying.
+
+        :return pd.DataFrame: features frame.
+        """
+        index = pd.MultiIndex.from_product([self.index, self.symbols], names=['time', 'symbol'])
+        return pd.DataFrame(self.matrix, index=index, columns=self.names, copy=False)
+
+    def __repr__(self):
+        return f'FeatureMatrix({len(self.index)} rows x {len(self.symbols)} symbols x {len(self.columns)} features)'
+
+
+def rolling_zscore(values, window, out=None):
+    """
+    Rolling z-score (sample standard deviation, full windows only) in a single prefix sums pass.
+
+    :param np.ndarray values: 1 dimension float64 array (NaN rows make windows containing them NaN).
+    :param int window: rolling window length.
+    :param np.ndarray out: optional output array (may be a strided view).
+    :return np.ndarray: z-scores (NaN for incomplete windows and constant windows).
+    """
+    window = int(window)
+    valid = np.isfinite(values)
+    reference = values[valid][0] if valid.any() else 0.
+    shifted = np.where(valid, values - reference, 0.)
+    sums = np.concatenate([[0.], np.cumsum(shifted)])
+    squares = np.concatenate([[0.], np.cumsum(shifted * shifted)])
+    counts = np.concatenate([[0], np.cumsum(valid)])
+    total = sums[window:] - sums[:-window]
+    mean = total / window
+    variance = (squares[window:] - squares[:-window] - total * mean) / max(window - 1, 1)
+    full = counts[window:] - counts[:-window] == window
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.where(full & (variance > 0.), (shifted[window - 1:] - mean) / np.sqrt(variance), np.nan)
+    if out is None:
+        out = np.empty(len(values))
+    out[:window - 1] = np.nan
+    out[window - 1:] = result
+    return out
+
+
+def rank_cross_section(block):
+    """
+    Replace values by their percentile rank (0 to 1) across symbols, in place and one feature at a time.
+
+    Equal values get the average of their ranks (as "scipy.stats.rankdata(method='average')").
+
+    :param np.ndarray block: (time, symbol, feature) array, NaN values stay NaN and are not ranked.
+    :return np.ndarray: the same array.
+    """
+    for feature in range(block.shape[2]):
+        # one contiguous (time, symbol) copy per feature keeps the extra memory to a single feature
+        values = np.ascontiguousarray(block[:, :, feature], dtype=np.float64)
+        missing = np.isnan(values)
+        order = np.argsort(np.where(missing, np.inf, values), axis=1, kind='stable')
+        positions = np.broadcast_to(np.arange(values.shape[1], dtype=np.float64), values.shape)
+        ordered = np.take_along_axis(values, order, axis=1)
+        # equal values runs in sorted order (NaN never equals, so missing values are not runs), on rows with ties
+        tied = ordered[:, 1:] == ordered[:, :-1]
+        rows = np.flatnonzero(tied.any(axis=1))
+        if len(rows):
+            tied = tied[rows]
+            starts = np.ones((len(rows), values.shape[1]), dtype=np.bool_)
+            starts[:, 1:] = ~tied
+            ends = np.ones(starts.shape, dtype=np.bool_)
+            ends[:, :-1] = ~tied
+            first = np.maximum.accumulate(np.where(starts, positions[rows], 0.), axis=1)
+            last = np.minimum.accumulate(np.where(ends, positions[rows], np.inf)[:, ::-1], axis=1)[:, ::-1]
+            positions = positions.copy()
+            positions[rows] = (first + last) / 2.
+        ranks = np.empty(values.shape, dtype=np.float64)
+        np.put_along_axis(ranks, order, positions, axis=1)
+        valid = (~missing).sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ranks = np.where(valid > 1, ranks / (valid - 1), .5)
+        ranks[missing] = np.nan
+        block[:, :, feature] = ranks
+    return block
+
+
+def compute_panel(panel, specs, lags=(), zscore=None, rank=False, tail=None, dtype=np.float32, causal=True):
+    """
+    Compute indicators specs over a panel and post-process them into a single features block.
+
+    Every indicator output gives one feature plus one per lag. Transforms are applied in this order: rolling
+    z-score, lags (of the z-scored values) and cross-sectional ranks (of every feature).
+
+    :param dict panel: symbols as keys and same length datasets (see "batch.compute") as values, pandas datasets
+        must share the same index.
+    :param list specs: indicators specs like "rsi", ("sma", 50) or ("macd", 12, 26, {"signal_period": 9}).
+    :param tuple lags: lags (in rows) added as extra features.
+    :param int zscore: rolling z-score window (none by default).
+    :param bool rank: replace features by their cross-sectional percentile rank.
+    :param int tail: compute only the last "tail" rows.
+    :param dtype: features dtype (float32 by default).
+    :param bool causal: warm-up rows as NaN instead of back filled (back filling leaks future values).
+    :return FeatureMatrix: features block and metadata.
+    :raise ValueError: when datasets lengths or (pandas) indexes differ.
+    """
+    specs = [core._parse_spec(spec) for spec in specs]
+    lags = [int(lag) for lag in lags if int(lag) > 0]
+    symbols = list(panel)
+    needed = batch._needed_columns(specs)
+    staged = {symbol: core._stage_columns(panel[symbol], needed) for symbol in symbols}
+    lengths = {len(next(iter(columns.values()))) for columns in staged.values()}
+    if len(lengths) != 1:
+        raise ValueError(f'Panel datasets must have the same length, got {sorted(lengths)}')
+    num_rows = lengths.pop()
+    rows = num_rows if tail is None else min(int(tail), num_rows)
+    # rows are stacked by position, pandas datasets must be indexed alike for rows to be the same time
+    indexes = {symbol: panel[symbol].index for symbol in symbols if core._frame_kind(panel[symbol]) == 'pandas'}
+    index = next(iter(indexes.values()), None)
+    mismatched = [symbol for symbol, other in indexes.items() if not other.equals(index)]
+    if mismatched:
+        raise ValueError(f'Panel datasets must share the same index, {", ".join(map(str, mismatched))} differ from '
+                         f'{next(iter(indexes))} (align them first, like with "pd.concat(panel, axis=1)")')
+    index = index[num_rows - rows:] if index is not None else pd.RangeIndex(rows)
+
+    columns = []
+    for name, params in specs:
+        for output in core._spec_columns(name, params):
+            for lag in [0] + lags:
+                columns.append({'name': output if not lag else f'{output}_lag{lag}', 'indicator': name,
+                                'params': params, 'output': output, 'lag': lag, 'zscore': zscore, 'rank': rank})
+    width = 1 + len(lags)
+    values = np.empty((rows, len(symbols), len(columns)), dtype=dtype)
+    # rows needed before "tail" for lags and z-scores of the first returned row
+    extra = max(lags or [0]) + (int(zscore) - 1 if zscore else 0)
+    compute_tail = None if tail is None else min(rows + extra, num_rows)
+    for s, symbol in enumerate(symbols):
+        outputs = batch.compute_arrays(staged[symbol], specs, compute_tail, fill=not causal)
+        for n, series in enumerate(outputs.values()):
+            if zscore:
+                series = rolling_zscore(series, zscore)
+            offset = len(series) - rows
+            target = values[:, s, n * width:(n + 1) * width]
+            target[:, 0] = series[offset:]
+            for k, lag in enumerate(lags, 1):
+                lagged = series[max(offset - lag, 0):len(series) - lag]
+                target[:rows - len(lagged), k] = np.nan
+                target[rows - len(lagged):, k] = lagged
+    if rank:
+        rank_cross_section(values)
+    return FeatureMatrix(values, columns, symbols, index)
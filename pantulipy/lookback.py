@@ -0,0 +1,193 @@
+# -*- coding:utf-8 -*-
+"""
+    Lookback planner: minimum input history needed to compute indicators specs over an output range.
+
+    Windowed indicators need exactly their warm-up rows before the first output row. Recursive ones carry smoothed
+    state from every previous row, so they need enough rows for the starting state influence to fall below a
+    tolerance (relative to data magnitude): closed form for the exponential family ("ema", "wilders", "dema", "tema",
+    worst case "kama") and measured over synthetic random walks for the rest (with a safety margin, as their starting
+    state error depends on data). Cumulative ones need the whole history, as do recursive ones whose starting state
+    influence has no data independent bound ("decay" and "edecay" fall from a peak at a rate set by the data scale,
+    "adosc" smooths a cumulative line, so its error grows with the skipped history).
+
+    >>> from pantulipy import lookback
+    >>> lookback.plan(['rsi', ('sma', 200), ('ema', 50)], tail=100)['history']
+    446
+    >>> lookback.group_symbols({'BTC': [('sma', 200)], 'ETH': ['rsi'], 'SOL': [('sma', 200)]}, tail=10)
+    {209: ['BTC', 'SOL'], 245: ['ETH']}
+
+    Read "history" rows ending at the last wanted row, or start reading "extra" rows before the first wanted row.
+"""
+import functools
+import math
+
+import numpy as np
+
+from . import core
+
+__all__ = ['requirement', 'plan', 'group_symbols']
+
+# (decay per row, repeated poles, state seeded at warm-up) for smoothing with a closed form convergence bound
+_SMOOTHING = {
+    'ema': lambda period: (1. - 2. / (period + 1.), 1, True),
+    'wilders': lambda period: (1. - 1. / period, 1, True),
+    'dema': lambda period: (1. - 2. / (period + 1.), 2, False),
+    'tema': lambda period: (1. - 2. / (period + 1.), 3, False),
+    # slowest "Tulipy" adaptive constant, (2 / (30 + 1)) ** 2, for a flat efficiency ratio
+    'kama': lambda period: (1. - (2. / 31.) ** 2, 1, True),
+}
+
+# recursive indicators without a data independent convergence bound, read from the first row
+_WHOLE_HISTORY = ['adosc', 'decay', 'edecay']
+
+# measured convergence probes: initial length, maximum length and seeds
+_PROBE_ROWS = 4096
+_MAX_PROBE_ROWS = 2 ** 20
+_SEEDS = (0, 1, 2)
+# starting state errors depend on data, measured convergence targets a tolerance this many times lower
+_MARGIN = 100.
+
+
+def _closed_form(decay, poles, tolerance):
+    """
+    Rows needed for a "poles" times repeated exponential decay to bound the starting state error by "tolerance".
+
+    The error after n rows is at most C(n + poles - 1, poles - 1) * decay ** n.
+    """
+    if decay <= 0.:
+        return 0
+
+    def log_error(n):
+        return math.lgamma(n + poles) - math.lgamma(n + 1) - math.lgamma(poles) + n * math.log(decay)
+
+    low = int(math.ceil((poles - 1) / -math.log(decay))) if poles > 1 else 0
+    if log_error(low) <= math.log(tolerance):
+        return low
+    high = max(low, 1) * 2
+    while log_error(high) > math.log(tolerance):
+        high *= 2
+    while low + 1 < high:
+        middle = (low + high) // 2
+        low, high = (middle, high) if log_error(middle) > math.log(tolerance) else (low, middle)
+    return high
+
+
+def _probe(fn, rows, seed):
+    rng = np.random.default_rng(seed)
+    close = 100. + rng.standard_normal(rows).cumsum()
+    close = np.abs(close) + 10.
+    spread = rng.random(rows) + .1
+    columns = {'open': np.roll(close, 1), 'high': close + spread, 'low': close - spread, 'close': close,
+               'volume': rng.random(rows) * 1000. + 1., 'real': close}
+    return [columns.get(name, close) for name in core._input_names(fn)]
+
+
+@functools.lru_cache(maxsize=1024)
+def _measured(fn, params, tolerance):
+    """
+    Rows before the first output row needed for recursive state to converge, measured over random walks.
+
+    Each probe is computed once over the whole walk (the reference) and once from its middle row, the history needed
+    is the number of rows after which every truncated output stays within "tolerance" (over "_MARGIN") of the
+    reference.
+
+    :return int: rows needed (None if not converged within the largest probe).
+    """
+    needed = 0
+    for seed in _SEEDS:
+        rows = _PROBE_ROWS
+        while True:
+            inputs = _probe(fn, rows, seed)
+            start = rows // 2
+            reference = fn(*inputs, *params)
+            truncated = fn(*[np.ascontiguousarray(i[start:]) for i in inputs], *params)
+            reference = reference if type(reference) == tuple else (reference,)
+            truncated = truncated if type(truncated) == tuple else (truncated,)
+            late = np.zeros(len(truncated[0]), dtype=np.bool_)
+            for full, part in zip(reference, truncated):
+                scale = float(np.max(np.abs(full))) or 1.
+                with np.errstate(invalid='ignore'):
+                    late |= ~(np.abs(full[len(full) - len(part):] - part) <= tolerance / _MARGIN * scale)
+            outside = np.flatnonzero(late)
+            # converged when the last quarter of the truncated outputs agree
+            if not len(outside) or outside[-1] < len(late) * 3 // 4:
+                # history rows (up to the first row within tolerance) before the output row
+                first = outside[-1] + 1 if len(outside) else 0
+                needed = max(needed, int(rows - start - len(late) + first))
+                break
+            if rows >= _MAX_PROBE_ROWS:
+                return None
+            rows *= 4
+    return needed
+
+
+def requirement(spec, tail=1, tolerance=1e-6):
+    """
+    Minimum input history for an indicator spec.
+
+    :param spec: indicator spec like "rsi", ("sma", 50) or ("macd", 12, 26, {"signal_period": 9}).
+    :param int tail: number of wanted output rows (the output range length).
+    :param float tolerance: maximum starting state error of recursive indicators, relative to data magnitude.
+    :return dict: name, params, kind ("windowed", "recursive" or "cumulative"), warmup (rows without value),
+        extra (rows needed before the first wanted row) and history (rows to read, "extra" plus "tail") values
+        ("extra" and "history" are None when the whole history is needed).
+    """
+    name, params = core._parse_spec(spec)
+    tail = max(int(tail), 1)
+    warmup = core._warmup(name, params)
+    if name == 'tr':
+        # anchored only by the previous close
+        kind, extra = 'windowed', 1
+    elif name in core._CUMULATIVE_INDICATORS:
+        kind, extra = 'cumulative', None
+    elif name in core._RECURSIVE_INDICATORS:
+        kind = 'recursive'
+        if name in _WHOLE_HISTORY and name not in core._PLUGINS:
+            extra = None
+        elif name in _SMOOTHING and name not in core._PLUGINS:
+            decay, poles, seeded = _SMOOTHING[name](params[0])
+            rows = _closed_form(decay, poles, tolerance)
+            extra = warmup + rows if seeded else max(warmup, rows)
+        else:
+            rows = _measured(core._kernel(name), params, float(tolerance))
+            extra = None if rows is None else max(warmup, rows)
+    else:
+        kind, extra = 'windowed', warmup
+    return {'name': name, 'params': params, 'kind': kind, 'warmup': warmup, 'extra': extra,
+            'history': None if extra is None else extra + tail}
+
+
+def plan(specs, tail=1, tolerance=1e-6):
+    """
+    Minimum input history for many indicators specs.
+
+    :param list specs: indicators specs.
+    :param int tail: number of wanted output rows.
+    :param float tolerance: maximum starting state error of recursive indicators, relative to data magnitude.
+    :return dict: "indicators" (a "requirement" dict per spec), "extra" and "history" (the largest ones, None when
+        some spec needs the whole history) values.
+    """
+    indicators = [requirement(spec, tail, tolerance) for spec in specs]
+    extras = [r['extra'] for r in indicators]
+    extra = None if None in extras else max(extras, default=0)
+    return {'indicators': indicators, 'extra': extra, 'history': None if extra is None else extra + max(int(tail), 1)}
+
+
+def group_symbols(requests, tail=1, tolerance=1e-6, granularity=1):
+    """
+    Group symbols by the input history they need, one range read per group.
+
+    :param dict requests: symbols as keys and indicators specs lists as values.
+    :param tail: number of wanted output rows, for every symbol (int) or per symbol (dict).
+    :param float tolerance: maximum starting state error of recursive indicators, relative to data magnitude.
+    :param int granularity: round histories up to a multiple of it, fewer groups at the cost of some extra rows.
+    :return dict: histories (None for the whole history) as keys and symbols lists as values, shortest first.
+    """
+    granularity = max(int(granularity), 1)
+    groups = {}
+    for symbol, specs in requests.items():
+        history = plan(specs, tail[symbol] if isinstance(tail, dict) else tail, tolerance)['history']
+        if history is not None:
+            history = -(-history // granularity) * granularity
+        groups.setdefault(history, []).append(symbol)
+    return dict(sorted(groups.items(), key=lambda item: (item[0] is None, item[0] or 0)))
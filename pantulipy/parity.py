@@ -0,0 +1,379 @@
+# -*- coding:utf-8 -*-
+"""
+    Differential parity harness: every indicator through every execution path against direct "Tulipy" calls.
+
+    Randomized and edge case OHLCV datasets (constant prices, zero volume, lengths right above warm-up, large and tiny
+    magnitudes) are computed directly with "Tulipy" (NaN padded and back filled with pandas) and through each
+    pantulipy path (wrapper functions, batch, tail only batch, accessor, expressions, cache, live workspace (once
+    the ring buffer went round), walk-forward expanding and rolling windows, polars inputs, duration periods, streamed
+    panels, the panel dispatcher and the local indicators service), results must agree within per indicator
+    tolerances (absolute ones scaled by each reference output magnitude). Every call is timed so performance
+    regressions are caught with correctness ones:
+
+        python -m pantulipy.parity [--seed 0] [--rows 500] [--save timings.json] [--baseline timings.json]
+
+    Registered user defined indicators (see "pantulipy.plugins") are included, their kernel is the reference.
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import batch, core, dispatch, duration, expr
+from .cache import IndicatorCache
+from .service import IndicatorClient, IndicatorServer
+from .walkforward import WalkForward
+from .workspace import Workspace
+
+__all__ = ['datasets', 'reference', 'run', 'report', 'main', 'PATHS']
+
+# (relative, absolute) tolerances, absolute ones are scaled by each reference output magnitude
+_DEFAULT_TOLERANCE = (1e-9, 1e-12)
+# linear regression running sums restarted at a different row (tail only mode) round differently over long inputs
+_TOLERANCES = {name: (1e-6, 1e-9) for name in ['fosc', 'linreg', 'linregintercept', 'linregslope', 'tsf']}
+
+
+def _frame(close, volume, spread=1.):
+    close = np.asarray(close, dtype=np.float64)
+    return pd.DataFrame({'open': np.roll(close, 1), 'high': close + spread, 'low': close - spread, 'close': close,
+                         'volume': np.asarray(volume, dtype=np.float64)},
+                        index=pd.date_range('2020-01-01', periods=len(close), freq='min'))
+
+
+def datasets(seed=0, rows=500):
+    """
+    Randomized and edge case OHLCV datasets.
+
+    :param int seed: random generator seed.
+    :param int rows: datasets length.
+    :return dict: dataset names as keys and OHLCV DataFrames as values.
+    """
+    rng = np.random.default_rng(seed)
+    walk = 100. + rng.standard_normal(rows).cumsum()
+    walk = np.abs(walk) + 1.
+    volume = rng.random(rows) * 1000. + 1.
+    return {
+        'random': _frame(walk, volume, rng.random(rows) + .01),
+        'constant': _frame(np.full(rows, 42.), np.full(rows, 10.), 0.),
+        'zero_volume': _frame(walk, np.zeros(rows)),
+        'large': _frame(walk * 1e9, volume * 1e12, 1e9),
+        'tiny': _frame(walk * 1e-8, volume * 1e-8, 1e-8),
+    }
+
+
+def _params(name):
+    return (10,) if name in core._DEFAULTLESS_INDICATORS else core._indicator_params(name)
+
+
+def reference(name, params, data, fill=True):
+    """
+    Indicator computed directly with its kernel ("Tulipy" function or registered kernel), aligned with pandas.
+
+    :param str name: indicator name.
+    :param tuple params: indicator params.
+    :param pd.DataFrame data: OHLCV data.
+    :param bool fill: back fill warm-up rows (pantulipy wrappers semantics), NaN otherwise.
+    :return np.ndarray: a (rows, outputs) float64 array.
+    """
+    fn = core._kernel(name)
+    arrays = [data[c].to_numpy(dtype=np.float64) for c in core._input_names(fn)]
+    outputs = fn(*arrays, *params)
+    outputs = outputs if type(outputs) == tuple else (outputs,)
+    columns = []
+    for values in outputs:
+        padded = pd.Series(np.concatenate([np.full(len(data) - len(values), np.nan), values]))
+        columns.append((padded.bfill() if fill else padded).to_numpy())
+    return np.column_stack(columns)
+
+
+def _as_matrix(result):
+    if isinstance(result, dict):
+        return np.column_stack([np.asarray(v, dtype=np.float64) for v in result.values()])
+    if hasattr(result, 'to_numpy'):
+        values = result.to_numpy()
+    else:
+        values = np.asarray(result)
+    return np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+
+
+def _wrapper(name, params, data):
+    return _as_matrix(getattr(core, name)(data, *params))
+
+
+def _batch(name, params, data):
+    return _as_matrix(batch.compute(data, [(name, params)]))
+
+
+def _tail(name, params, data):
+    return _as_matrix(batch.compute(data, [(name, params)], tail=min(25, len(data))))
+
+
+def _accessor(name, params, data):
+    return _as_matrix(data.copy(deep=False).tulip.indicator(name, *params))
+
+
+def _expression(name, params, data):
+    return _as_matrix(expr.evaluate(data, expr.Indicator(name, *params)))
+
+
+def _cache(name, params, data):
+    with tempfile.TemporaryDirectory() as path:
+        cache = IndicatorCache(path)
+        cache.compute(name, data, *params)
+        return _as_matrix(cache.compute(name, data, *params)).copy()
+
+
+def _ring_window(data):
+    # shorter than data, so the workspace ring buffer wraps around
+    return max(len(data) * 2 // 3, 1)
+
+
+def _workspace(name, params, data):
+    ws = Workspace(_ring_window(data), [(name, params)])
+    for row in data[core._OHLCV].itertuples(index=False):
+        ws.push(row)
+    return _as_matrix(ws.evaluate())
+
+
+def _workspace_reference(name, params, data, fill):
+    return reference(name, params, data.iloc[-_ring_window(data):], fill)
+
+
+def _expanding_end(data):
+    return len(data) - len(data) // 10
+
+
+def _walkforward(name, params, data):
+    return _as_matrix(WalkForward(data, [(name, params)]).window(_expanding_end(data)))
+
+
+def _walkforward_reference(name, params, data, fill):
+    return reference(name, params, data.iloc[:_expanding_end(data)], fill)
+
+
+def _rolling_bounds(data):
+    return len(data) // 5, len(data) - len(data) // 10
+
+
+def _rolling(name, params, data):
+    start, end = _rolling_bounds(data)
+    return _as_matrix(WalkForward(data, [(name, params)]).window(end, start))
+
+
+def _rolling_reference(name, params, data, fill):
+    start, end = _rolling_bounds(data)
+    if name in core._WINDOWED_INDICATORS:
+        # windowed indicators use bars before the window start
+        return reference(name, params, data.iloc[:end], fill)[start:]
+    return reference(name, params, data.iloc[start:end], fill)
+
+
+def _polars(name, params, data):
+    import polars as pl
+    return _as_matrix(getattr(core, name)(pl.from_pandas(data[core._OHLCV]), *params))
+
+
+def _duration(name, params, data):
+    if name not in duration.INDICATORS or name in core._PLUGINS:
+        return None
+    # a regular one minute grid, so "<period>min" windows hold "period" rows
+    return _as_matrix(getattr(core, name)(data, f'{params[0]}min', *params[1:]))
+
+
+def _duration_reference(name, params, data, fill):
+    try:
+        expected = reference(name, params, data, fill)
+    except core.InvalidOptionError:
+        # shorter than a row window, a duration window longer than the data holds no value (NaN, not an error)
+        return np.full((len(data), len(core._kernel(name).outputs)), np.nan)
+    # a duration window is complete once it no longer reaches before the first timestamp, "period" rows in
+    first = params[0]
+    expected[:first] = expected[first] if first < len(expected) else np.nan
+    return expected
+
+
+def _iter_panel(name, params, data):
+    panel = {'reversed': data.iloc[::-1], 'data': data}
+    results = dict(batch.iter_panel(panel, [(name, params)], group_size=1, ordered=False))
+    return _as_matrix(results['data'])
+
+
+def _dispatch(name, params, data):
+    results = dispatch.compute_panel({'other': data.iloc[::-1], 'data': data}, [(name, params)], decision='threads',
+                                     workers=2)
+    return _as_matrix(results['data'])
+
+
+_SERVICE = {}
+
+
+def _service(name, params, data):
+    if not _SERVICE:
+        server = IndicatorServer().start()
+        _SERVICE.update(server=server, client=IndicatorClient(server.address, server.authkey))
+    client = _SERVICE['client']
+    client.put('parity', data)
+    return _as_matrix(client.compute_frame('parity', [(name, params)]))
+
+
+def _close_service():
+    if _SERVICE:
+        _SERVICE.pop('client').close()
+        _SERVICE.pop('server').close()
+
+
+#: execution paths, names as keys and (function, causal results, compared rows, reference function) tuples as
+#: values, paths functions return None for indicators they do not support
+PATHS = {
+    'wrapper': (_wrapper, False, None, reference),
+    'batch': (_batch, False, None, reference),
+    'tail': (_tail, False, 25, reference),
+    'accessor': (_accessor, False, None, reference),
+    'expr': (_expression, False, None, reference),
+    'cache': (_cache, False, None, reference),
+    'workspace': (_workspace, False, None, _workspace_reference),
+    'walkforward': (_walkforward, True, None, _walkforward_reference),
+    'rolling': (_rolling, True, None, _rolling_reference),
+    'polars': (_polars, False, None, reference),
+    'duration': (_duration, False, None, _duration_reference),
+    'iter_panel': (_iter_panel, False, None, reference),
+    'dispatch': (_dispatch, False, None, reference),
+    'service': (_service, False, None, reference),
+}
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    try:
+        result = fn(*args)
+    except core.InvalidOptionError as error:
+        result = error
+    return result, time.perf_counter() - start
+
+
+def _compare(name, expected, got, causal=False):
+    """
+    Agreement status of a path result against the reference.
+    """
+    if causal and isinstance(expected, Exception) and not isinstance(got, Exception) and np.isnan(got).all():
+        # causal paths have no value yet instead of an error for data shorter than warm-up
+        return 'ok', 0.
+    if isinstance(expected, Exception) or isinstance(got, Exception):
+        if isinstance(expected, Exception) and isinstance(got, Exception):
+            return 'ok', 0.
+        return 'error', np.inf
+    if expected.shape != got.shape:
+        return 'shape', np.inf
+    rtol, atol = _TOLERANCES.get(name, _DEFAULT_TOLERANCE)
+    # per output magnitude, so a large output does not hide differences of a small one
+    scale = np.max(np.where(np.isfinite(expected), np.abs(expected), 0.), axis=0, initial=0.)
+    scale[scale == 0.] = 1.
+    if np.allclose(got, expected, rtol=rtol, atol=atol * scale, equal_nan=True):
+        return 'ok', 0.
+    finite = np.isfinite(expected) & np.isfinite(got)
+    diff = float(np.max(np.abs(got[finite] - expected[finite]))) if finite.any() else np.inf
+    return 'mismatch', diff
+
+
+def run(indicators=None, paths=None, seed=0, rows=500):
+    """
+    Run indicators through execution paths over every dataset and compare them with direct kernel calls.
+
+    Besides "datasets", each indicator is also run over a dataset just one row longer than its warm-up.
+
+    :param list indicators: indicator names (every item of "pantulipy.core.__all__" by default).
+    :param list paths: execution path names (every "PATHS" key by default).
+    :param int seed: random generator seed.
+    :param int rows: datasets length.
+    :return list: a record dict per (indicator, dataset, path) with status, max difference and timings.
+    """
+    indicators = indicators or list(core.__all__)
+    paths = paths or list(PATHS)
+    frames = datasets(seed, rows)
+    records = []
+    try:
+        for name in indicators:
+            params = _params(name)
+            cases = dict(frames)
+            cases['short'] = frames['random'].iloc[:min(core._warmup(name, params) + 1, rows)]
+            for dataset, data in cases.items():
+                expected = {}
+                for path in paths:
+                    fn, causal, tail, reference_fn = PATHS[path]
+                    got, elapsed = _timed(fn, name, params, data)
+                    if got is None:
+                        continue
+                    if (reference_fn, causal) not in expected:
+                        expected[reference_fn, causal] = _timed(reference_fn, name, params, data, not causal)
+                    want, reference_seconds = expected[reference_fn, causal]
+                    if tail and not isinstance(want, Exception):
+                        want = want[-min(tail, len(data)):]
+                    status, diff = _compare(name, want, got, causal)
+                    if status == 'error' and isinstance(got, Exception):
+                        status = f'error: {type(got).__name__}'
+                    records.append({'indicator': name, 'dataset': dataset, 'path': path, 'status': status,
+                                    'max_diff': diff, 'seconds': elapsed, 'reference_seconds': reference_seconds})
+    finally:
+        _close_service()
+    return records
+
+
+def report(records, baseline=None, slowdown=1.5):
+    """
+    Parity and timings report.
+
+    :param list records: "run" records.
+    :param list baseline: previous "run" records, paths slower than "slowdown" times their baseline are reported.
+    :param float slowdown: timing regression factor.
+    :return tuple: report text and the number of failures (mismatches and timing regressions).
+    """
+    lines = []
+    failures = [r for r in records if r['status'] != 'ok']
+    for r in failures:
+        lines.append(f'{r["status"]:>12} {r["indicator"]:<16} {r["dataset"]:<12} {r["path"]:<12} '
+                     f'max diff {r["max_diff"]:.3g}')
+    frame = pd.DataFrame(records)
+    timings = frame.groupby('path')[['seconds', 'reference_seconds']].sum()
+    timings['ratio'] = timings['seconds'] / timings['reference_seconds']
+    lines.append('')
+    lines.append('path          seconds   x reference')
+    for path, row in timings.iterrows():
+        lines.append(f'{path:<12} {row["seconds"]:8.4f}   {row["ratio"]:8.1f}')
+    regressions = 0
+    if baseline:
+        previous = pd.DataFrame(baseline).groupby('path')['seconds'].sum()
+        for path, seconds in timings['seconds'].items():
+            if path in previous and seconds > previous[path] * slowdown:
+                regressions += 1
+                lines.append(f'timing regression: {path} {seconds:.4f}s (baseline {previous[path]:.4f}s)')
+    lines.append(f'{len(records) - len(failures)}/{len(records)} checks agree')
+    return '\n'.join(lines), len(failures) + regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pantulipy.parity',
+                                     description='Check every pantulipy execution path against direct Tulipy calls.')
+    parser.add_argument('--seed', type=int, default=0, help='random datasets seed')
+    parser.add_argument('--rows', type=int, default=500, help='datasets length')
+    parser.add_argument('--indicators', nargs='*', help='indicators subset (default: all)')
+    parser.add_argument('--paths', nargs='*', choices=list(PATHS), help='execution paths subset (default: all)')
+    parser.add_argument('--save', help='save records (with timings) to a JSON file')
+    parser.add_argument('--baseline', help='records JSON file from a previous run to check timing regressions')
+    parser.add_argument('--slowdown', type=float, default=1.5, help='timing regression factor')
+    args = parser.parse_args(argv)
+    records = run(args.indicators, args.paths, args.seed, args.rows)
+    baseline = json.loads(open(args.baseline).read()) if args.baseline else None
+    text, failures = report(records, baseline, args.slowdown)
+    print(text)
+    if args.save:
+        with open(args.save, 'w') as fp:
+            json.dump(records, fp)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
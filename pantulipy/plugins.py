@@ -0,0 +1,212 @@
+# -*- coding:utf-8 -*-
+"""
+    User defined indicators registration.
+
+    A registered indicator supplies a vectorized kernel (NumPy, Numba, ...) and declares its inputs, options,
+    outputs and warm-up, then it is available as a pantulipy function and by name in batch specs, the cache,
+    the "tulip" accessor, expressions, workspaces and panel dispatch, exactly like "Tulipy" based indicators:
+
+    >>> from pantulipy import plugins
+    >>> def rvwma(close, volume, period):
+    ...     weighted = np.convolve(close * volume, np.ones(period), 'valid')
+    ...     return weighted / np.convolve(volume, np.ones(period), 'valid')
+    >>> plugins.register('rvwma', rvwma, ['close', 'volume'], {'period': 20}, warmup=lambda period: period - 1,
+    ...                  kind='windowed')
+    >>> pantulipy.rvwma(ohlc, 50)
+    >>> batch.compute(ohlc, ['rsi', ('rvwma', 50)], tail=1)
+
+    Registration must happen at import time of a module (not only under "__main__" guards) for indicators to be
+    available in processes pools workers.
+"""
+import inspect as insp
+import pkgutil
+import sys
+
+import numpy as np
+
+from . import core, expr
+
+__all__ = ['Plugin', 'register', 'unregister']
+
+_KINDS = {'windowed': core._WINDOWED_INDICATORS, 'recursive': core._RECURSIVE_INDICATORS,
+          'cumulative': core._CUMULATIVE_INDICATORS}
+
+
+class Plugin:
+    """
+    User defined indicator kernel with the "Tulipy" functions interface (unpadded float64 outputs).
+    """
+
+    def __init__(self, name, kernel, inputs, options, outputs, warmup):
+        """
+        Constructor.
+
+        :param str name: indicator name.
+        :param function kernel: vectorized function called as kernel(*inputs_arrays, *options).
+        :param list inputs: input column names.
+        :param list options: option names.
+        :param list outputs: output names.
+        :param warmup: leading rows without a value, an int or a function called with options values.
+        """
+        self.__name__ = name
+        self.kernel = kernel
+        self.inputs = list(inputs)
+        self.options = list(options)
+        self.outputs = list(outputs)
+        self.warmup = warmup
+        kind = insp.Parameter.POSITIONAL_OR_KEYWORD
+        self.__signature__ = insp.Signature([insp.Parameter(p, kind) for p in self.inputs + self.options])
+
+    def lookback(self, *options):
+        """
+        Leading input rows without an indicator value.
+
+        :param options: indicator options values.
+        :return int: warm-up rows.
+        """
+        return int(self.warmup(*options) if callable(self.warmup) else self.warmup)
+
+    def __call__(self, *args):
+        inputs, options = args[:len(self.inputs)], args[len(self.inputs):]
+        num_rows = len(inputs[0])
+        warmup = self.lookback(*options)
+        if warmup >= num_rows:
+            raise core.InvalidOptionError()
+        data = self.kernel(*inputs, *options)
+        data = list(data) if isinstance(data, (tuple, list)) else [data]
+        if len(data) != len(self.outputs):
+            raise ValueError(f'{self.__name__} kernel returned {len(data)} outputs, {len(self.outputs)} declared')
+        results = []
+        for values in data:
+            values = np.asarray(values, dtype=np.float64)
+            # full length outputs are trimmed to "Tulipy" convention (warm-up rows dropped)
+            if len(values) == num_rows:
+                values = values[warmup:]
+            elif len(values) != num_rows - warmup:
+                raise ValueError(f'{self.__name__} kernel returned {len(values)} rows, expected {num_rows} or '
+                                 f'{num_rows - warmup}')
+            results.append(np.ascontiguousarray(values))
+        return tuple(results) if len(results) > 1 else results[0]
+
+    def __repr__(self):
+        return f'Plugin({self.__name__}, inputs={self.inputs}, options={self.options}, outputs={self.outputs})'
+
+
+def _function(name, plugin, defaults, compact):
+    def indicator(data, *args, **kwargs):
+        compact_output = kwargs.pop('compact', False)
+        params = core._indicator_params(name, *args, **kwargs)
+        return core._tup(plugin, data, *params, compact=compact_output)
+
+    kind = insp.Parameter.POSITIONAL_OR_KEYWORD
+    params = [insp.Parameter('data', kind)]
+    params.extend(insp.Parameter(option, kind, default=defaults.get(option, insp.Parameter.empty))
+                  for option in plugin.options)
+    if compact:
+        params.append(insp.Parameter('compact', kind, default=False))
+    indicator.__signature__ = insp.Signature(params)
+    indicator.__name__ = name
+    indicator.__qualname__ = name
+    indicator.__module__ = core.__name__
+    return indicator
+
+
+def _reserved(name):
+    """
+    Check if a name is already used by pantulipy (core and expressions module attributes, package attributes and
+    submodules), registering it would replace that object.
+
+    :param str name: indicator name.
+    :return bool: True if name is already used.
+    """
+    if name in core._FUNCS or name in vars(core) or name in vars(expr):
+        return True
+    package = sys.modules.get(__package__)
+    if package is None:
+        return False
+    return name in vars(package) or any(m.name == name for m in pkgutil.iter_modules(package.__path__))
+
+
+def register(name, kernel, inputs, options=None, outputs=None, warmup=0, kind='recursive', compact_dtype=None,
+             doc=None):
+    """
+    Register a user defined indicator.
+
+    :param str name: indicator name, a valid identifier not starting with "_" and not already used by a "Tulipy"
+        indicator or any other pantulipy name (functions, helpers or submodules).
+    :param function kernel: vectorized function called as kernel(*inputs_arrays, *options) returning an array (or a
+        tuple of arrays for multiple outputs) either input length (warm-up rows are dropped) or input length minus
+        warm-up rows.
+    :param list inputs: input column names from open, high, low, close and volume (in kernel order).
+    :param options: option names list or an ordered dict with option names as keys and defaults as values.
+    :param list outputs: output names (a single output named as the indicator by default).
+    :param warmup: leading rows without a value, an int or a function called with options values.
+    :param str kind: "windowed" (only the last warm-up + 1 rows are read, enables tail mode and cache extension),
+        "recursive" or "cumulative".
+    :param compact_dtype: numpy dtype used for outputs when called with "compact=True".
+    :param str doc: function docstring.
+    :return function: the pantulipy function for the new indicator.
+    """
+    if not name.isidentifier() or name.startswith('_') or (name not in core._PLUGINS and _reserved(name)):
+        raise ValueError(f'Invalid or reserved indicator name "{name}"')
+    if kind not in _KINDS:
+        raise ValueError(f'Unknown indicator kind "{kind}", expected one of {", ".join(_KINDS)}')
+    unknown = [i for i in inputs if i not in core._OHLCV]
+    if not inputs or unknown:
+        raise ValueError(f'Indicator inputs must be some of {", ".join(core._OHLCV)}, got {inputs}')
+    defaults = dict(options) if isinstance(options, dict) else {}
+    options = list(options or [])
+    if any(o in core._OHLCV or 'real' in o or o in ('data', 'compact') for o in options):
+        raise ValueError(f'Option names cannot be input column names, "data" or "compact", got {options}')
+    outputs = list(outputs or [name])
+    if name in core._PLUGINS:
+        unregister(name)
+
+    plugin = Plugin(name, kernel, inputs, options, outputs, warmup)
+    fn = _function(name, plugin, defaults, compact_dtype is not None)
+    columns = ', '.join(inputs)
+    fn.__doc__ = doc or (f'User defined indicator "{name}".\n\n'
+                         f'    :param pd.DataFrame data: a DataFrame instance with data columns ({columns}).\n'
+                         + ''.join(f'    :param {o}: indicator option.\n' for o in options) +
+                         f'    :return: indicator results (same library as data).\n')
+    core._PLUGINS[name] = plugin
+    if len(outputs) > 1:
+        core._fx_column_names[name.upper()] = [o.upper() for o in outputs]
+    if compact_dtype is not None:
+        core._COMPACT_DTYPES[name] = compact_dtype
+    if len(defaults) < len(options):
+        core._DEFAULTLESS_INDICATORS.append(name)
+    _KINDS[kind].append(name)
+    core.__all__.append(name)
+    setattr(core, name, fn)
+    expr.__all__.append(name)
+    setattr(expr, name, expr._factory(name))
+    package = sys.modules.get(__package__)
+    if package is not None:
+        setattr(package, name, fn)
+    core._signature.cache_clear()
+    core._warmup.cache_clear()
+    return fn
+
+
+def unregister(name):
+    """
+    Remove a user defined indicator.
+
+    :param str name: registered indicator name.
+    """
+    if name not in core._PLUGINS:
+        raise ValueError(f'"{name}" is not a registered indicator')
+    del core._PLUGINS[name]
+    core._fx_column_names.pop(name.upper(), None)
+    core._COMPACT_DTYPES.pop(name, None)
+    for registry in [core._DEFAULTLESS_INDICATORS, core.__all__, expr.__all__, *_KINDS.values()]:
+        if name in registry:
+            registry.remove(name)
+    delattr(core, name)
+    delattr(expr, name)
+    package = sys.modules.get(__package__)
+    if package is not None and getattr(package, name, None) is not None:
+        delattr(package, name)
+    core._signature.cache_clear()
+    core._warmup.cache_clear()
@@ -0,0 +1,311 @@
+# -*- coding:utf-8 -*-
+"""
+    Vectorized screening rules over a whole universe of symbols.
+
+    Rules are written as Python boolean expressions over input columns and indicator calls (same names and params as
+    pantulipy functions, multiple outputs selected as attributes):
+
+    >>> from pantulipy import screen
+    >>> rule = screen.Rule('rsi(14) < 30 and close > sma(200) and crossover(ema(12), ema(26))')
+    >>> rule.specs
+    [('rsi', (14,)), ('sma', (200,)), ('ema', (12,)), ('ema', (26,))]
+    >>> rule.matches(panel)
+    ['ETH', 'SOL']
+    >>> screen.screen(panel, [rule, 'macd(12, 26, 9).histogram > 0 and volume > 2 * sma(volume, 20)'])
+
+    Every distinct indicator spec of all rules is computed once per symbol through the batch path, only over the
+    last rows the rules need (tail only mode), then rules are evaluated over (time, symbol) matrices at once.
+    Indicators over other expressions (like "sma(volume, 20)") are computed with "pantulipy.expr" over the whole
+    history, "crossover" and "crossany" of any two operands are evaluated directly over the matrices.
+
+    Datasets may have different lengths, they are aligned on their last row. Missing values (warm-up rows, too
+    short histories) compare as False, as pandas comparisons do.
+"""
+import ast
+
+import numpy as np
+import pandas as pd
+
+from . import batch, core, expr
+
+__all__ = ['Rule', 'evaluate', 'screen']
+
+_COMPARISONS = {ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater, ast.GtE: np.greater_equal,
+                ast.Eq: np.equal, ast.NotEq: np.not_equal}
+_ARITHMETIC = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide}
+_CROSSES = ['crossany', 'crossover']
+
+
+class Rule:
+    """
+    A compiled screening rule.
+    """
+
+    def __init__(self, text):
+        """
+        Constructor.
+
+        :param str text: rule like "rsi(14) < 30 and close > sma(200)".
+        :raise ValueError: for unknown names or unsupported syntax.
+        """
+        self.text = text
+        self._specs = {}
+        self._nested = {}
+        self._columns = set()
+        try:
+            tree = ast.parse(text.strip(), mode='eval').body
+        except SyntaxError as error:
+            raise ValueError(f'Invalid rule "{text}": {error.msg}') from None
+        self._tree, self.lookback = self._build(tree)
+
+    @property
+    def specs(self):
+        """
+        Distinct indicators specs computed through the batch path.
+
+        :return list: normalized (name, params) specs.
+        """
+        return list(self._specs)
+
+    def _build(self, node):
+        """
+        Compile an ast node into an evaluation tree.
+
+        :return tuple: evaluation tree node and rows needed before the evaluated rows (by crossings).
+        """
+        if isinstance(node, ast.BoolOp):
+            items = [self._build(v) for v in node.values]
+            return ('and' if isinstance(node.op, ast.And) else 'or', [i[0] for i in items]), max(i[1] for i in items)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+            operand, lookback = self._build(node.operand)
+            return ('not' if isinstance(node.op, ast.Not) else 'neg', operand), lookback
+        if isinstance(node, ast.Compare):
+            items = [self._build(v) for v in [node.left] + node.comparators]
+            ops = []
+            for op in node.ops:
+                if type(op) not in _COMPARISONS:
+                    raise ValueError(f'Unsupported comparison in rule "{self.text}"')
+                ops.append(_COMPARISONS[type(op)])
+            return ('compare', ops, [i[0] for i in items]), max(i[1] for i in items)
+        if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+            left, right = self._build(node.left), self._build(node.right)
+            return ('arithmetic', _ARITHMETIC[type(node.op)], left[0], right[0]), max(left[1], right[1])
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return ('constant', float(node.value)), 0
+        if isinstance(node, ast.Name):
+            return ('column', self._column(node.id)), 0
+        if isinstance(node, ast.Call) and _call_name(node) in _CROSSES and len(node.args) == 2 and not node.keywords:
+            left, right = self._build(node.args[0]), self._build(node.args[1])
+            return ('cross', _call_name(node), left[0], right[0]), max(left[1], right[1]) + 1
+        if isinstance(node, (ast.Call, ast.Attribute, ast.Subscript)):
+            indicator, position = _selected(node)
+            if isinstance(indicator, ast.Call) and not _call_inputs(indicator):
+                args, kwargs = _call_params(indicator)
+                spec = core._parse_spec((_call_name(indicator), *args, kwargs))
+                self._specs.setdefault(spec, None)
+                return ('spec', spec, _output_position(expr.Indicator(*spec[:1], *spec[1]), position)), 0
+            leaf = self._expression(node)
+            self._nested[leaf.key] = leaf
+            self._columns.update(leaf.columns())
+            return ('nested', leaf.key), 0
+        raise ValueError(f'Unsupported expression "{ast.unparse(node)}" in rule "{self.text}"')
+
+    def _column(self, name):
+        if name not in core._OHLCV:
+            raise ValueError(f'Unknown column "{name}" in rule "{self.text}", use one of {core._OHLCV}')
+        self._columns.add(name)
+        return name
+
+    def _expression(self, node):
+        """
+        Convert an ast node into a "pantulipy.expr" expression (indicators over other expressions).
+        """
+        if isinstance(node, ast.Name):
+            return expr.col(self._column(node.id))
+        if isinstance(node, ast.Call):
+            args, kwargs = _call_params(node)
+            return expr.Indicator(_call_name(node), *[self._expression(i) for i in _call_inputs(node)], *args,
+                                  **kwargs)
+        if isinstance(node, (ast.Attribute, ast.Subscript)):
+            indicator, position = _selected(node)
+            result = self._expression(indicator)
+            return result.output(position) if isinstance(result, expr.Indicator) else result
+        raise ValueError(f'Unsupported indicator input "{ast.unparse(node)}" in rule "{self.text}"')
+
+    def evaluate(self, leaves, rows):
+        """
+        Evaluate this rule over computed leaves matrices.
+
+        :param dict leaves: leaves keys as keys and (time, symbol) float64 matrices as values.
+        :param int rows: number of last rows to return.
+        :return np.ndarray: a (rows, symbol) boolean matrix.
+        """
+        shape = next(iter(leaves.values())).shape if leaves else (rows, 0)
+        result = np.broadcast_to(np.asarray(_evaluate(self._tree, leaves), dtype=np.bool_), shape)
+        return result[len(result) - rows:]
+
+    def mask(self, panel, rows=1):
+        """
+        Evaluate this rule over a panel.
+
+        :param dict panel: symbols as keys and datasets (see "batch.compute") as values.
+        :param int rows: number of last rows to evaluate.
+        :return np.ndarray: a (rows, symbol) boolean matrix, symbols in panel order.
+        """
+        return evaluate(panel, [self], rows)[self.text]
+
+    def matches(self, panel):
+        """
+        Symbols matching this rule at their last row.
+
+        :param dict panel: symbols as keys and datasets (see "batch.compute") as values.
+        :return list: matching symbols.
+        """
+        return [symbol for symbol, match in zip(panel, self.mask(panel)[-1]) if match]
+
+    def __repr__(self):
+        return f'Rule({self.text!r})'
+
+
+def _call_name(node):
+    if not isinstance(node.func, ast.Name) or node.func.id not in core.__all__:
+        raise ValueError(f'Unknown indicator "{ast.unparse(node.func)}"')
+    return node.func.id
+
+
+def _is_param(node):
+    try:
+        ast.literal_eval(node)
+    except ValueError:
+        return False
+    return True
+
+
+def _call_inputs(node):
+    return [a for a in node.args if not _is_param(a)]
+
+
+def _call_params(node):
+    args = [ast.literal_eval(a) for a in node.args if _is_param(a)]
+    return args, {k.arg: ast.literal_eval(k.value) for k in node.keywords}
+
+
+def _selected(node):
+    """
+    Split "macd(12, 26, 9).signal" or "bbands(20, 2)['upper']" into the indicator node and the output name.
+    """
+    if isinstance(node, ast.Attribute):
+        return node.value, node.attr
+    if isinstance(node, ast.Subscript):
+        return node.value, ast.literal_eval(node.slice)
+    return node, None
+
+
+def _output_position(indicator, which):
+    if which is None:
+        if len(indicator.outputs) > 1:
+            raise ValueError(f'{indicator.name} has multiple outputs, select one like "{indicator.name}.'
+                             f'{indicator.outputs[-1].split("_", 1)[-1]}"')
+        return 0
+    return indicator.output(which).position
+
+
+def _evaluate(node, leaves):
+    kind = node[0]
+    if kind == 'constant':
+        return node[1]
+    if kind in ('column', 'nested'):
+        return leaves[node[:2]]
+    if kind == 'spec':
+        return leaves[node]
+    if kind in ('and', 'or'):
+        items = [_evaluate(item, leaves) for item in node[1]]
+        reduce = np.logical_and if kind == 'and' else np.logical_or
+        return reduce.reduce(np.broadcast_arrays(*items)) if len(items) > 1 else items[0]
+    if kind == 'not':
+        return np.logical_not(_evaluate(node[1], leaves))
+    if kind == 'neg':
+        return np.negative(_evaluate(node[1], leaves))
+    if kind == 'arithmetic':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return node[1](_evaluate(node[2], leaves), _evaluate(node[3], leaves))
+    if kind == 'compare':
+        items = [_evaluate(item, leaves) for item in node[2]]
+        result = True
+        with np.errstate(invalid='ignore'):
+            for op, left, right in zip(node[1], items[:-1], items[1:]):
+                result = np.logical_and(result, op(left, right))
+        return result
+    # crossings over the previous row, the first row has no previous one
+    left, right = (np.asarray(_evaluate(item, leaves), dtype=np.float64) for item in node[2:])
+    left, right = np.broadcast_arrays(np.atleast_2d(left), np.atleast_2d(right))
+    result = np.zeros(left.shape, dtype=np.bool_)
+    now, before = (slice(1, None), slice(None, -1))
+    with np.errstate(invalid='ignore'):
+        up = (left[now] > right[now]) & (left[before] <= right[before])
+        if node[1] == 'crossany':
+            up |= (left[now] < right[now]) & (left[before] >= right[before])
+    result[now] = up
+    return result
+
+
+def evaluate(panel, rules, rows=1):
+    """
+    Evaluate many rules over a panel computing every distinct indicator spec only once per symbol.
+
+    :param dict panel: symbols as keys and datasets (see "batch.compute") as values, aligned on their last row.
+    :param list rules: "Rule" instances or rules texts.
+    :param int rows: number of last rows to evaluate.
+    :return dict: rules texts as keys and (rows, symbol) boolean matrices (symbols in panel order) as values.
+    """
+    rules = [rule if isinstance(rule, Rule) else Rule(rule) for rule in rules]
+    rows = max(int(rows), 1)
+    depth = rows + max(rule.lookback for rule in rules)
+    specs = list(dict.fromkeys(spec for rule in rules for spec in rule.specs))
+    nested = {key: node for rule in rules for key, node in rule._nested.items()}
+    columns = {column for rule in rules for column in rule._columns}
+    needed = list(dict.fromkeys(batch._needed_columns(specs) + sorted(columns)))
+    symbols = list(panel)
+
+    leaves = {('column', column): np.full((depth, len(symbols)), np.nan) for column in columns}
+    leaves.update({('nested', key): np.full((depth, len(symbols)), np.nan) for key in nested})
+    for name, params in specs:
+        for position in range(len(core._spec_columns(name, params))):
+            leaves[('spec', (name, params), position)] = np.full((depth, len(symbols)), np.nan)
+
+    def store(key, s, values):
+        values = values[max(len(values) - depth, 0):]
+        leaves[key][depth - len(values):, s] = values
+
+    for s, symbol in enumerate(symbols):
+        staged = core._stage_columns(panel[symbol], needed)
+        for column in columns:
+            store(('column', column), s, staged[column])
+        for name, params in specs:
+            try:
+                outputs = batch.compute_arrays(staged, [(name, params)], depth, fill=False)
+            except core.InvalidOptionError:
+                # history too short for this spec, its values stay missing
+                continue
+            for position, values in enumerate(outputs.values()):
+                store(('spec', (name, params), position), s, values)
+        memo = {}
+        for key, node in nested.items():
+            try:
+                outputs, _ = expr._compute(node, staged, memo)
+            except core.InvalidOptionError:
+                continue
+            store(('nested', key), s, outputs[0])
+    return {rule.text: rule.evaluate(leaves, rows) for rule in rules}
+
+
+def screen(panel, rules):
+    """
+    Rules matches at the last row of every symbol.
+
+    :param dict panel: symbols as keys and datasets (see "batch.compute") as values.
+    :param list rules: "Rule" instances or rules texts.
+    :return pd.DataFrame: a boolean frame with symbols as index and rules texts as columns.
+    """
+    masks = evaluate(panel, rules)
+    return pd.DataFrame({text: mask[-1] for text, mask in masks.items()}, index=pd.Index(list(panel), name='symbol'))
@@ -0,0 +1,410 @@
+# -*- coding:utf-8 -*-
+"""
+    Local indicators service.
+
+    A single server process owns bars data, computes requested indicators specs through the batch path and
+    publishes every result once into a shared memory block which any client in the same host maps without copying.
+    Equal requests from many clients (even concurrent ones) are computed only once.
+
+    Requests are pickled, so connections are always authenticated: the server generates a random key when none is
+    given and clients must use the same key ("IndicatorServer.authkey"):
+
+    >>> server = IndicatorServer('/tmp/pantulipy.sock')
+    >>> server.start()
+    >>> client = IndicatorClient('/tmp/pantulipy.sock', server.authkey)
+    >>> client.put('BTC/USDT', ohlc)
+    >>> client.compute('BTC/USDT', ['rsi', ('sma', 50)])
+"""
+import secrets
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError, resource_tracker
+from multiprocessing.connection import Client, Listener
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from . import batch, core
+
+__all__ = ['IndicatorServer', 'IndicatorClient']
+
+
+def _shared_memory(name=None, size=0):
+    """
+    Create or map a shared memory block not tracked by the process resource tracker.
+
+    The server unlinks its blocks explicitly, and a tracked block would be unlinked by any client process tracker
+    at exit (or twice when clients share the server tracker, as forked processes do).
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, create=name is None, size=size, track=False)
+    shm = SharedMemory(name=name, create=name is None, size=size)
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def _no_delay(conn):
+    """
+    Disable Nagle's algorithm on TCP connections.
+
+    Large messages are sent as a header and a payload, with Nagle's algorithm the payload waits for the header
+    delayed acknowledgement (about 40 ms per request on Linux).
+    """
+    sock = socket.socket(fileno=conn.fileno())
+    try:
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    finally:
+        # the descriptor is still owned by the connection
+        sock.detach()
+    return conn
+
+
+def _unlink(shm):
+    shm.close()
+    if sys.version_info < (3, 13):
+        # "unlink" unregisters the block from the resource tracker, register it back so that stays balanced
+        resource_tracker.register(shm._name, 'shared_memory')
+    shm.unlink()
+
+
+class _Dataset:
+    def __init__(self, version, columns, index):
+        self.version = version
+        self.staged = {name: np.ascontiguousarray(values, dtype=np.float64) for name, values in columns.items()}
+        self.index = index
+
+
+class IndicatorServer:
+    """
+    Local indicators server (Unix socket path or localhost (host, port) address).
+    """
+    # seconds between "closed" checks of idle connections handlers
+    _POLL_INTERVAL = .1
+
+    def __init__(self, address=('127.0.0.1', 0), authkey=None, latency_window=10000):
+        """
+        Constructor.
+
+        :param address: a Unix socket path or a (host, port) tuple (port 0 picks a free one).
+        :param bytes authkey: connection authentication key (a random one by default, see "authkey" attribute).
+        :param int latency_window: number of recent requests used for latency stats.
+        """
+        #: connection authentication key clients must use.
+        self.authkey = secrets.token_bytes(32) if authkey is None else authkey
+        self._listener = Listener(address, authkey=self.authkey)
+        self.address = self._listener.address
+        self._lock = threading.Lock()
+        self._datasets = {}
+        self._published = {}
+        self._inflight = {}
+        self._latencies = deque(maxlen=latency_window)
+        self._counters = {'requests': 0, 'specs': 0, 'computed': 0, 'hits': 0, 'deduplicated': 0}
+        self._started = time.perf_counter()
+        self._thread = None
+        self._handlers = set()
+        self._serving = False
+        self._closed = False
+
+    def set_data(self, symbol, ohlc):
+        """
+        Replace a symbol bars data, previous results are unpublished.
+
+        :param str symbol: symbol name.
+        :param ohlc: a DataFrame instance with data columns (open, high, low, close, volume) or a dict of arrays.
+        """
+        kind = core._frame_kind(ohlc)
+        columns = [c for c in core._OHLCV if c in (ohlc.keys() if kind == 'numpy' else ohlc.columns)]
+        staged = core._stage_columns(ohlc, columns)
+        index = ohlc.index if kind == 'pandas' else pd.RangeIndex(len(next(iter(staged.values()))))
+        self._set_dataset(symbol, staged, index)
+
+    def _set_dataset(self, symbol, columns, index):
+        with self._lock:
+            previous = self._datasets.get(symbol)
+            version = previous.version + 1 if previous else 1
+            self._datasets[symbol] = _Dataset(version, columns, index)
+            stale = [key for key in self._published if key[0] == symbol]
+            segments = [self._published.pop(key)[0] for key in stale]
+        for shm in segments:
+            _unlink(shm)
+
+    def _publish(self, columns):
+        block = np.stack(list(columns.values())) if columns else np.empty((0, 0))
+        shm = _shared_memory(size=max(block.nbytes, 1))
+        np.ndarray(block.shape, dtype=np.float64, buffer=shm.buf)[...] = block
+        return shm, list(columns), block.shape
+
+    def compute(self, symbol, specs):
+        """
+        Compute (or get already published) indicators specs for a symbol.
+
+        :param str symbol: symbol name.
+        :param list specs: indicators specs like "rsi", ("sma", 50) or ("macd", 12, 26, {"signal_period": 9}).
+        :return tuple: data version and a list of (column names, shared memory name, block shape) per spec.
+        """
+        start = time.perf_counter()
+        specs = [core._parse_spec(spec) for spec in specs]
+        owned, waiting = [], []
+        with self._lock:
+            dataset = self._datasets[symbol]
+            self._counters['requests'] += 1
+            self._counters['specs'] += len(specs)
+            for name, params in specs:
+                key = (symbol, dataset.version, name, params)
+                if key in self._published:
+                    self._counters['hits'] += 1
+                elif key in self._inflight:
+                    self._counters['deduplicated'] += 1
+                    waiting.append(self._inflight[key])
+                else:
+                    self._inflight[key] = Future()
+                    owned.append(key)
+        for n, key in enumerate(owned):
+            try:
+                columns = batch.compute_arrays(dataset.staged, [key[2:]])
+                published = self._publish(columns)
+            except BaseException as error:
+                with self._lock:
+                    for failed in owned[n:]:
+                        self._inflight.pop(failed).set_exception(error)
+                raise
+            with self._lock:
+                self._counters['computed'] += 1
+                if self._datasets.get(symbol) is dataset:
+                    self._published[key] = published
+                else:
+                    _unlink(published[0])
+                self._inflight.pop(key).set_result(published)
+        for future in waiting:
+            future.result()
+        with self._lock:
+            missing = [spec for spec in specs if (symbol, dataset.version) + spec not in self._published]
+            result = [self._published[(symbol, dataset.version) + spec] for spec in specs if spec not in missing]
+        if missing:
+            # data replaced while computing, retry over the new version
+            return self.compute(symbol, specs)
+        self._latencies.append(time.perf_counter() - start)
+        return dataset.version, [(columns, shm.name, shape) for shm, columns, shape in result]
+
+    def stats(self):
+        """
+        Server counters, latency and throughput stats.
+
+        :return dict: requests, specs, computed, hits and deduplicated counters, uptime in seconds, requests per
+            second and latency mean, p50 and p99 in milliseconds (over recent requests).
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            latencies = np.asarray(self._latencies) * 1000.
+            stats['symbols'] = len(self._datasets)
+            stats['published'] = len(self._published)
+        stats['uptime'] = time.perf_counter() - self._started
+        stats['requests_per_second'] = stats['requests'] / stats['uptime'] if stats['uptime'] else 0.
+        if len(latencies):
+            stats.update(latency_mean=float(latencies.mean()), latency_p50=float(np.percentile(latencies, 50)),
+                         latency_p99=float(np.percentile(latencies, 99)))
+        return stats
+
+    def _handle(self, conn):
+        with conn:
+            while not self._closed:
+                try:
+                    # polled so that "close" stops idle connections handlers
+                    if not conn.poll(self._POLL_INTERVAL):
+                        continue
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    break
+                command, args = request[0], request[1:]
+                try:
+                    if command == 'put':
+                        symbol, columns, index = args
+                        self._set_dataset(symbol, columns, index)
+                        response = None
+                    elif command == 'compute':
+                        symbol, specs, known_version = args
+                        version, results = self.compute(symbol, specs)
+                        index = self._datasets[symbol].index if version != known_version else None
+                        response = version, results, index
+                    elif command == 'stats':
+                        response = self.stats()
+                    else:
+                        raise ValueError(f'Unknown command "{command}"')
+                    conn.send(('ok', response))
+                except Exception as error:
+                    conn.send(('error', error))
+
+    def serve_forever(self):
+        """
+        Accept clients connections (one thread per client) until "close" is called.
+        """
+        self._serving = True
+        try:
+            self._accept()
+        finally:
+            self._serving = False
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                conn = _no_delay(self._listener.accept())
+            except (OSError, EOFError, AuthenticationError):
+                # rejected (wrong key) or dropped connection attempts
+                if self._closed:
+                    break
+                continue
+            if self._closed:
+                # the "close" wake up connection
+                conn.close()
+                break
+            handler = threading.Thread(target=self._handle, args=(conn,), daemon=True)
+            with self._lock:
+                self._handlers = {thread for thread in self._handlers if thread.is_alive()}
+                self._handlers.add(handler)
+            handler.start()
+
+    def start(self):
+        """
+        Serve in a background thread.
+
+        :return IndicatorServer: this server.
+        """
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self, timeout=None):
+        """
+        Stop serving: close clients connections (after their current request), wait for serving threads and unlink
+        every published shared memory block.
+
+        :param float timeout: seconds to wait for each serving thread (forever by default).
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._serving:
+            # closing the listener does not interrupt a blocked "accept", a connection does
+            try:
+                Client(self.address, authkey=self.authkey).close()
+            except (OSError, EOFError):
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._listener.close()
+        with self._lock:
+            handlers = list(self._handlers)
+            self._handlers.clear()
+        for handler in handlers:
+            handler.join(timeout)
+        with self._lock:
+            segments = [published[0] for published in self._published.values()]
+            self._published.clear()
+        for shm in segments:
+            _unlink(shm)
+
+
+class IndicatorClient:
+    """
+    Indicators service client, results are read only numpy views over the server shared memory blocks.
+    """
+
+    def __init__(self, address, authkey):
+        """
+        Constructor.
+
+        :param address: server Unix socket path or (host, port) tuple.
+        :param bytes authkey: server connection authentication key ("IndicatorServer.authkey").
+        """
+        self._conn = _no_delay(Client(address, authkey=authkey))
+        self._lock = threading.Lock()
+        self._segments = {}
+        self._indexes = {}
+
+    def _request(self, *request):
+        with self._lock:
+            self._conn.send(request)
+            status, response = self._conn.recv()
+        if status == 'error':
+            raise response
+        return response
+
+    def put(self, symbol, ohlc):
+        """
+        Send (replace) a symbol bars data to the server.
+
+        :param str symbol: symbol name.
+        :param ohlc: a DataFrame instance with data columns (open, high, low, close, volume).
+        """
+        kind = core._frame_kind(ohlc)
+        columns = [c for c in core._OHLCV if c in (ohlc.keys() if kind == 'numpy' else ohlc.columns)]
+        staged = core._stage_columns(ohlc, columns)
+        index = ohlc.index if kind == 'pandas' else pd.RangeIndex(len(next(iter(staged.values()))))
+        self._request('put', symbol, staged, index)
+
+    def compute(self, symbol, specs):
+        """
+        Compute indicators specs on the server and map results.
+
+        :param str symbol: symbol name.
+        :param list specs: indicators specs like "rsi", ("sma", 50) or ("macd", 12, 26, {"signal_period": 9}).
+        :return dict: spec column names (like "sma_50") as keys and read only float64 arrays as values.
+        """
+        known_version = self._indexes.get(symbol, (None, None))[0]
+        version, results, index = self._request('compute', symbol, specs, known_version)
+        if index is not None:
+            self._indexes[symbol] = version, index
+            self._release(self._segments.pop(symbol, {}))
+        segments = self._segments.setdefault(symbol, {})
+        columns = {}
+        for names, shm_name, shape in results:
+            shm = segments.get(shm_name)
+            if shm is None:
+                shm = segments[shm_name] = _shared_memory(shm_name)
+            block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            block.flags.writeable = False
+            columns.update(zip(names, block))
+        return columns
+
+    def compute_frame(self, symbol, specs):
+        """
+        Same as "compute" but returning a pandas DataFrame indexed like the symbol data (values are copied).
+
+        :param str symbol: symbol name.
+        :param list specs: indicators specs.
+        :return pd.DataFrame: a column per spec output.
+        """
+        columns = self.compute(symbol, specs)
+        return pd.DataFrame(columns, index=self._indexes[symbol][1])
+
+    def stats(self):
+        """
+        Server stats (see "IndicatorServer.stats").
+
+        :return dict: server stats.
+        """
+        return self._request('stats')
+
+    def close(self):
+        """
+        Close the connection and unmap shared memory blocks no longer referenced by returned arrays.
+        """
+        self._conn.close()
+        for segments in self._segments.values():
+            self._release(segments)
+        self._segments.clear()
+
+    @staticmethod
+    def _release(segments):
+        # blocks still referenced by returned arrays stay mapped until those arrays are released
+        for shm in segments.values():
+            try:
+                shm.close()
+            except BufferError:
+                pass
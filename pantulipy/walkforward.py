@@ -0,0 +1,122 @@
+# -*- coding:utf-8 -*-
+"""
+    Walk-forward (expanding or rolling windows) indicators evaluation without recomputation.
+
+    Results are causal (warm-up rows are NaN, nothing is back filled), so an indicator computed over history up to
+    any bar is a prefix of the same indicator computed over the full history. Each indicator spec is computed once
+    over the full data and windows are served as read only views of it:
+
+    >>> wf = WalkForward(ohlc, ['rsi', ('sma', 50), ('sma', 200), 'obv'])
+    >>> for end, columns in wf.expanding(range(1000, len(ohlc), 250)):
+    ...     backtest(columns['sma_50'], columns['sma_200'])
+
+    Rolling windows (a moving start) only recompute indicators whose values depend on the window start: recursive
+    ones (like "ema", carrying state from their first bar) and cumulative ones (like "obv" or "nvi", anchored on
+    their first bar). Windowed indicators (like "sma") are still served as views, their first window rows use bars
+    before the window start when available instead of being NaN.
+"""
+import numpy as np
+
+from . import core
+
+__all__ = ['WalkForward']
+
+
+def _causal(name, params, staged, num_rows):
+    try:
+        outputs = core._run_kernel(name, params, staged)
+    except core.InvalidOptionError:
+        # not enough rows for a single value yet
+        outputs = tuple(np.empty(0) for _ in core._kernel(name).outputs)
+    return core._align(name, outputs if len(outputs) > 1 else outputs[0], num_rows, fill=False)
+
+
+class WalkForward:
+    """
+    Indicators specs computed once over full data and served per walk-forward window.
+    """
+
+    def __init__(self, data, specs):
+        """
+        Constructor.
+
+        :param data: a DataFrame instance with data columns (open, high, low, close, volume) (pandas, polars,
+            pyarrow or a dict of numpy arrays) or a single Series.
+        :param list specs: indicators specs like "rsi", ("sma", 50) or ("macd", 12, 26, {"signal_period": 9}).
+        """
+        self.specs = [core._parse_spec(spec) for spec in specs]
+        names = [c for name, _ in self.specs for c in core._input_names(core._kernel(name))]
+        self._staged = core._stage_columns(data, names)
+        self._kind = core._frame_kind(data)
+        self._index = data.index if self._kind == 'pandas' else None
+        self.num_rows = len(next(iter(self._staged.values())))
+        self._full = {}
+        for name, params in self.specs:
+            columns = _causal(name, params, self._staged, self.num_rows)
+            for column, values in zip(core._spec_columns(name, params), columns.values()):
+                values.flags.writeable = False
+                self._full[column] = values
+
+    @property
+    def columns(self):
+        """
+        Result column names (like "sma_50"), one per spec output.
+
+        :return list: column names.
+        """
+        return list(self._full)
+
+    def window(self, end, start=0):
+        """
+        Indicators over the data[start:end] window.
+
+        :param int end: window end (exclusive, as in slicing).
+        :param int start: window start, 0 for expanding windows.
+        :return dict: column names as keys and read only arrays as values (views over full results except for
+            indicators depending on a non zero start).
+        """
+        start, end, _ = slice(start, end).indices(self.num_rows)
+        result = {column: values[start:end] for column, values in self._full.items()}
+        if start > 0:
+            staged = None
+            for name, params in self.specs:
+                if name in core._WINDOWED_INDICATORS:
+                    continue
+                if staged is None:
+                    staged = {column: values[start:end] for column, values in self._staged.items()}
+                columns = _causal(name, params, staged, end - start)
+                result.update(zip(core._spec_columns(name, params), columns.values()))
+        return result
+
+    def frame(self, end, start=0):
+        """
+        Same as "window" but as a DataFrame (same library as data, pandas frames keep the data index).
+
+        :param int end: window end (exclusive, as in slicing).
+        :param int start: window start, 0 for expanding windows.
+        :return: a DataFrame with a column per spec output.
+        """
+        start, end, _ = slice(start, end).indices(self.num_rows)
+        index = self._index[start:end] if self._index is not None else None
+        return core._from_columns(self.window(end, start), self._kind, index, frame=True)
+
+    def expanding(self, ends):
+        """
+        Expanding windows (history up to each end), every result is a view.
+
+        :param ends: window ends (exclusive).
+        :return generator: (end, columns dict) tuples.
+        """
+        for end in ends:
+            yield end, self.window(end)
+
+    def rolling(self, ends, length):
+        """
+        Fixed length rolling windows.
+
+        :param ends: window ends (exclusive).
+        :param int length: window length.
+        :return generator: (end, columns dict) tuples.
+        """
+        for end in ends:
+            yield end, self.window(end, max(end - int(length), 0))
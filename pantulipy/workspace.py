@@ -0,0 +1,247 @@
+# -*- coding:utf-8 -*-
+"""
+    Fixed window workspace for live indicators recomputation.
+
+    Inputs live in a preallocated ring buffer stored twice side by side, so the last "window" bars are always a
+    contiguous view of it. Output buffers are built in the constructor and window views (kernel input lists) once
+    per ring position, on its first evaluation, so once the ring went round "push" and "evaluate" do not allocate
+    anything that outlives the call (transient allocations are the arrays returned by the "Tulipy" kernels, which are
+    copied into the output buffers and released, and a few small buffer views per "push"):
+
+    >>> ws = Workspace(500, ['rsi', ('bbands', 20, 2)])
+    >>> ws.push(bar)
+    >>> outputs = ws.evaluate()
+    >>> outputs['rsi_14'][-1]
+
+    Workspaces state (ring buffers) is saved as a single flat binary blob for many symbols with "checkpoint" and
+    loaded back with "restore", checked against a format version, a checksum and the window and specs digest:
+
+    >>> blob = checkpoint({'BTC/USDT': ws})
+    >>> workspaces = restore(blob, ['rsi', ('bbands', 20, 2)])
+"""
+import hashlib
+import json
+import struct
+import zlib
+
+import numpy as np
+
+from . import core
+
+__all__ = ['Workspace', 'checkpoint', 'restore']
+
+_MAGIC = b'PTWS'
+_VERSION = 2
+# magic, format version, reserved, payload crc32, window, symbols, names block size and window and specs digest
+# (padded to 8 bytes so payload arrays are aligned), window and digest are zero for empty checkpoints
+_HEADER = struct.Struct('<4sHHIqqq16s4x')
+
+
+class Workspace:
+    """
+    Preallocated ring buffered OHLCV inputs and indicators outputs bound to a fixed window and specs.
+    """
+
+    def __init__(self, window, specs):
+        """
+        Constructor.
+
+        :param int window: number of most recent bars indicators are computed over.
+        :param list specs: indicators specs like "rsi", ("sma", 50) or ("macd", 12, 26, {"signal_period": 9}).
+        """
+        self.window = int(window)
+        self.specs = [core._parse_spec(spec) for spec in specs]
+        self._buffer = np.full((len(core._OHLCV), 2 * self.window), np.nan)
+        self._position = 0
+        self._count = 0
+        #: output buffers, spec column names (like "sma_50") as keys, updated in place by "evaluate".
+        self.outputs = {}
+        self._kernels = []
+        rows = [self._buffer[n] for n in range(len(core._OHLCV))]
+        shared = {}
+        for name, params in self.specs:
+            fn = core._kernel(name)
+            input_names = tuple(core._input_names(fn))
+            outputs = [self.outputs.setdefault(column, np.full(self.window, np.nan))
+                       for column in core._spec_columns(name, params)]
+            # one kernel inputs list per ring position (views over the ring buffer built on first use), shared by
+            # specs with the same inputs
+            if input_names not in shared:
+                input_rows = [rows[core._OHLCV.index(column)] for column in input_names]
+                shared[input_names] = input_rows, [None] * self.window
+            input_rows, views = shared[input_names]
+            self._kernels.append((fn, params, input_rows, views, outputs, core._warmup(name, params)))
+
+    def __len__(self):
+        return min(self._count, self.window)
+
+    @property
+    def ready(self):
+        """
+        Whether the window is full.
+
+        :return bool: True once "window" bars were pushed.
+        """
+        return self._count >= self.window
+
+    def push(self, bar):
+        """
+        Append a bar, the oldest one is dropped once the window is full.
+
+        Values are written straight into the ring buffer copy outside the current window, then copied to the other
+        one, so no intermediate container is built per bar.
+
+        :param bar: a mapping (like a dict or a pandas Series) with open, high, low, close and volume keys, a named
+            tuple with those fields or a plain sequence with those five values in order.
+        :raise ValueError: for incomplete bars (the window is left unchanged).
+        """
+        position = (self._position + 1) % self.window
+        # the current window is [position, position + window) of the doubled buffer ([window, 2 * window) when the
+        # ring wraps to 0), a failing value is undone before the window is touched
+        outside, inside = (position + self.window, position) if position else (0, self.window)
+        buffer = self._buffer
+        try:
+            if hasattr(bar, 'keys'):
+                for n, column in enumerate(core._OHLCV):
+                    if column not in bar:
+                        raise ValueError(f'Bar misses {", ".join(c for c in core._OHLCV if c not in bar)} values')
+                    buffer[n, outside] = bar[column]
+            elif hasattr(bar, '_fields'):
+                for n, column in enumerate(core._OHLCV):
+                    if column not in bar._fields:
+                        missing = [c for c in core._OHLCV if c not in bar._fields]
+                        raise ValueError(f'Bar misses {", ".join(missing)} values')
+                    buffer[n, outside] = getattr(bar, column)
+            else:
+                if len(bar) != len(core._OHLCV):
+                    raise ValueError(f'Bar sequences need {len(core._OHLCV)} values ({", ".join(core._OHLCV)}), '
+                                     f'got {len(bar)}')
+                for n, value in enumerate(bar):
+                    buffer[n, outside] = value
+        except BaseException:
+            buffer[:, outside] = buffer[:, inside]
+            raise
+        buffer[:, inside] = buffer[:, outside]
+        self._position = position
+        self._count += 1
+
+    def evaluate(self):
+        """
+        Recompute every spec over the current window.
+
+        Rows without a value (window still filling or indicator warm-up) are back filled as pantulipy functions do.
+
+        :return dict: the "outputs" buffers (same array objects on every call).
+        """
+        if not self.ready:
+            raise ValueError(f'Workspace needs {self.window} bars, got {self._count}')
+        position = self._position
+        for fn, params, input_rows, views, outputs, warmup in self._kernels:
+            inputs = views[position]
+            if inputs is None:
+                inputs = views[position] = [row[position + 1:position + 1 + self.window] for row in input_rows]
+            data = fn(*inputs, *params)
+            if type(data) == tuple:
+                for out, values in zip(outputs, data):
+                    out[warmup:] = values
+                    out[:warmup] = values[0]
+            else:
+                out = outputs[0]
+                out[warmup:] = data
+                out[:warmup] = data[0]
+        return self.outputs
+
+
+def _digest(window, specs):
+    return hashlib.blake2b(repr((int(window), [tuple(spec) for spec in specs])).encode(), digest_size=16).digest()
+
+
+def _encode_symbol(symbol):
+    # JSON keeps str, int, float, bool and None apart, tuples (like ("BTC", "USDT")) are tagged
+    if isinstance(symbol, tuple):
+        return {'tuple': [_encode_symbol(item) for item in symbol]}
+    if symbol is None or isinstance(symbol, (str, int, float)):
+        return symbol
+    raise ValueError(f'Unsupported symbol type {type(symbol).__name__} (str, int, float, bool, None or tuples)')
+
+
+def _decode_symbol(symbol):
+    if isinstance(symbol, dict):
+        return tuple(_decode_symbol(item) for item in symbol['tuple'])
+    return symbol
+
+
+def checkpoint(workspaces):
+    """
+    Save many workspaces state as a single flat binary blob.
+
+    :param dict workspaces: symbols (str, int, float, bool, None or tuples of them) as keys and workspaces (same
+        window and specs) as values.
+    :return bytes: header, symbol names, ring positions and counters and ring buffers values.
+    """
+    items = list(workspaces.items())
+    first = items[0][1] if items else None
+    if any(ws.window != first.window or ws.specs != first.specs for _, ws in items):
+        raise ValueError('Checkpointed workspaces must share window and specs')
+    window = first.window if items else 0
+    names = json.dumps([_encode_symbol(symbol) for symbol, _ in items]).encode()
+    names += b' ' * (-len(names) % 8)
+    counters = np.array([(ws._count, ws._position) for _, ws in items], dtype=np.int64).reshape(len(items), 2)
+    values = np.empty((len(items), len(core._OHLCV), window))
+    for n, (_, ws) in enumerate(items):
+        values[n] = ws._buffer[:, :window]
+    payload = [names, counters.tobytes(), values.tobytes()]
+    crc = zlib.crc32(payload[2], zlib.crc32(payload[1], zlib.crc32(payload[0])))
+    digest = _digest(window, first.specs) if items else bytes(16)
+    header = _HEADER.pack(_MAGIC, _VERSION, 0, crc, window, len(items), len(names), digest)
+    return b''.join([header] + payload)
+
+
+def restore(blob, specs, workspaces=None):
+    """
+    Load workspaces state saved by "checkpoint".
+
+    :param bytes blob: a "checkpoint" blob.
+    :param list specs: indicators specs the workspaces were built with.
+    :param dict workspaces: existing workspaces restored in place (the fastest path), missing symbols are created.
+    :return dict: symbols as keys and workspaces as values (ready to "push" and "evaluate").
+    """
+    blob = memoryview(blob)
+    if len(blob) < _HEADER.size:
+        raise ValueError('Invalid workspaces checkpoint (truncated header)')
+    magic, version, _, crc, window, symbols, names_size, digest = _HEADER.unpack_from(blob)
+    if magic != _MAGIC:
+        raise ValueError('Invalid workspaces checkpoint (bad magic)')
+    if version != _VERSION:
+        raise ValueError(f'Unsupported workspaces checkpoint version {version} (expected {_VERSION})')
+    specs = [core._parse_spec(spec) for spec in specs]
+    if symbols and digest != _digest(window, specs):
+        raise ValueError('Workspaces checkpoint window or specs do not match the given specs')
+    offset = _HEADER.size
+    sizes = [names_size, symbols * 2 * 8, symbols * len(core._OHLCV) * window * 8]
+    if len(blob) != offset + sum(sizes):
+        raise ValueError('Invalid workspaces checkpoint (bad size)')
+    parts = []
+    for size in sizes:
+        parts.append(blob[offset:offset + size])
+        offset += size
+    if zlib.crc32(parts[2], zlib.crc32(parts[1], zlib.crc32(parts[0]))) != crc:
+        raise ValueError('Invalid workspaces checkpoint (checksum mismatch)')
+    names = [_decode_symbol(symbol) for symbol in json.loads(bytes(parts[0]))]
+    if len(names) != symbols:
+        raise ValueError('Invalid workspaces checkpoint (bad symbol names)')
+    counters = np.frombuffer(parts[1], dtype=np.int64).reshape(symbols, 2)
+    values = np.frombuffer(parts[2], dtype=np.float64).reshape(symbols, len(core._OHLCV), window)
+    result = {}
+    workspaces = workspaces or {}
+    for symbol, (count, position), state in zip(names, counters, values):
+        ws = workspaces.get(symbol)
+        if ws is None:
+            ws = Workspace(window, specs)
+        elif ws.window != window or ws.specs != specs:
+            raise ValueError(f'Workspace "{symbol}" window or specs do not match the checkpoint')
+        ws._buffer[:, :window] = state
+        ws._buffer[:, window:] = state
+        ws._count, ws._position = int(count), int(position)
+        result[symbol] = ws
+    return result
@@ -0,0 +1,29 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def random_ohlc(rows=200, seed=0, index=None):
+    """
+    Random walk OHLCV DataFrame.
+
+    :param int rows: number of bars.
+    :param int seed: random generator seed.
+    :param index: DataFrame index (a RangeIndex by default).
+    :return pd.DataFrame: open, high, low, close and volume columns.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100. + rng.standard_normal(rows).cumsum()
+    return pd.DataFrame({'open': np.roll(close, 1), 'high': close + 1., 'low': close - 1., 'close': close,
+                         'volume': rng.uniform(1., 5., rows)}, index=index)
+
+
+@pytest.fixture
+def make_ohlc():
+    return random_ohlc
+
+
+@pytest.fixture
+def ohlc():
+    return random_ohlc()
@@ -0,0 +1,54 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import pantulipy
+
+
+def test_results_match_functions(ohlc):
+    pd.testing.assert_series_equal(ohlc.tulip.rsi(14), pantulipy.rsi(ohlc, 14))
+    pd.testing.assert_frame_equal(ohlc.tulip.macd(12, 26, 9), pantulipy.macd(ohlc, 12, 26, 9))
+    result = ohlc.tulip.compute(['rsi', ('bbands', 20, 2)])
+    assert list(result.columns) == ['rsi_14', 'bbands_20_2_lower', 'bbands_20_2_middle', 'bbands_20_2_upper']
+    np.testing.assert_allclose(result['bbands_20_2_upper'], pantulipy.bbands(ohlc, 20, 2)['bbands_upper'])
+
+
+def test_compact_results(ohlc):
+    pd.testing.assert_frame_equal(ohlc.tulip.aroon(14, compact=True), pantulipy.aroon(ohlc, 14, compact=True))
+    assert ohlc.tulip.aroonosc(14).dtype == np.float64
+    result = ohlc.tulip.compute(['rsi', ('aroonosc', 14)], compact=True)
+    assert result['aroonosc_14'].dtype == 'Float32' and result['aroonosc_14'].isna().sum() == 14
+    assert result['rsi_14'].dtype == np.float64
+
+
+def test_cache_dropped_on_edits(ohlc):
+    before = ohlc.tulip.sma(5)
+    ohlc.loc[100, 'close'] = 1000.
+    after = ohlc.tulip.sma(5)
+    pd.testing.assert_series_equal(after, pantulipy.sma(ohlc, 5))
+    assert not np.allclose(before, after)
+    ohlc['close'] = ohlc['close'] * 2.
+    pd.testing.assert_series_equal(ohlc.tulip.sma(5), pantulipy.sma(ohlc, 5))
+
+
+def test_unknown_attribute(ohlc):
+    with pytest.raises(AttributeError):
+        ohlc.tulip.nope()
+
+
+def test_duration_periods(make_ohlc):
+    ohlc = make_ohlc(300, 3, pd.date_range('2024-01-01', periods=300, freq='min'))
+    pd.testing.assert_series_equal(ohlc.tulip.sma('30min'), pantulipy.sma(ohlc, '30min'))
+    pd.testing.assert_series_equal(ohlc.tulip.mfi(pd.Timedelta('1h')), pantulipy.mfi(ohlc, pd.Timedelta('1h')))
+    result = ohlc.tulip.compute(['rsi', ('sma', '30min')])
+    assert list(result.columns) == ['rsi_14', 'sma_30min']
+    np.testing.assert_allclose(result['sma_30min'], pantulipy.sma(ohlc, '30min'))
+
+
+def test_duration_periods_errors(ohlc):
+    with pytest.raises(ValueError, match='DatetimeIndex'):
+        ohlc.tulip.sma('30min')
+    ohlc.index = pd.date_range('2024-01-01', periods=len(ohlc), freq='min')
+    with pytest.raises(ValueError, match='duration period'):
+        ohlc.tulip.rsi('30min')
@@ -0,0 +1,84 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pytest
+
+import pantulipy
+from pantulipy import bars
+
+# trades at 0s, 10s, 59s, 60s, 61s and 185s (traded values 10, 24, 27, 11, 13 and 32)
+TIMESTAMPS = np.array([0, 10, 59, 60, 61, 185], dtype='datetime64[s]')
+PRICES = [10., 12., 9., 11., 13., 8.]
+SIZES = [1., 2., 3., 1., 1., 4.]
+
+
+def _check(result, timestamps, ohlcv):
+    np.testing.assert_array_equal(result['timestamp'], np.array(timestamps, dtype='datetime64[s]'))
+    for n, name in enumerate(['open', 'high', 'low', 'close', 'volume']):
+        np.testing.assert_array_equal(result[name], [bar[n] for bar in ohlcv])
+
+
+def test_time_bars():
+    # no trade from 120s to 180s, so no bar
+    _check(bars.time_bars(TIMESTAMPS, PRICES, SIZES, '1min'), [0, 60, 180],
+           [(10., 12., 9., 9., 6.), (11., 13., 11., 13., 2.), (8., 8., 8., 8., 4.)])
+
+
+def test_tick_bars():
+    _check(bars.tick_bars(TIMESTAMPS, PRICES, SIZES, 4), [0, 61],
+           [(10., 12., 9., 11., 7.), (13., 13., 8., 8., 5.)])
+
+
+def test_volume_bars():
+    # cumulative volume before each trade: 0, 1, 3, 6, 7, 8
+    _check(bars.volume_bars(TIMESTAMPS, PRICES, SIZES, 3), [0, 59, 60],
+           [(10., 12., 10., 12., 3.), (9., 9., 9., 9., 3.), (11., 13., 8., 8., 6.)])
+
+
+def test_dollar_bars():
+    # cumulative value before each trade: 0, 10, 34, 61, 72, 85
+    _check(bars.dollar_bars(TIMESTAMPS, PRICES, SIZES, 25), [0, 59, 60, 185],
+           [(10., 12., 10., 12., 3.), (9., 9., 9., 9., 3.), (11., 13., 11., 13., 2.), (8., 8., 8., 8., 4.)])
+
+
+def test_bars_feed_indicators():
+    rng = np.random.default_rng(14)
+    timestamps = np.cumsum(rng.integers(1, 5, 5000)).astype('datetime64[s]')
+    result = bars.time_bars(timestamps, 100. + rng.standard_normal(5000).cumsum(), rng.random(5000), '1min')
+    np.testing.assert_allclose(pantulipy.sma(result, 5), pantulipy.sma(bars.to_frame(result), 5).to_numpy())
+
+
+@pytest.mark.parametrize('kind, size', [('time', '1min'), ('tick', 7), ('volume', 3.5), ('dollar', 400.)])
+def test_builder_chunks_match_one_shot(kind, size):
+    rng = np.random.default_rng(15)
+    timestamps = np.cumsum(rng.integers(0, 20, 3000)).astype('datetime64[s]')
+    prices = 100. + rng.standard_normal(3000).cumsum()
+    sizes = rng.random(3000)
+    expected = getattr(bars, f'{kind}_bars')(timestamps, prices, sizes, size)
+    builder = bars.BarBuilder(kind, size)
+    edges = np.r_[0, np.sort(rng.choice(np.arange(1, 3000), 40, replace=False)), 3000]
+    parts = [builder.update(timestamps[a:b], prices[a:b], sizes[a:b]) for a, b in zip(edges[:-1], edges[1:])]
+    parts.append(builder.flush())
+    np.testing.assert_array_equal(np.concatenate([p['timestamp'] for p in parts]), expected['timestamp'])
+    for name in ['open', 'high', 'low', 'close', 'volume']:
+        np.testing.assert_allclose(np.concatenate([p[name] for p in parts]), expected[name])
+
+
+def test_unsorted_trades_are_rejected():
+    unsorted = TIMESTAMPS[[0, 2, 1, 3, 4, 5]]
+    for fn, size in [(bars.time_bars, '1min'), (bars.tick_bars, 2), (bars.volume_bars, 3), (bars.dollar_bars, 25)]:
+        with pytest.raises(ValueError, match='sorted'):
+            fn(unsorted, PRICES, SIZES, size)
+    builder = bars.BarBuilder('time', '1min')
+    builder.update(TIMESTAMPS[3:], PRICES[3:], SIZES[3:])
+    with pytest.raises(ValueError, match='sorted'):
+        builder.update(TIMESTAMPS[:3], PRICES[:3], SIZES[:3])
+    assert builder.partial['close'] == 8.
+
+
+def test_invalid_sizes():
+    with pytest.raises(ValueError):
+        bars.BarBuilder('range', 10)
+    with pytest.raises(ValueError):
+        bars.tick_bars(TIMESTAMPS, PRICES, SIZES, 0)
+    with pytest.raises(ValueError):
+        bars.time_bars(TIMESTAMPS, PRICES[:3], SIZES, '1min')
@@ -0,0 +1,59 @@
+# -*- coding:utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import pantulipy
+from pantulipy import batch
+
+
+SPECS = ['rsi', ('sma', 20), ('macd', 12, 26, 9), 'tr', 'obv']
+
+
+def test_compute_matches_functions(make_ohlc):
+    ohlc = make_ohlc(150, 7)
+    result = batch.compute(ohlc, SPECS)
+    np.testing.assert_allclose(result['rsi_14'], pantulipy.rsi(ohlc))
+    np.testing.assert_allclose(result['macd_12_26_9_signal'], pantulipy.macd(ohlc, 12, 26, 9)['macd_signal'])
+
+
+def test_tail_matches_full_results(make_ohlc):
+    ohlc = make_ohlc(150, 8)
+    full = batch.compute(ohlc, SPECS)
+    tail = batch.compute(ohlc, SPECS, tail=5)
+    pd.testing.assert_frame_equal(tail, full.iloc[-5:])
+
+
+def test_iter_panel_streams_every_group_in_order(make_ohlc):
+    panel = {f's{n}': make_ohlc(150, n) for n in range(6)}
+    expected = batch.compute_panel(panel, SPECS, tail=3)
+    pulled = []
+
+    def load():
+        for symbol, data in panel.items():
+            pulled.append(symbol)
+            yield symbol, data
+
+    with ThreadPoolExecutor(2) as pool:
+        results = list(batch.iter_panel(load(), SPECS, tail=3, group_size=2, executor=pool, max_pending=2))
+    assert [s for s, _ in results] == [s for s in panel for _ in range(3)]
+    for symbol in panel:
+        parts = pd.concat([r for s, r in results if s == symbol], axis=1)
+        pd.testing.assert_frame_equal(parts, expected[symbol])
+    assert pulled == list(panel)
+
+
+def test_iter_panel_pulls_lazily(make_ohlc):
+    pulled = []
+
+    def load():
+        for n in range(10):
+            pulled.append(n)
+            yield n, make_ohlc(150, n)
+
+    with ThreadPoolExecutor(1) as pool:
+        stream = batch.iter_panel(load(), ['rsi'], executor=pool, max_pending=2)
+        next(stream)
+        assert len(pulled) <= 3
+        stream.close()
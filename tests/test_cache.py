@@ -0,0 +1,127 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import pantulipy
+from pantulipy.cache import IndicatorCache, _kernel_identity
+
+
+@pytest.fixture
+def ohlc(make_ohlc):
+    return make_ohlc(300)
+
+
+def test_results_match_functions_and_are_reused(tmp_path, ohlc):
+    cache = IndicatorCache(tmp_path)
+    first = cache.compute('macd', ohlc, 12, 26, 9)
+    pd.testing.assert_frame_equal(first, pantulipy.macd(ohlc, 12, 26, 9))
+    size = cache.size()
+    second = IndicatorCache(tmp_path).compute('macd', ohlc, short_period=12)
+    pd.testing.assert_frame_equal(second, first)
+    assert cache.size() == size and not second.to_numpy().flags.writeable
+
+
+def test_windowed_results_are_extended(tmp_path, ohlc):
+    cache = IndicatorCache(tmp_path)
+    cache.compute('sma', ohlc.iloc[:150], 20)
+    extended = cache.compute('sma', ohlc, 20)
+    pd.testing.assert_series_equal(extended, pantulipy.sma(ohlc, 20))
+    assert len(cache._entries()) == 1
+
+
+def test_eviction_keeps_size_under_limit(tmp_path, ohlc):
+    cache = IndicatorCache(tmp_path, max_bytes=3000)
+    for period in range(5, 15):
+        cache.compute('sma', ohlc, period)
+    assert cache.size() <= 3000 and len(cache._entries()) >= 1
+    cache.clear()
+    assert cache.size() == 0
+
+
+def test_reregistered_plugin_is_not_served_stale_results(tmp_path, ohlc):
+    cache = IndicatorCache(tmp_path)
+    try:
+        pantulipy.register('scaled', lambda close: close * 2., ['close'], kind='windowed')
+        first = cache.compute('scaled', ohlc)
+        pantulipy.register('scaled', lambda close: close * 3., ['close'], kind='windowed')
+        second = cache.compute('scaled', ohlc)
+    finally:
+        pantulipy.unregister('scaled')
+    np.testing.assert_allclose(first, ohlc['close'] * 2.)
+    np.testing.assert_allclose(second, ohlc['close'] * 3.)
+
+
+def _scaler(factor):
+    def scaled(close):
+        return close * factor
+    return scaled
+
+
+OFFSET = 1.
+
+
+def _offset(close):
+    return close + OFFSET
+
+
+class _Scale:
+    factor = 2.
+
+
+@pytest.mark.parametrize('kernels', [
+    [_scaler(2.), _scaler(3.)],
+    [lambda close, factor=2.: close * factor, lambda close, factor=3.: close * factor],
+    [lambda close, *, factor=2.: close * factor, lambda close, *, factor=3.: close * factor],
+])
+def test_plugin_closures_and_defaults_are_part_of_the_identity(tmp_path, ohlc, kernels):
+    cache = IndicatorCache(tmp_path)
+    results = []
+    try:
+        for kernel in kernels:
+            pantulipy.register('scaled', kernel, ['close'], kind='windowed')
+            results.append(cache.compute('scaled', ohlc))
+    finally:
+        pantulipy.unregister('scaled')
+    np.testing.assert_allclose(results[0], ohlc['close'] * 2.)
+    np.testing.assert_allclose(results[1], ohlc['close'] * 3.)
+
+
+def test_plugin_globals_are_part_of_the_identity(tmp_path, ohlc):
+    global OFFSET
+    cache = IndicatorCache(tmp_path)
+    try:
+        pantulipy.register('offset', _offset, ['close'], kind='windowed')
+        identities = [_kernel_identity('offset')]
+        np.testing.assert_allclose(cache.compute('offset', ohlc), ohlc['close'] + 1.)
+        OFFSET = 2.
+        identities.append(_kernel_identity('offset'))
+        np.testing.assert_allclose(cache.compute('offset', ohlc), ohlc['close'] + 2.)
+    finally:
+        OFFSET = 1.
+        pantulipy.unregister('offset')
+    assert identities[0] != identities[1]
+
+
+def test_same_plugin_code_has_the_same_identity():
+    try:
+        pantulipy.register('scaled', _scaler(2.), ['close'], kind='windowed')
+        first = _kernel_identity('scaled')
+        pantulipy.register('scaled', _scaler(2.), ['close'], kind='windowed')
+        assert _kernel_identity('scaled') == first
+    finally:
+        pantulipy.unregister('scaled')
+
+
+def test_plugins_without_stable_identity_are_not_cached(tmp_path, ohlc):
+    cache = IndicatorCache(tmp_path)
+    scale = _Scale()
+    try:
+        pantulipy.register('scaled', lambda close: close * scale.factor, ['close'], kind='windowed')
+        assert _kernel_identity('scaled') is None
+        np.testing.assert_allclose(cache.compute('scaled', ohlc), ohlc['close'] * 2.)
+        scale.factor = 3.
+        np.testing.assert_allclose(cache.compute('scaled', ohlc), ohlc['close'] * 3.)
+    finally:
+        pantulipy.unregister('scaled')
+    assert cache.size() == 0
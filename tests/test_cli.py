@@ -0,0 +1,72 @@
+# -*- coding:utf-8 -*-
+import pandas as pd
+import pytest
+
+from pantulipy import batch, cli
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def files(tmp_path, make_ohlc):
+    paths = []
+    for n, symbol in enumerate(['btc', 'eth']):
+        data = make_ohlc(100, n)
+        path = tmp_path / 'data' / f'{symbol}.parquet'
+        path.parent.mkdir(exist_ok=True)
+        data.to_parquet(path)
+        paths.append(path)
+    return paths
+
+
+def test_run_writes_partitions_and_resumes(tmp_path, files):
+    output = tmp_path / 'features'
+    specs = ['rsi', ('sma', 20)]
+    summary = cli.run([str(tmp_path / 'data' / '*.parquet')], specs, str(output), workers=1, log=lambda _: None)
+    assert summary['done'] == 2 and summary['failed'] == 0
+    result = pd.read_parquet(output / 'symbol=btc' / 'part-0.parquet')
+    pd.testing.assert_frame_equal(result, batch.compute(pd.read_parquet(files[0]), specs))
+    again = cli.run([str(tmp_path / 'data' / '*.parquet')], specs, str(output), workers=1, log=lambda _: None)
+    assert again['skipped'] == 2 and again['done'] == 0
+
+
+def test_changed_specs_or_options_recompute(tmp_path, files):
+    output = tmp_path / 'features'
+    pattern = [str(tmp_path / 'data' / '*.parquet')]
+    cli.run(pattern, ['rsi'], str(output), workers=1, log=lambda _: None)
+    assert cli.run(pattern, [('rsi', 7)], str(output), workers=1, log=lambda _: None)['done'] == 2
+    assert cli.run(pattern, [('rsi', 7)], str(output), workers=1, tail=10, log=lambda _: None)['done'] == 2
+    assert len(pd.read_parquet(output / 'symbol=eth' / 'part-0.parquet')) == 10
+
+
+def test_load_specs(tmp_path):
+    path = tmp_path / 'specs.json'
+    path.write_text('{"indicators": ["rsi", ["sma", 20], {"name": "macd", "short_period": 5}]}')
+    assert cli.load_specs(path) == [('rsi', (14,)), ('sma', (20,)), ('macd', (5, 26, 9))]
+
+
+def test_digest_depends_on_specs_and_options():
+    digests = {cli._digest(['rsi']), cli._digest([('rsi', 7)]), cli._digest(['rsi'], tail=5),
+               cli._digest(['rsi'], include_input=True)}
+    assert len(digests) == 4
+    assert cli._digest(['rsi']) == cli._digest(['rsi'])
+
+
+def test_equivalent_specs_have_the_same_digest():
+    digests = {cli._digest(['rsi', ('macd', 12, 26, 9)]), cli._digest([('rsi', 14), ['macd', 12, 26, 9]]),
+               cli._digest([('rsi', {'period': 14}), ('macd', 12, 26, {'signal_period': 9})])}
+    assert len(digests) == 1
+
+
+def test_same_stem_inputs_are_rejected(tmp_path, files):
+    other = tmp_path / 'other' / 'btc.parquet'
+    other.parent.mkdir()
+    other.write_bytes(files[0].read_bytes())
+    with pytest.raises(ValueError, match='btc'):
+        cli.run([str(tmp_path / '*' / '*.parquet')], ['rsi'], str(tmp_path / 'features'), workers=1,
+                log=lambda _: None)
+    specs = tmp_path / 'specs.json'
+    specs.write_text('["rsi", ["sma", 20]]')
+    with pytest.raises(SystemExit):
+        cli.main([str(tmp_path / '*' / '*.parquet'), '--specs', str(specs), '--output', str(tmp_path / 'features')])
+    assert not (tmp_path / 'features').exists()
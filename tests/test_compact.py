@@ -0,0 +1,87 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import pantulipy
+from pantulipy import batch, core
+
+SPECS = ['crossover', ('aroon', 14), 'rsi']
+
+
+def test_wrappers_compact_dtypes(ohlc):
+    crossover = pantulipy.crossover(ohlc, compact=True)
+    assert crossover.dtype == 'boolean'
+    assert crossover.isna().tolist() == [True] + [False] * (len(ohlc) - 1)
+    aroon = pantulipy.aroon(ohlc, 14, compact=True)
+    expected = pantulipy.aroon(ohlc, 14)
+    assert list(aroon.columns) == list(expected.columns)
+    assert all(dtype == 'Float32' for dtype in aroon.dtypes)
+    assert aroon.isna().sum().tolist() == [14, 14]
+    np.testing.assert_allclose(aroon.iloc[14:].to_numpy(dtype=np.float64), expected.iloc[14:].to_numpy(), rtol=1e-6)
+
+
+def test_compact_leaves_other_indicators_unchanged(ohlc):
+    result = batch.compute(ohlc, SPECS, compact=True)
+    pd.testing.assert_series_equal(result['rsi_14'], batch.compute(ohlc, ['rsi'])['rsi_14'])
+
+
+def test_batch_compute_compact(ohlc):
+    result = batch.compute(ohlc, SPECS, compact=True)
+    assert result.dtypes.astype(str).to_dict() == {'crossover': 'boolean', 'aroon_14_down': 'Float32',
+                                                   'aroon_14_up': 'Float32', 'rsi_14': 'float64'}
+    assert result['crossover'].isna().sum() == 1
+    assert result['aroon_14_up'].isna().sum() == 14
+    tail = batch.compute(ohlc, SPECS, tail=20, compact=True)
+    pd.testing.assert_frame_equal(tail, result.iloc[-20:])
+
+
+def test_compute_arrays_masks_warmup_rows(ohlc):
+    staged = core._stage_columns(ohlc, ['high', 'low', 'close'])
+    result = batch.compute_arrays(staged, SPECS, compact=True)
+    crossover, aroon = result['crossover'], result['aroon_14_up']
+    assert np.ma.isMaskedArray(crossover) and crossover.dtype == np.bool_
+    assert np.ma.isMaskedArray(aroon) and aroon.dtype == np.float32
+    np.testing.assert_array_equal(np.ma.getmaskarray(crossover), np.arange(len(ohlc)) < 1)
+    np.testing.assert_array_equal(np.ma.getmaskarray(aroon), np.arange(len(ohlc)) < 14)
+    assert not np.ma.isMaskedArray(result['rsi_14'])
+
+
+def test_compute_panel_compact(make_ohlc):
+    panel = {symbol: make_ohlc(150, seed) for seed, symbol in enumerate(['BTC', 'ETH'])}
+    result = batch.compute_panel(panel, SPECS, compact=True)
+    for symbol, data in panel.items():
+        pd.testing.assert_frame_equal(result[symbol], batch.compute(data, SPECS, compact=True))
+        assert result[symbol]['crossover'].dtype == 'boolean'
+
+
+def test_numpy_compact_results(ohlc):
+    data = {column: ohlc[column].to_numpy() for column in ohlc.columns}
+    result = batch.compute(data, SPECS, compact=True)
+    assert np.ma.isMaskedArray(result['crossover']) and result['crossover'].mask[0]
+    assert result['aroon_14_down'].dtype == np.float32
+    assert np.ma.count_masked(result['aroon_14_down']) == 14
+
+
+def test_arrow_compact_results(ohlc):
+    pa = pytest.importorskip('pyarrow')
+    data = pa.Table.from_pandas(ohlc, preserve_index=False)
+    result = batch.compute(data, SPECS, compact=True)
+    assert result.schema.field('crossover').type == pa.bool_()
+    assert result.schema.field('aroon_14_up').type == pa.float32()
+    assert result.column('crossover').null_count == 1
+    assert result.column('aroon_14_up').null_count == 14
+    aroon = pantulipy.aroon(data, 14, compact=True)
+    assert aroon.column('aroon_up').null_count == 14
+
+
+def test_polars_compact_results(ohlc):
+    pl = pytest.importorskip('polars')
+    data = pl.from_pandas(ohlc)
+    result = batch.compute(data, SPECS, compact=True)
+    assert result.schema['crossover'] == pl.Boolean
+    assert result.schema['aroon_14_up'] == pl.Float32
+    assert result['crossover'].null_count() == 1
+    assert result['aroon_14_up'].null_count() == 14
+    crossover = pantulipy.crossover(data, compact=True)
+    assert crossover.dtype == pl.Boolean and crossover.null_count() == 1
@@ -0,0 +1,61 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from pantulipy import dispatch
+
+SPECS = ['rsi', ('sma', 200)]
+
+
+@pytest.fixture
+def table():
+    return {'cpu_count': 8, 'default_seconds_per_row': 5e-9, 'indicator_seconds_per_row': {'rsi': 1e-8, 'sma': 4e-9},
+            'strategies': {'serial': {'overhead': 0., 'task_overhead': 5e-5, 'speedup': 1.},
+                           'threads': {'overhead': 1e-3, 'task_overhead': 1e-4, 'speedup': 1.},
+                           'processes': {'overhead': .2, 'task_overhead': 1e-3, 'speedup': 6.,
+                                         'seconds_per_byte': 1e-10}}}
+
+
+def _sized_panel(symbols, rows):
+    # zero strides views: planning only reads lengths
+    return {f'S{n}': {'close': np.broadcast_to(np.float64(1.), (rows,))} for n in range(symbols)}
+
+
+def test_small_jobs_run_serially(table):
+    decision = dispatch.plan(_sized_panel(2, 1000), SPECS, table=table)
+    assert decision.strategy == 'serial' and decision.workers == 1
+
+
+def test_large_jobs_use_processes(table):
+    decision = dispatch.plan(_sized_panel(500, 2000000), SPECS, table=table)
+    assert decision.strategy == 'processes' and decision.workers == 8
+
+
+def test_threads_when_kernels_release_the_gil(table):
+    table['strategies']['threads']['speedup'] = 6.
+    decision = dispatch.plan(_sized_panel(50, 100000), SPECS, table=table)
+    assert decision.strategy == 'threads'
+
+
+def test_workers_limited_by_symbols(table):
+    decision = dispatch.plan(_sized_panel(3, 50000000), SPECS, table=table)
+    assert decision.strategy == 'processes' and decision.workers == 3
+
+
+def test_strategies_give_the_same_results(make_ohlc):
+    panel = {f'S{n}': make_ohlc(300, n) for n in range(5)}
+    expected = dispatch.compute_panel(panel, SPECS, decision='serial')
+    for strategy in ('threads', 'processes'):
+        results = dispatch.compute_panel(panel, SPECS, decision=strategy, workers=2)
+        assert list(results) == list(panel)
+        for symbol in panel:
+            pd.testing.assert_frame_equal(results[symbol], expected[symbol])
+
+
+def test_calibration_table(tmp_path):
+    table = dispatch.calibrate(rows=2000, workers=2, work=.05)
+    for strategy in dispatch.STRATEGIES:
+        values = table['strategies'][strategy]
+        assert 0. < values['speedup'] <= 2. and values['task_overhead'] >= 0.
+    assert dispatch.load_calibration(dispatch.save_calibration(table, tmp_path / 'c.json')) == table
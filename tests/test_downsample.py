@@ -0,0 +1,96 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from pantulipy.downsample import Downsampler, envelope, ohlc
+
+
+@pytest.fixture
+def data(make_ohlc):
+    frame = make_ohlc(20000, 13, pd.date_range('2024-01-01', periods=20000, freq='min'))
+    frame['line'] = frame['close'].to_numpy() * 2.
+    frame.iloc[500:900, frame.columns.get_loc('line')] = np.nan
+    return frame
+
+
+def _brute_force(data, result, end=None):
+    # buckets start at each result index row and end at the next one
+    rows = data.index.get_indexer(result.index)
+    bounds = list(zip(rows, list(rows[1:]) + [end or len(data)]))
+    return [data.iloc[first:last] for first, last in bounds]
+
+
+@pytest.mark.parametrize('buckets, start, end', [(37, None, None), (500, 1234, 19000), (7, 100, 180), (1, 0, 20000)])
+def test_ohlc_matches_brute_force(data, buckets, start, end):
+    result = Downsampler(data).ohlc(buckets, start, end)
+    assert len(result) == min(buckets, (end or len(data)) - (start or 0))
+    assert result.index[0] == data.index[start or 0]
+    for (_, bar), rows in zip(result.iterrows(), _brute_force(data, result, end)):
+        assert bar['open'] == rows['open'].iloc[0] and bar['close'] == rows['close'].iloc[-1]
+        assert bar['high'] == rows['high'].max() and bar['low'] == rows['low'].min()
+        assert bar['volume'] == pytest.approx(rows['volume'].sum())
+
+
+def test_envelope_matches_brute_force(data):
+    ds = Downsampler(data)
+    result = ds.envelope(['line', 'close'], 300, start='2024-01-01 02:00')
+    assert result.index[0] == pd.Timestamp('2024-01-01 02:00')
+    for (_, bucket), rows in zip(result.iterrows(), _brute_force(data, result)):
+        np.testing.assert_equal(bucket['line_min'], np.nanmin(rows['line']) if rows['line'].notna().any() else np.nan)
+        np.testing.assert_equal(bucket['line_max'], np.nanmax(rows['line']) if rows['line'].notna().any() else np.nan)
+        assert bucket['close_min'] == rows['close'].min() and bucket['close_max'] == rows['close'].max()
+
+
+def test_functions(data):
+    pd.testing.assert_frame_equal(ohlc(data, 50), Downsampler(data).ohlc(50))
+    assert list(envelope(data[['close', 'line']], 10).columns) == ['close_min', 'close_max', 'line_min', 'line_max']
+
+
+def test_appends_match_one_shot_build(data):
+    one_shot = Downsampler(data)
+    ds = Downsampler(data.iloc[:1000])
+    for first, last in [(1000, 1001), (1001, 4097), (4097, 13000), (13000, 20000)]:
+        ds.append(data.iloc[first:last])
+    assert len(ds) == len(one_shot)
+    for column in data.columns:
+        for built, expected in zip(ds._levels[column], one_shot._levels[column]):
+            for array, other in zip(built, expected):
+                np.testing.assert_array_equal(array[:len(other)], other)
+    pd.testing.assert_frame_equal(ds.ohlc(333, 50), one_shot.ohlc(333, 50))
+    pd.testing.assert_frame_equal(ds.envelope(['line'], 100), one_shot.envelope(['line'], 100))
+    pd.testing.assert_frame_equal(ds.lttb(['close', 'line'], 200), one_shot.lttb(['close', 'line'], 200))
+
+
+@pytest.mark.parametrize('start, end', [(None, None), (3, 15003)])
+def test_lttb_keeps_endpoints_and_picks_extremes(data, start, end):
+    ds = Downsampler(data)
+    columns = ['close', 'line']
+    points = 150
+    result = ds.lttb(columns, points, start, end)
+    first, last = start or 0, (end or len(data)) - 1
+    rows = data.index.get_indexer(result.index)
+    assert rows[0] == first and rows[-1] == last and len(rows) <= points
+    assert (np.diff(rows) > 0).all()
+    pd.testing.assert_frame_equal(result, data[columns].iloc[rows])
+    # every other point is a column minimum or maximum of its sub bucket
+    edges, _ = ds._edges(first + 1, last, (points - 2) * 4, 1)
+    for row in rows[1:-1]:
+        n = np.searchsorted(edges, row, side='right') - 1
+        sub = data[columns].iloc[edges[n]:edges[n + 1]]
+        assert any(data[c].iloc[row] in (sub[c].min(), sub[c].max()) for c in columns)
+
+
+def test_lttb_keeps_spikes(data):
+    spiky = data[['close']].copy()
+    spiky.iloc[7777, 0] = 1e4
+    spiky.iloc[12345, 0] = -1e4
+    rows = spiky.index.get_indexer(Downsampler(spiky).lttb(['close'], 100).index)
+    assert 7777 in rows and 12345 in rows
+
+
+def test_short_viewports_keep_every_row(data):
+    ds = Downsampler(data)
+    assert len(ds.lttb(['close'], 100, 10, 60)) == 50
+    with pytest.raises(ValueError):
+        ds.ohlc(10, 50, 50)
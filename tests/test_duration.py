@@ -0,0 +1,59 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import pantulipy
+from pantulipy import duration
+
+
+@pytest.fixture(scope='module')
+def ohlc():
+    rng = np.random.default_rng(3)
+    rows = 300000
+    index = pd.to_datetime(rng.integers(20, 100, rows).cumsum(), unit='s')
+    close = 1e4 + 10. * rng.standard_normal(rows).cumsum()
+    return pd.DataFrame({'open': close, 'high': close + 1., 'low': close - 1., 'close': close,
+                         'volume': rng.uniform(1., 5., rows)}, index=index)
+
+
+def _windows(ohlc, period, rows):
+    timestamps = ohlc.index.as_unit('ns').asi8
+    starts = np.searchsorted(timestamps, timestamps - pd.Timedelta(period).value, side='right')
+    close = ohlc['close'].to_numpy()
+    return [close[starts[row]:row + 1] for row in rows]
+
+
+@pytest.mark.parametrize('name, reference', [
+    ('sma', np.mean),
+    ('stderr', lambda window: np.std(window) / np.sqrt(len(window))),
+    ('wma', lambda window: np.average(window, weights=np.arange(1., len(window) + 1.))),
+    ('md', lambda window: np.mean(np.abs(window - window.mean()))),
+])
+def test_window_values_keep_precision_on_long_series(ohlc, name, reference):
+    rows = np.random.default_rng(0).integers(len(ohlc) // 2, len(ohlc), 200)
+    result = duration.compute(name, ohlc, '20min').to_numpy()
+    expected = np.array([reference(window) for window in _windows(ohlc, '20min', rows)])
+    np.testing.assert_allclose(result[rows], expected, rtol=1e-9)
+
+
+def test_md_memory_chunks(ohlc, monkeypatch):
+    expected = duration.compute('md', ohlc, '1h')
+    monkeypatch.setattr(duration, '_MD_CHUNK', 1000)
+    pd.testing.assert_series_equal(duration.compute('md', ohlc, '1h'), expected)
+
+
+def test_regular_grid_matches_row_periods(make_ohlc):
+    close = make_ohlc(500, 1, pd.date_range('2024-01-01', periods=500, freq='1min'))['close']
+    by_rows = pantulipy.sma(close, 30)
+    by_duration = pantulipy.sma(close, '30min')
+    np.testing.assert_allclose(by_duration.to_numpy()[30:], by_rows.to_numpy()[30:])
+
+
+def test_rejects_invalid_inputs(ohlc):
+    with pytest.raises(ValueError):
+        duration.compute('rsi', ohlc, '1h')
+    with pytest.raises(ValueError):
+        duration.compute('sma', ohlc.reset_index(drop=True), '1h')
+    with pytest.raises(pantulipy.InvalidOptionError):
+        duration.compute('sma', ohlc, '-1h')
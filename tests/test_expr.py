@@ -0,0 +1,31 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pytest
+
+import pantulipy
+from pantulipy import expr
+
+
+def test_chained_indicators_match_nested_functions(ohlc):
+    result = expr.evaluate(ohlc, expr.ema(expr.rsi(14), 10))
+    rsi = pantulipy.rsi(ohlc, 14).iloc[14:]
+    expected = pantulipy.ema(rsi.to_frame('close'), 10)
+    np.testing.assert_allclose(result.to_numpy()[14:], expected.to_numpy())
+
+
+def test_outputs_and_columns(ohlc):
+    macd = expr.macd(12, 26, 9)
+    result = expr.evaluate(ohlc, macd.output('signal'), expr.sma(expr.col('volume'), 5))
+    np.testing.assert_allclose(result.iloc[:, 0], pantulipy.macd(ohlc, 12, 26, 9)['macd_signal'])
+    np.testing.assert_allclose(result.iloc[:, 1], pantulipy.sma(ohlc['volume'].rename('close'), 5))
+
+
+def test_invalid_expressions_are_rejected(ohlc):
+    with pytest.raises(ValueError, match='Unknown indicator'):
+        expr.Indicator('nope', 14)
+    with pytest.raises(ValueError, match='inputs'):
+        expr.ema(expr.rsi(14), expr.sma(5), 10)
+    with pytest.raises(ValueError, match='output'):
+        expr.macd(12, 26, 9).output('nope')
+    with pytest.raises(ValueError, match='multiple outputs'):
+        expr.evaluate(ohlc, expr.ema(expr.macd(12, 26, 9), 5))
@@ -0,0 +1,77 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from pantulipy import features
+
+
+def _average_ranks(values):
+    return np.array([(values < v).sum() + ((values == v).sum() - 1) / 2. for v in values])
+
+
+def test_rank_ties_get_average_rank():
+    block = np.array([[[3.], [1.], [3.], [2.], [3.]]]).reshape(1, 5, 1)
+    ranks = features.rank_cross_section(block.copy())[0, :, 0]
+    np.testing.assert_allclose(ranks, [3. / 4., 0., 3. / 4., 1. / 4., 3. / 4.])
+
+
+def test_rank_matches_average_ranking_with_missing_values():
+    rng = np.random.default_rng(0)
+    block = rng.integers(0, 5, (100, 20, 2)).astype(np.float64)
+    block[rng.random(block.shape) < .2] = np.nan
+    block[0, :, 0] = np.inf
+    block[1, :, 1] = np.nan
+    ranks = features.rank_cross_section(block.copy())
+    for row in range(block.shape[0]):
+        for feature in range(block.shape[2]):
+            values = block[row, :, feature]
+            valid = ~np.isnan(values)
+            count = valid.sum()
+            expected = _average_ranks(values[valid]) / (count - 1) if count > 1 else np.full(count, .5)
+            np.testing.assert_allclose(ranks[row, valid, feature], expected)
+            assert np.isnan(ranks[row, ~valid, feature]).all()
+
+
+def test_rank_does_not_depend_on_symbols_order():
+    block = np.array([1., 2., 2., 5.]).reshape(1, 4, 1)
+    reordered = block[:, ::-1].copy()
+    np.testing.assert_allclose(features.rank_cross_section(block.copy())[0, :, 0],
+                               features.rank_cross_section(reordered)[0, ::-1, 0])
+
+
+def test_rolling_zscore():
+    values = np.random.default_rng(1).standard_normal(300) + 1e6
+    window = 20
+    expected = (pd.Series(values) - pd.Series(values).rolling(window).mean()) / pd.Series(values).rolling(window).std()
+    np.testing.assert_allclose(features.rolling_zscore(values, window), expected.to_numpy(), rtol=1e-6)
+
+
+@pytest.fixture
+def panel(make_ohlc):
+    return {symbol: make_ohlc(400, seed) for seed, symbol in enumerate(('BTC', 'ETH', 'SOL'))}
+
+
+def test_compute_panel_layout(panel):
+    fm = features.compute_panel(panel, ['rsi', ('sma', 10)], lags=(1,), rank=True)
+    assert fm.values.shape == (400, 3, 4)
+    assert fm.names == ['rsi_14', 'rsi_14_lag1', 'sma_10', 'sma_10_lag1']
+    assert fm.frame().shape == (1200, 4)
+    last = fm.values[-1, :, 0]
+    assert sorted(last.tolist()) == [0., .5, 1.]
+
+
+def test_compute_panel_rejects_ragged_panels(panel):
+    panel['SOL'] = panel['SOL'].iloc[1:]
+    with pytest.raises(ValueError):
+        features.compute_panel(panel, ['rsi'])
+
+
+def test_compute_panel_rejects_misaligned_indexes(make_ohlc):
+    dates = pd.date_range('2024-01-01', periods=400, freq='h')
+    panel = {'BTC': make_ohlc(400, 0, dates), 'ETH': make_ohlc(400, 1, dates + pd.Timedelta('1h'))}
+    with pytest.raises(ValueError, match='same index'):
+        features.compute_panel(panel, ['rsi'])
+    panel['ETH'].index = dates
+    fm = features.compute_panel(panel, ['rsi'], tail=50)
+    assert fm.index.equals(dates[-50:])
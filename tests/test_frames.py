@@ -0,0 +1,85 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import pantulipy
+from pantulipy import batch
+
+
+@pytest.mark.parametrize('view', ['reversed', 'strided', 'fortran'])
+def test_non_contiguous_inputs(make_ohlc, view):
+    ohlc = make_ohlc(300, 9)
+    if view == 'reversed':
+        data = ohlc.iloc[::-1]
+    elif view == 'strided':
+        data = ohlc.iloc[::2]
+    else:
+        data = pd.DataFrame(np.asfortranarray(ohlc.to_numpy()), columns=ohlc.columns)
+    expected = pantulipy.rsi(pd.DataFrame({'close': data['close'].to_numpy().copy()}))
+    np.testing.assert_allclose(batch.compute(data, ['rsi'])['rsi_14'], expected)
+    np.testing.assert_allclose(pantulipy.rsi(data), expected)
+
+
+def test_polars_reversed_inputs(make_ohlc):
+    pl = pytest.importorskip('polars')
+    ohlc = make_ohlc(300, 10)
+    data = pl.from_pandas(ohlc).reverse()
+    expected = pantulipy.sma(ohlc.iloc[::-1].reset_index(drop=True), 10).to_numpy()
+    np.testing.assert_allclose(pantulipy.sma(data, 10).to_numpy(), expected)
+
+
+def _arrow_inputs(ohlc, container):
+    pa = pytest.importorskip('pyarrow')
+    table = pa.Table.from_pandas(ohlc, preserve_index=False)
+    return table if container == 'table' else table.to_batches()[0]
+
+
+@pytest.mark.parametrize('container', ['table', 'record_batch'])
+def test_arrow_inputs(ohlc, container):
+    pa = pytest.importorskip('pyarrow')
+    data = _arrow_inputs(ohlc, container)
+    rsi = pantulipy.rsi(data)
+    assert isinstance(rsi, pa.Array) and rsi.type == pa.float64()
+    np.testing.assert_allclose(rsi.to_numpy(), pantulipy.rsi(ohlc).to_numpy())
+    bbands = pantulipy.bbands(data, 20, 2)
+    expected = pantulipy.bbands(ohlc, 20, 2)
+    assert isinstance(bbands, pa.Table)
+    assert bbands.column_names == list(expected.columns)
+    assert all(field.type == pa.float64() for field in bbands.schema)
+    np.testing.assert_allclose(bbands.to_pandas().to_numpy(), expected.to_numpy())
+
+
+@pytest.mark.parametrize('container', ['table', 'record_batch'])
+def test_arrow_batch_compute(ohlc, container):
+    pa = pytest.importorskip('pyarrow')
+    result = batch.compute(_arrow_inputs(ohlc, container), ['rsi', ('bbands', 20, 2)])
+    expected = batch.compute(ohlc, ['rsi', ('bbands', 20, 2)])
+    assert isinstance(result, pa.Table)
+    assert result.column_names == list(expected.columns)
+    np.testing.assert_allclose(result.to_pandas().to_numpy(), expected.to_numpy())
+
+
+def test_polars_lazy_inputs(ohlc):
+    pl = pytest.importorskip('polars')
+    data = pl.from_pandas(ohlc).lazy()
+    rsi = pantulipy.rsi(data)
+    assert isinstance(rsi, pl.LazyFrame)
+    assert dict(rsi.collect_schema()) == {'rsi': pl.Float64}
+    np.testing.assert_allclose(rsi.collect()['rsi'].to_numpy(), pantulipy.rsi(ohlc).to_numpy())
+    result = batch.compute(data, ['rsi', ('bbands', 20, 2)])
+    expected = batch.compute(ohlc, ['rsi', ('bbands', 20, 2)])
+    assert isinstance(result, pl.LazyFrame)
+    assert result.collect_schema().names() == list(expected.columns)
+    assert all(dtype == pl.Float64 for dtype in result.collect_schema().dtypes())
+    np.testing.assert_allclose(result.collect().to_numpy(), expected.to_numpy())
+
+
+def test_polars_outputs_keep_names_and_dtypes(ohlc):
+    pl = pytest.importorskip('polars')
+    data = pl.from_pandas(ohlc)
+    rsi = pantulipy.rsi(data)
+    assert isinstance(rsi, pl.Series) and rsi.name == 'rsi' and rsi.dtype == pl.Float64
+    macd = pantulipy.macd(data)
+    assert isinstance(macd, pl.DataFrame)
+    assert macd.schema == {column: pl.Float64 for column in pantulipy.macd(ohlc).columns}
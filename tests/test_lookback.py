@@ -0,0 +1,60 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pytest
+
+from pantulipy import core, lookback
+
+TAIL = 50
+TOLERANCE = 1e-6
+
+
+def _data(kind, rows, seed):
+    rng = np.random.default_rng(seed)
+    if kind == 'walk':
+        close = 1000. + rng.standard_normal(rows).cumsum()
+    elif kind == 'small':
+        close = np.abs(10. + .05 * rng.standard_normal(rows).cumsum()) + 1.
+    else:
+        close = 100. * np.exp(np.cumsum(.001 + .02 * rng.standard_normal(rows)))
+    spread = np.abs(close) * .01 * rng.random(rows) + 1e-3
+    volume = rng.random(rows) * (1e7 if kind == 'trend' else 1e3) + 1.
+    return {'open': np.roll(close, 1), 'high': close + spread, 'low': close - spread, 'close': close,
+            'volume': volume}
+
+
+def _spec(name):
+    return (name, 10) if name in core._DEFAULTLESS_INDICATORS else name
+
+
+@pytest.mark.parametrize('name', core._RECURSIVE_INDICATORS + core._WINDOWED_INDICATORS)
+def test_truncated_history_matches_full_history(name):
+    requirement = lookback.requirement(_spec(name), TAIL, TOLERANCE)
+    if requirement['history'] is None:
+        pytest.skip('whole history')
+    fn = core._kernel(name)
+    for kind in ('walk', 'small', 'trend'):
+        data = _data(kind, 10000, 7)
+        inputs = [data.get(column, data['close']) for column in core._input_names(fn)]
+        full = fn(*inputs, *requirement['params'])
+        part = fn(*[np.ascontiguousarray(i[-requirement['history']:]) for i in inputs], *requirement['params'])
+        for full_output, part_output in zip(*[o if type(o) == tuple else (o,) for o in (full, part)]):
+            scale = np.max(np.abs(full_output)) or 1.
+            error = np.max(np.abs(full_output[-TAIL:] - part_output[-TAIL:])) / scale
+            assert error <= TOLERANCE, f'{name} over {kind} data'
+
+
+@pytest.mark.parametrize('spec', [('decay', 10), ('edecay', 10), 'adosc', 'obv', 'ad'])
+def test_data_dependent_state_needs_whole_history(spec):
+    assert lookback.requirement(spec, TAIL)['history'] is None
+    assert lookback.plan(['rsi', spec], TAIL)['history'] is None
+
+
+def test_tr_reads_previous_close():
+    assert lookback.requirement('tr', 10)['history'] == 11
+
+
+def test_plan_and_group_symbols():
+    assert lookback.plan(['rsi', ('sma', 200), ('ema', 50)], tail=100)['history'] == 446
+    groups = lookback.group_symbols({'BTC': [('sma', 200)], 'ETH': ['rsi'], 'SOL': [('sma', 200)], 'X': ['obv']},
+                                    tail=10)
+    assert groups == {209: ['BTC', 'SOL'], 245: ['ETH'], None: ['X']}
@@ -0,0 +1,17 @@
+# -*- coding:utf-8 -*-
+from pantulipy import core, parity
+
+
+def test_every_path_agrees_with_tulipy():
+    records = parity.run(rows=120)
+    text, failures = parity.report(records)
+    assert failures == 0, text
+    assert {r['path'] for r in records} == set(parity.PATHS)
+    assert {r['indicator'] for r in records} == set(core.__all__)
+
+
+def test_timing_regressions_are_reported():
+    records = parity.run(['sma', 'rsi'], ['wrapper', 'batch'], rows=120)
+    baseline = [dict(r, seconds=r['seconds'] / 10.) for r in records]
+    text, failures = parity.report(records, baseline, slowdown=2.)
+    assert failures == 2 and 'timing regression' in text
@@ -0,0 +1,52 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import pantulipy
+from pantulipy import batch, core, expr
+
+
+def rvwma(close, volume, period):
+    weights = np.ones(period)
+    return np.convolve(close * volume, weights, 'valid') / np.convolve(volume, weights, 'valid')
+
+
+@pytest.fixture
+def registered():
+    pantulipy.register('rvwma', rvwma, ['close', 'volume'], {'period': 20}, warmup=lambda period: period - 1,
+                       kind='windowed')
+    yield 'rvwma'
+    pantulipy.unregister('rvwma')
+
+
+def test_registered_indicator_everywhere(ohlc, registered):
+    expected = pd.Series(rvwma(ohlc['close'].to_numpy(), ohlc['volume'].to_numpy(), 10))
+    np.testing.assert_allclose(pantulipy.rvwma(ohlc, 10).to_numpy()[9:], expected)
+    result = batch.compute(ohlc, [('rvwma', 10)], tail=5)
+    np.testing.assert_allclose(result['rvwma_10'], expected.to_numpy()[-5:])
+    np.testing.assert_allclose(ohlc.tulip.rvwma(10).to_numpy()[9:], expected)
+    np.testing.assert_allclose(expr.evaluate(ohlc, expr.rvwma(10)).to_numpy()[9:], expected)
+
+
+def test_unregister_removes_every_name(registered):
+    pantulipy.unregister(registered)
+    assert not hasattr(pantulipy, registered) and not hasattr(expr, registered)
+    assert registered not in core.__all__ and registered not in expr.__all__
+    pantulipy.register(registered, rvwma, ['close', 'volume'], {'period': 20})
+
+
+@pytest.mark.parametrize('name', ['sma', 'batch', 'core', '_private', 'register', 'col', '_parse_spec', 'not valid'])
+def test_reserved_names_are_rejected(name):
+    with pytest.raises(ValueError, match='reserved'):
+        pantulipy.register(name, rvwma, ['close', 'volume'], {'period': 20})
+    assert name not in core._PLUGINS
+
+
+def test_invalid_inputs_and_options_are_rejected():
+    with pytest.raises(ValueError):
+        pantulipy.register('bad_inputs', rvwma, ['close', 'price'], {'period': 20})
+    with pytest.raises(ValueError):
+        pantulipy.register('bad_options', rvwma, ['close', 'volume'], ['close'])
+    with pytest.raises(ValueError):
+        pantulipy.register('bad_kind', rvwma, ['close', 'volume'], {'period': 20}, kind='other')
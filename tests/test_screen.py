@@ -0,0 +1,44 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pytest
+
+import pantulipy
+from pantulipy import screen
+
+
+@pytest.fixture
+def panel(make_ohlc):
+    # different lengths, aligned on their last row
+    return {f's{n}': make_ohlc(300 - 10 * n, 20 + n) for n in range(8)}
+
+
+def _expected(data):
+    ema12, ema26 = pantulipy.ema(data, 12).to_numpy(), pantulipy.ema(data, 26).to_numpy()
+    return (pantulipy.rsi(data, 14).iloc[-1] < 60 and data['close'].iloc[-1] > pantulipy.sma(data, 50).iloc[-1]
+            or ema12[-2] <= ema26[-2] and ema12[-1] > ema26[-1])
+
+
+def test_rule_matches_pandas_evaluation(panel):
+    rule = screen.Rule('rsi(14) < 60 and close > sma(50) or crossover(ema(12), ema(26))')
+    assert rule.specs == [('rsi', (14,)), ('sma', (50,)), ('ema', (12,)), ('ema', (26,))]
+    assert rule.matches(panel) == [s for s, data in panel.items() if _expected(data)]
+
+
+def test_outputs_arithmetic_and_expressions(panel):
+    text = 'macd(12, 26, 9).histogram > 0 and volume > 0.5 * sma(volume, 20)'
+    result = screen.screen(panel, [text])
+    for symbol, data in panel.items():
+        histogram = pantulipy.macd(data, 12, 26, 9)['macd_histogram'].iloc[-1]
+        volume = pantulipy.sma(data['volume'].rename('close'), 20).iloc[-1]
+        assert result.loc[symbol, text] == (histogram > 0 and data['volume'].iloc[-1] > .5 * volume)
+
+
+def test_mask_rows(panel):
+    mask = screen.Rule('close > sma(20)').mask(panel, rows=5)
+    assert mask.shape == (5, len(panel)) and mask.dtype == np.bool_
+
+
+@pytest.mark.parametrize('text', ['rsi(14) <', 'nope(3) > 1', 'price > 1', 'macd(12, 26, 9) > 0', 'close @ 2'])
+def test_invalid_rules(panel, text):
+    with pytest.raises(ValueError):
+        screen.Rule(text).matches(panel)
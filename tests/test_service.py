@@ -0,0 +1,54 @@
+# -*- coding:utf-8 -*-
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pantulipy import batch
+from pantulipy.service import IndicatorClient, IndicatorServer
+
+
+@pytest.fixture
+def server():
+    server = IndicatorServer().start()
+    yield server
+    server.close(timeout=5)
+
+
+def test_results_are_computed_once(server, ohlc):
+    specs = ['rsi', ('macd', 12, 26, 9)]
+    client = IndicatorClient(server.address, server.authkey)
+    other = IndicatorClient(server.address, server.authkey)
+    try:
+        client.put('BTC', ohlc)
+        expected = batch.compute(ohlc, specs)
+        pd.testing.assert_frame_equal(client.compute_frame('BTC', specs), expected)
+        columns = other.compute('BTC', specs)
+        np.testing.assert_allclose(columns['macd_12_26_9_histogram'], expected['macd_12_26_9_histogram'])
+        assert not columns['rsi_14'].flags.writeable
+        stats = client.stats()
+        assert stats['computed'] == 2 and stats['hits'] == 2
+    finally:
+        client.close()
+        other.close()
+
+
+def test_wrong_authkey_is_rejected_and_server_keeps_serving(server, ohlc):
+    with pytest.raises(multiprocessing.AuthenticationError):
+        IndicatorClient(server.address, b'wrong key')
+    client = IndicatorClient(server.address, server.authkey)
+    try:
+        client.put('ETH', ohlc)
+        assert list(client.compute('ETH', ['rsi'])) == ['rsi_14']
+    finally:
+        client.close()
+
+
+def test_unknown_symbol_errors_are_raised_in_client(server):
+    client = IndicatorClient(server.address, server.authkey)
+    try:
+        with pytest.raises(KeyError):
+            client.compute('nope', ['rsi'])
+    finally:
+        client.close()
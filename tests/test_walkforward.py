@@ -0,0 +1,50 @@
+# -*- coding:utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from pantulipy import batch
+from pantulipy.walkforward import WalkForward
+
+SPECS = ['rsi', ('sma', 20), ('ema', 10), 'obv', ('bbands', 20, 2)]
+
+
+@pytest.fixture
+def ohlc(make_ohlc):
+    return make_ohlc(400)
+
+
+def _causal(data):
+    staged = {c: data[c].to_numpy() for c in data.columns}
+    return batch.compute_arrays(staged, SPECS, fill=False)
+
+
+def test_expanding_windows_are_views_of_causal_results(ohlc):
+    wf = WalkForward(ohlc, SPECS)
+    for end, columns in wf.expanding([50, 200, 400]):
+        expected = _causal(ohlc.iloc[:end])
+        assert list(columns) == list(expected)
+        for name, values in columns.items():
+            np.testing.assert_allclose(values, expected[name])
+            assert not values.flags.writeable
+
+
+def test_rolling_windows_recompute_start_dependent_indicators(ohlc):
+    wf = WalkForward(ohlc, SPECS)
+    for end, columns in wf.rolling([150, 300, 400], length=100):
+        expected = _causal(ohlc.iloc[end - 100:end])
+        for name in ('rsi_14', 'ema_10', 'obv'):
+            np.testing.assert_allclose(columns[name], expected[name])
+        # windowed indicators use bars before the window start
+        np.testing.assert_allclose(columns['sma_20'], _causal(ohlc.iloc[:end])['sma_20'][end - 100:])
+
+
+def test_frame_keeps_index(ohlc):
+    ohlc.index = pd.date_range('2024-01-01', periods=len(ohlc), freq='h')
+    frame = WalkForward(ohlc, SPECS).frame(120, 20)
+    assert frame.index.equals(ohlc.index[20:120]) and len(frame.columns) == 7
+
+
+def test_short_windows_are_nan(ohlc):
+    columns = WalkForward(ohlc, SPECS).window(10)
+    assert np.isnan(columns['sma_20']).all() and len(columns['sma_20']) == 10
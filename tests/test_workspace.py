@@ -0,0 +1,101 @@
+# -*- coding:utf-8 -*-
+import collections
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pantulipy
+from pantulipy.workspace import Workspace, checkpoint, restore
+
+
+def test_ring_wraparound_matches_functions(ohlc):
+    ws = Workspace(50, ['rsi', ('bbands', 20, 2)])
+    for bar in ohlc.to_dict('records'):
+        ws.push(bar)
+    outputs = ws.evaluate()
+    window = ohlc.iloc[-50:]
+    np.testing.assert_allclose(outputs['rsi_14'], pantulipy.rsi(window).to_numpy())
+    np.testing.assert_allclose(outputs['bbands_20_2_upper'], pantulipy.bbands(window, 20, 2)['bbands_upper'])
+
+
+def test_bars_are_mapped_by_name(ohlc):
+    reordered = ohlc[['volume', 'close', 'low', 'high', 'open']]
+    Bar = collections.namedtuple('Bar', ['close', 'volume', 'open', 'low', 'high'])
+    workspaces = [Workspace(30, ['mfi']) for _ in range(4)]
+    for n in range(len(ohlc)):
+        row = reordered.iloc[n]
+        workspaces[0].push(ohlc.iloc[n].to_dict())
+        workspaces[1].push(row)
+        workspaces[2].push(Bar(**row.to_dict()))
+        workspaces[3].push(tuple(ohlc.iloc[n]))
+    expected = workspaces[0].evaluate()['mfi_14'].copy()
+    for ws in workspaces[1:]:
+        np.testing.assert_array_equal(ws.evaluate()['mfi_14'], expected)
+
+
+@pytest.mark.parametrize('bar', [{'open': 1., 'high': 2., 'low': .5, 'close': 1.5},
+                                 pd.Series({'close': 1., 'volume': 2.}),
+                                 (1., 2., .5, 1.5)])
+def test_incomplete_bars_are_rejected(bar):
+    ws = Workspace(3, ['sma'])
+    ws.push((1., 1., 1., 1., 1.))
+    with pytest.raises(ValueError):
+        ws.push(bar)
+    assert len(ws) == 1
+    np.testing.assert_array_equal(ws._buffer[:, 1], 1.)
+    np.testing.assert_array_equal(ws._buffer[:, 4], 1.)
+
+
+@pytest.mark.parametrize('pushed', [1, 2, 3])
+def test_bars_with_invalid_values_leave_the_ring_unchanged(pushed):
+    ws = Workspace(3, ['sma'])
+    for n in range(pushed):
+        ws.push((n, n, n, n, n))
+    buffer = ws._buffer.copy()
+    with pytest.raises(ValueError):
+        ws.push({'open': 9., 'high': 9., 'low': 9., 'close': 'nine', 'volume': 9.})
+    assert len(ws) == pushed
+    np.testing.assert_array_equal(ws._buffer, buffer)
+
+
+def test_evaluate_needs_a_full_window():
+    ws = Workspace(3, ['sma'])
+    with pytest.raises(ValueError):
+        ws.evaluate()
+
+
+def _filled(ohlc, window=30, specs=('rsi',)):
+    ws = Workspace(window, list(specs))
+    for bar in ohlc.iloc[:window + 7].to_dict('records'):
+        ws.push(bar)
+    return ws
+
+
+def test_checkpoint_restore_roundtrip(ohlc):
+    workspaces = {'BTC/USDT': _filled(ohlc), '': _filled(ohlc.iloc[::-1]), 7: _filled(ohlc),
+                  ('binance', 'ETH'): _filled(ohlc)}
+    restored = restore(checkpoint(workspaces), ['rsi'])
+    assert list(restored) == list(workspaces)
+    for symbol, ws in workspaces.items():
+        np.testing.assert_array_equal(restored[symbol].evaluate()['rsi_14'], ws.evaluate()['rsi_14'])
+    into = {'BTC/USDT': Workspace(30, ['rsi'])}
+    assert restore(checkpoint(workspaces), ['rsi'], into)['BTC/USDT'] is into['BTC/USDT']
+
+
+def test_checkpoint_empty_mapping():
+    assert restore(checkpoint({}), ['rsi']) == {}
+
+
+def test_restore_rejects_bad_blobs(ohlc):
+    blob = checkpoint({'BTC': _filled(ohlc)})
+    with pytest.raises(ValueError):
+        restore(blob, [('rsi', 10)])
+    corrupted = bytearray(blob)
+    corrupted[-1] ^= 1
+    with pytest.raises(ValueError):
+        restore(bytes(corrupted), ['rsi'])
+    with pytest.raises(ValueError):
+        restore(blob[:-8], ['rsi'])
+    with pytest.raises(ValueError):
+        checkpoint({'BTC': _filled(ohlc), 'ETH': _filled(ohlc, 20)})